@@ -0,0 +1,188 @@
+"""Background analysis of the position played on the board. The engine runs in a separate low priority process,
+so the search never holds the interpreter lock needed by the window, and keeps its transposition table between positions.
+The window sends every new position and collects results of completed depths, newer position interrupts the search.
+Doesn't import any widgets and the worker process doesn't create any.
+"""
+
+from typing import Any
+import multiprocessing
+import threading
+import queue
+import os
+
+from rules import Position
+from engine import Engine, SearchLimits, SearchResult, format_score, ENTRY_BYTES, MATE
+
+ANALYSIS_HASH: int = 32
+MAX_DEPTH: int = 64
+MULTIPV: int = 3
+NICENESS: int = 10
+
+def describe(position: Position, result: SearchResult, generation: int) -> dict[str, Any]:
+    """Converts the search result into message for the window. Scores are from white point of view.
+
+    Args:
+
+     - position (Position): Analysed position.
+     - result (SearchResult): Result of completed depth.
+     - generation (int): Number of the analysed position.
+
+    Returns:
+
+     - dict[str, Any]: Generation, depth, score in centipawns, formatted score, nodes, nodes per second, principal variation
+     in SAN and the best lines with score, formatted score, variation in SAN and squares of the first move.
+    """
+    lines: list[dict[str, Any]] = []
+    for score, moves in result.lines:
+        score = score if position.turn == 'w' else -score
+        line = position.copy()
+        pv: list[str] = []
+        for move in moves:
+            pv.append(line.san(move))
+            line.push(move)
+        lines.append({'score': score, 'text': format_score(score), 'pv': pv, 'move': moves[0][:2] if moves else None})
+    best = lines[0] if lines else {'score': 0, 'text': format_score(0), 'pv': []}
+    return {'generation': generation, 'depth': result.depth, 'score': best['score'], 'text': best['text'], 'nodes': result.nodes,
+            'nps': int(result.nodes / result.seconds) if result.seconds else 0, 'pv': best['pv'], 'lines': lines, 'turn': position.turn}
+
+def serve(commands: Any, results: Any, table_size: int, multipv: int = MULTIPV) -> None:
+    """Worker process: searches the latest received position until it's replaced, stopped or fully searched.
+    Commands are ('go', generation, fen), ('stop', generation, '') and None which ends the worker.
+
+    Args:
+
+     - commands (multiprocessing.Queue): Commands from the window.
+     - results (multiprocessing.Queue): Results of completed depths.
+     - table_size (int): Maximum number of transposition table entries.
+     - multipv (int, optional): Number of analysed lines. Defaults to MULTIPV.
+    """
+    try:
+        os.nice(NICENESS)
+    except (AttributeError, OSError):
+        pass
+    engine = Engine(table_size)
+    pending: list[Any] = []
+    condition = threading.Condition()
+    def listen():
+        while True:
+            command = commands.get()
+            with condition:
+                pending[:] = [command]
+                engine.stop()
+                condition.notify()
+            if command is None:
+                return
+    threading.Thread(target=listen, daemon=True).start()
+    while True:
+        with condition:
+            condition.wait_for(lambda: pending)
+            command = pending.pop()
+        if command is None:
+            return
+        kind, generation, fen = command
+        if kind != 'go':
+            continue
+        position = Position(fen)
+        def info(result: SearchResult) -> None:
+            results.put(describe(position, result, generation))
+            with condition:
+                if pending: # stop set before the search started was cleared by it
+                    engine.stop()
+        result = engine.search(position, SearchLimits(depth=MAX_DEPTH, multipv=multipv), info)
+        if not result.depth:
+            results.put(describe(position, result, generation))
+
+class AnalysisClient:
+    """Class owning the worker process. Used from the window thread only.
+    """
+    def __init__(self, hash_mb: int = ANALYSIS_HASH, multipv: int = MULTIPV) -> None:
+        """Constructor:
+
+        Args:
+
+         - hash_mb (int, optional): Size of the transposition table in MB. Defaults to ANALYSIS_HASH.
+         - multipv (int, optional): Number of analysed lines. Defaults to MULTIPV.
+        """
+        self.table_size: int = hash_mb * 1024 * 1024 // ENTRY_BYTES
+        self.multipv: int = multipv
+        self.process: Any = None
+        self.commands: Any = None
+        self.results: Any = None
+        self.generation: int = 0
+
+    def start(self) -> None:
+        """Starts the worker process, unless it's running.
+        """
+        if self.process and self.process.is_alive():
+            return
+        context = multiprocessing.get_context('spawn') # forking the process with open window isn't safe
+        self.commands = context.Queue()
+        self.results = context.Queue()
+        self.process = context.Process(target=serve, args=(self.commands, self.results, self.table_size, self.multipv), daemon=True)
+        self.process.start()
+
+    def analyse(self, fen: str) -> int:
+        """Replaces analysed position.
+
+        Args:
+
+         - fen (str): Position to analyse.
+
+        Returns:
+
+         - int: Generation of the position, results of older positions are ignored.
+        """
+        self.start()
+        self.generation += 1
+        self.commands.put(('go', self.generation, fen))
+        return self.generation
+
+    def stop(self) -> None:
+        """Stops the search, the worker keeps running with its transposition table.
+        """
+        if self.process:
+            self.generation += 1
+            self.commands.put(('stop', self.generation, ''))
+
+    def poll(self) -> dict[str, Any] | None:
+        """Collects all results received since the last call.
+
+        Returns:
+
+         - dict[str, Any] | None: Latest result of the current position, None if there is none.
+        """
+        latest = None
+        while self.results:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if result['generation'] == self.generation:
+                latest = result
+        return latest
+
+    def close(self) -> None:
+        """Ends the worker process.
+        """
+        if not self.process:
+            return
+        self.commands.put(None)
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+        self.process = None
+
+def white_share(score: int) -> float:
+    """Converts score into part of the evaluation bar belonging to white.
+
+    Args:
+
+     - score (int): Score in centipawns from white point of view.
+
+    Returns:
+
+     - float: Value in range 0-1, 0.5 for equal position.
+    """
+    if abs(score) >= MATE - 1000:
+        return 1.0 if score > 0 else 0.0
+    return 1 / (1 + 10 ** (-score / 400))
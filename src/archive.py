@@ -0,0 +1,415 @@
+"""SQLite archive of games. Games are stored in the compact binary form, every position they reached is stored
+in positions table keyed by Zobrist hash, so games reaching a position are found with one indexed lookup.
+Explorer table aggregates moves played in every position with results of the games, it's updated by every insert,
+so the opening explorer reads statistics of a position with one indexed range read.
+Inserts are done in bulk transactions by a background thread with its own connection, callers only queue the games.
+
+Usage:
+
+    python src/archive.py import games.pgn [--db games.db]
+    python src/archive.py find "<fen>" [--db games.db] [--limit 20]
+    python src/archive.py explore "<fen>" [--db games.db]
+"""
+
+from typing import Any, Iterable
+import argparse
+import threading
+import pathlib
+import sqlite3
+import queue
+import time
+import sys
+import os
+
+from binary import BinaryGame, encode_game, encode_move, decode_game, WORD_MOVES
+from tools import resource_path
+from rules import Position
+from pgn import read_games
+
+BATCH_GAMES: int = 500
+SCHEMA_VERSION: int = 1
+RESULT_COLUMNS: dict[str, int] = {'1-0': 0, '1/2-1/2': 1, '0-1': 2}
+SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    white TEXT,
+    black TEXT,
+    result TEXT,
+    date TEXT,
+    plies INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS positions (
+    hash INTEGER NOT NULL,
+    game INTEGER NOT NULL,
+    ply INTEGER NOT NULL,
+    PRIMARY KEY (hash, game, ply)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS explorer (
+    hash INTEGER NOT NULL,
+    move INTEGER NOT NULL,
+    games INTEGER NOT NULL,
+    white INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    black INTEGER NOT NULL,
+    PRIMARY KEY (hash, move)
+) WITHOUT ROWID;
+'''
+UPSERT_EXPLORER: str = '''
+INSERT INTO explorer (hash, move, games, white, draws, black) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (hash, move) DO UPDATE SET games = games + excluded.games, white = white + excluded.white,
+    draws = draws + excluded.draws, black = black + excluded.black
+'''
+
+def default_path() -> str:
+    """Returns path of the archive used by the app.
+
+    Returns:
+
+     - str: Absolute path to games.db next to the config.
+    """
+    return resource_path(os.path.join('assets', 'games.db'))
+
+def signed(value: int) -> int:
+    """Converts unsigned 64-bit hash into signed integer stored by SQLite.
+
+    Args:
+
+     - value (int): Zobrist hash.
+
+    Returns:
+
+     - int: The same bits as signed integer.
+    """
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def connect(path: str) -> sqlite3.Connection:
+    """Opens the archive and creates its tables. Write-ahead log lets readers work while the writer inserts.
+    Archive created before the explorer table existed gets it filled from its games.
+
+    Args:
+
+     - path (str): Path of the database file.
+
+    Returns:
+
+     - sqlite3.Connection: Open connection.
+    """
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(SCHEMA)
+    if connection.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+        rebuild_explorer(connection)
+        connection.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+    return connection
+
+def connect_readonly(path: str) -> sqlite3.Connection:
+    """Opens the archive for reading only, so it never creates or migrates tables, that's done by the writer.
+
+    Args:
+
+     - path (str): Path of the database file.
+
+    Raises:
+
+     - sqlite3.OperationalError: If the archive doesn't exist yet.
+
+    Returns:
+
+     - sqlite3.Connection: Open connection.
+    """
+    return sqlite3.connect(f'{pathlib.Path(os.path.abspath(path)).as_uri()}?mode=ro', uri=True)
+
+def game_rows(game: BinaryGame, number: int) -> tuple[list[tuple[int, int, int]], set[tuple[int, int]]]:
+    """Lists positions reached in the game, the starting one included, and moves played in them.
+
+    Args:
+
+     - game (BinaryGame): Archived game.
+     - number (int): Id of the game.
+
+    Returns:
+
+     - tuple[list[tuple[int, int, int]], set[tuple[int, int]]]: Signed hash, game id and ply of every position,
+     signed hash and move word of every played move counted once per game.
+    """
+    position = Position(game.start_fen)
+    rows = [(signed(position.hash), number, 0)]
+    moves: set[tuple[int, int]] = set()
+    for ply, move in enumerate(game.moves, start=1):
+        moves.add((rows[-1][0], encode_move(move)))
+        position.push(move)
+        rows.append((signed(position.hash), number, ply))
+    return rows, moves
+
+def count_moves(totals: dict[tuple[int, int], list[int]], moves: set[tuple[int, int]], result: str) -> None:
+    """Adds moves of one game into explorer totals.
+
+    Args:
+
+     - totals (dict[tuple[int, int], list[int]]): Games, white wins, draws and black wins keyed by hash and move word.
+     - moves (set[tuple[int, int]]): Moves of the game from game_rows.
+     - result (str): Result of the game, unfinished games count only as played.
+    """
+    column = RESULT_COLUMNS.get(result)
+    for key in moves:
+        counts = totals.setdefault(key, [0, 0, 0, 0])
+        counts[0] += 1
+        if column is not None:
+            counts[column + 1] += 1
+
+def update_explorer(connection: sqlite3.Connection, totals: dict[tuple[int, int], list[int]]) -> None:
+    """Adds the totals into explorer table.
+
+    Args:
+
+     - connection (sqlite3.Connection): Open archive, inside a transaction.
+     - totals (dict[tuple[int, int], list[int]]): Totals from count_moves.
+    """
+    connection.executemany(UPSERT_EXPLORER, ((*key, *counts) for key, counts in totals.items()))
+
+def insert_games(connection: sqlite3.Connection, games: Iterable[BinaryGame]) -> int:
+    """Inserts the games with their positions and adds their moves to the explorer in one transaction.
+    Moves are summed in memory first, so every position and move is written once per transaction.
+
+    Args:
+
+     - connection (sqlite3.Connection): Open archive.
+     - games (Iterable[BinaryGame]): Games to insert.
+
+    Returns:
+
+     - int: Number of inserted games.
+    """
+    count = 0
+    totals: dict[tuple[int, int], list[int]] = {}
+    with connection:
+        for game in games:
+            data = bytearray()
+            encode_game(game, data)
+            result = game.headers.get('Result', '*')
+            number = connection.execute('INSERT INTO games (white, black, result, date, plies, data) VALUES (?, ?, ?, ?, ?, ?)',
+                                        (game.headers.get('White'), game.headers.get('Black'), result,
+                                         game.headers.get('Date'), len(game.moves), bytes(data))).lastrowid
+            rows, moves = game_rows(game, number)
+            connection.executemany('INSERT OR IGNORE INTO positions (hash, game, ply) VALUES (?, ?, ?)', rows)
+            count_moves(totals, moves, result)
+            count += 1
+        update_explorer(connection, totals)
+    return count
+
+def rebuild_explorer(connection: sqlite3.Connection) -> None:
+    """Fills explorer table again from all archived games.
+
+    Args:
+
+     - connection (sqlite3.Connection): Open archive.
+    """
+    with connection:
+        connection.execute('DELETE FROM explorer')
+        totals: dict[tuple[int, int], list[int]] = {}
+        for number, result, data in connection.execute('SELECT id, result, data FROM games').fetchall():
+            count_moves(totals, game_rows(decode_game(data, 0)[0], number)[1], result)
+        update_explorer(connection, totals)
+
+def find_games(connection: sqlite3.Connection, position: Position, limit: int = 100) -> list[dict[str, Any]]:
+    """Finds games which reached the position.
+
+    Args:
+
+     - connection (sqlite3.Connection): Open archive.
+     - position (Position): Searched position.
+     - limit (int, optional): Maximum number of games. Defaults to 100.
+
+    Returns:
+
+     - list[dict[str, Any]]: Id, players, result, date and the first ply with the position of every game, the newest first.
+    """
+    rows = connection.execute('SELECT g.id, g.white, g.black, g.result, g.date, MIN(p.ply) FROM positions p JOIN games g ON g.id = p.game '
+                              'WHERE p.hash = ? GROUP BY g.id ORDER BY g.id DESC LIMIT ?', (signed(position.hash), limit))
+    return [dict(zip(('id', 'white', 'black', 'result', 'date', 'ply'), row)) for row in rows]
+
+def load_game(connection: sqlite3.Connection, number: int) -> BinaryGame | None:
+    """Loads archived game.
+
+    Args:
+
+     - connection (sqlite3.Connection): Open archive.
+     - number (int): Id of the game.
+
+    Returns:
+
+     - BinaryGame | None: The game, None if there is no such game.
+    """
+    row = connection.execute('SELECT data FROM games WHERE id = ?', (number,)).fetchone()
+    return decode_game(row[0], 0)[0] if row else None
+
+def explore(connection: sqlite3.Connection, position: Position) -> list[dict[str, Any]]:
+    """Reads statistics of moves played in the position.
+
+    Args:
+
+     - connection (sqlite3.Connection): Open archive.
+     - position (Position): Explored position.
+
+    Returns:
+
+     - list[dict[str, Any]]: Move, its SAN, number of games and shares of white wins, draws and black wins in percent,
+     the most played first. Moves illegal in the position, left by hash collisions, are skipped.
+    """
+    legal = position.legal_moves()
+    statistics: list[dict[str, Any]] = []
+    for word, games, white, draws, black in connection.execute('SELECT move, games, white, draws, black FROM explorer '
+                                                               'WHERE hash = ? ORDER BY games DESC', (signed(position.hash),)):
+        move = WORD_MOVES[word]
+        if move not in legal:
+            continue
+        finished = white + draws + black
+        share = lambda count: 100 * count / finished if finished else 0.0
+        statistics.append({'move': move, 'san': position.san(move), 'games': games,
+                           'white': share(white), 'draws': share(draws), 'black': share(black)})
+    return statistics
+
+class ArchiveWriter:
+    """Background thread inserting queued games. Games queued while a transaction runs are inserted together in the next one.
+    """
+    def __init__(self, path: str) -> None:
+        """Constructor:
+
+        Args:
+
+         - path (str): Path of the database file, opened by the thread once the first games are queued.
+        """
+        self.path: str = path
+        self.queue: queue.Queue = queue.Queue()
+        self.thread: threading.Thread | None = None
+        self.inserted: int = 0
+        self.errors: int = 0
+
+    def submit(self, games: list[BinaryGame]) -> None:
+        """Queues the games for insertion, doesn't wait for the disk.
+
+        Args:
+
+         - games (list[BinaryGame]): Games to insert.
+        """
+        if not self.thread:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        self.queue.put(games)
+
+    def run(self) -> None:
+        """Thread inserting the queued games until None is queued. Failed batch is counted in errors and the thread
+        goes on, so flush doesn't wait for batches nobody inserts. Archive which can't be opened is tried again with the next batch.
+        """
+        connection: sqlite3.Connection | None = None
+        running = True
+        while running:
+            batches = [self.queue.get()]
+            games = len(batches[0] or [])
+            while games < BATCH_GAMES and batches[-1] is not None:
+                try:
+                    batches.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+                games += len(batches[-1] or [])
+            running = None not in batches
+            try:
+                if connection is None:
+                    connection = connect(self.path)
+                self.inserted += insert_games(connection, (game for batch in batches if batch for game in batch))
+            except Exception as error:
+                self.errors += 1
+                print(f'Archive insert failed: {error}', file=sys.stderr)
+            finally:
+                for _ in batches:
+                    self.queue.task_done()
+        if connection is not None:
+            connection.close()
+
+    def prepare(self) -> None:
+        """Opens the archive in the thread, which creates its tables or migrates them, without waiting for it.
+        """
+        self.submit([])
+
+    def flush(self) -> None:
+        """Waits until all queued games are inserted.
+        """
+        if self.thread:
+            self.queue.join()
+
+    def close(self) -> None:
+        """Inserts the queued games and ends the thread.
+        """
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+ARCHIVE = ArchiveWriter(default_path())
+
+def import_pgn(path: str, writer: ArchiveWriter, batch: int = BATCH_GAMES) -> tuple[int, int]:
+    """Reads the PGN file and queues its games in batches. Games with illegal moves or invalid FEN are skipped.
+
+    Args:
+
+     - path (str): Path of the PGN file.
+     - writer (ArchiveWriter): Writer inserting the games.
+     - batch (int, optional): Number of games queued together. Defaults to BATCH_GAMES.
+
+    Returns:
+
+     - tuple[int, int]: Number of queued and skipped games.
+    """
+    queued = skipped = 0
+    games: list[BinaryGame] = []
+    with open(path, encoding='utf-8', errors='replace') as pgn_file:
+        for game in read_games(pgn_file):
+            try:
+                games.append(BinaryGame.from_game(game))
+            except ValueError: # IllegalMoveError or invalid FEN tag
+                skipped += 1
+                continue
+            if len(games) >= batch:
+                writer.submit(games)
+                queued += len(games)
+                games = []
+    if games:
+        writer.submit(games)
+        queued += len(games)
+    return queued, skipped
+
+def main() -> None:
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description='SQLite archive of games indexed by position.')
+    parser.add_argument('command', choices=['import', 'find', 'explore'],
+                        help='import PGN file, find games reaching FEN or show moves played in it')
+    parser.add_argument('argument', help='PGN file to import or FEN to find or explore')
+    parser.add_argument('--db', default=default_path(), help='path of the archive')
+    parser.add_argument('--limit', type=int, default=20, help='maximum number of found games')
+    args = parser.parse_args()
+    if args.command == 'import':
+        started = time.perf_counter()
+        writer = ArchiveWriter(args.db)
+        _, skipped = import_pgn(args.argument, writer)
+        writer.close()
+        print(f'{writer.inserted} games imported, {skipped} skipped in {time.perf_counter() - started:.2f} s')
+        sys.exit(1 if writer.errors else 0)
+    try:
+        position = Position(args.argument)
+    except ValueError as error:
+        print(f'Invalid FEN: {error}', file=sys.stderr)
+        sys.exit(1)
+    connection = connect(args.db)
+    if args.command == 'explore':
+        for line in explore(connection, position):
+            print(f'{line['san']:<8} {line['games']:>8}  {line['white']:5.1f}% {line['draws']:5.1f}% {line['black']:5.1f}%')
+    else:
+        for game in find_games(connection, position, args.limit):
+            print(f'{game['id']:>8}  {game['white'] or '?'} - {game['black'] or '?'}  {game['result']}  {game['date'] or '?'}  ply {game['ply']}')
+    connection.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""Bulk PGN analysis pipeline. Splits the archive into chunks by byte offset and replays every game of every chunk through
+the headless rules core in a pool of processes. Illegal moves are flagged and each game gets its statistics and final FEN.
+Only a few chunks are in flight at once and their annotations are merged and written as they complete, so memory
+doesn't grow with the size of the archive.
+
+Usage:
+
+    python src/batch.py games.pgn [--workers N] [--chunks N] [--output annotations.jsonl]
+"""
+
+from concurrent.futures import ProcessPoolExecutor, Future
+from collections import deque
+from typing import Any, Callable, Iterator
+import argparse
+import json
+import time
+import os
+
+from rules import Position, IllegalMoveError
+from pgn import Game, read_games
+
+CHUNKS_IN_FLIGHT: int = 2
+CHUNK_BYTES: int = 4 * 1024 * 1024
+ILLEGAL_LISTED: int = 20
+COUNTERS: tuple[str, ...] = ('plies', 'captures', 'checks', 'castles', 'promotions', 'en_passant')
+
+def split_offsets(path: str, chunks: int) -> list[tuple[int, int]]:
+    """Splits the file into byte ranges starting at the beginning of a game. Game starts with a tag line preceded by an empty line.
+
+    Args:
+
+     - path (str): Path to the PGN file.
+     - chunks (int): Desired number of chunks.
+
+    Returns:
+
+     - list[tuple[int, int]]: List of (start, end) byte offsets covering whole file.
+    """
+    size = os.path.getsize(path)
+    boundaries: list[int] = [0]
+    with open(path, 'rb') as pgn_file:
+        for i in range(1, chunks):
+            offset = max(size * i // chunks, boundaries[-1])
+            pgn_file.seek(offset)
+            pgn_file.readline()
+            previous_blank = False
+            while True:
+                position = pgn_file.tell()
+                line = pgn_file.readline()
+                if not line:
+                    position = size
+                    break
+                if line.startswith(b'[') and previous_blank:
+                    break
+                previous_blank = not line.strip()
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+def read_lines(path: str, start: int, end: int) -> Iterator[str]:
+    """Reads decoded lines of the file between two byte offsets.
+
+    Args:
+
+     - path (str): Path to the PGN file.
+     - start (int): Offset of the first line.
+     - end (int): Offset after which reading stops.
+
+    Yields:
+
+     - Iterator[str]: Lines of the chunk.
+    """
+    with open(path, 'rb') as pgn_file:
+        pgn_file.seek(start)
+        offset = start
+        while offset < end:
+            line = pgn_file.readline()
+            if not line:
+                return
+            offset += len(line)
+            yield line.decode('utf-8', errors='replace')
+
+def analyse_game(game: Game) -> dict[str, Any]:
+    """Replays the game move by move and gathers its statistics.
+
+    Args:
+
+     - game (Game): Parsed game.
+
+    Returns:
+
+     - dict[str, Any]: Annotation of the game: players, counters, first illegal move, computed result and final FEN.
+    """
+    annotation: dict[str, Any] = {
+        'white': game.headers.get('White', '?'), 'black': game.headers.get('Black', '?'),
+        'result': game.result, 'plies': 0, 'captures': 0, 'checks': 0, 'castles': 0,
+        'promotions': 0, 'en_passant': 0, 'illegal_move': None,
+    }
+    try:
+        position = Position(game.start_fen)
+    except ValueError:
+        annotation['illegal_move'] = {'ply': 0, 'move': game.start_fen}
+        annotation['final_fen'] = None
+        return annotation
+    for ply, notation in enumerate(game.moves):
+        try:
+            move = position.parse_san(notation)
+        except IllegalMoveError:
+            annotation['illegal_move'] = {'ply': ply + 1, 'move': notation}
+            break
+        start, end, promotion = move
+        figure = position.board[start]
+        if position.board[end]:
+            annotation['captures'] += 1
+        elif figure in 'Pp' and end == position.en_passant:
+            annotation['captures'] += 1
+            annotation['en_passant'] += 1
+        if figure in 'Kk' and abs(end - start) == 2:
+            annotation['castles'] += 1
+        if promotion:
+            annotation['promotions'] += 1
+        position.push(move)
+        annotation['plies'] += 1
+        if position.in_check():
+            annotation['checks'] += 1
+    annotation['final_fen'] = position.fen()
+    if annotation['illegal_move'] is None:
+        computed = position.result()
+        annotation['result_mismatch'] = computed != '*' and computed != game.result
+    return annotation
+
+def analyse_chunk(path: str, start: int, end: int) -> list[dict[str, Any]]:
+    """Worker task analysing all games of the chunk.
+
+    Args:
+
+     - path (str): Path to the PGN file.
+     - start (int): Offset of the chunk.
+     - end (int): End offset of the chunk.
+
+    Returns:
+
+     - list[dict[str, Any]]: Annotations of the games in order of appearance.
+    """
+    return [analyse_game(game) for game in read_games(read_lines(path, start, end))]
+
+def new_summary() -> dict[str, Any]:
+    """Creates empty summary report filled by merge.
+
+    Returns:
+
+     - dict[str, Any]: Summary with zero totals.
+    """
+    return {'games': 0, **{key: 0 for key in COUNTERS}, 'results': {}, 'result_mismatches': 0,
+            'illegal_games': 0, 'first_illegal_games': []}
+
+def merge(summary: dict[str, Any], annotations: list[dict[str, Any]]) -> None:
+    """Adds annotations of the next games into the summary report. Only the first ILLEGAL_LISTED games with illegal
+    moves are listed, the rest is counted.
+
+    Args:
+
+     - summary (dict[str, Any]): Summary from new_summary, updated in place.
+     - annotations (list[dict[str, Any]]): Annotations of the games following the already merged ones.
+    """
+    for annotation in annotations:
+        summary['games'] += 1
+        for key in COUNTERS:
+            summary[key] += annotation[key]
+        summary['results'][annotation['result']] = summary['results'].get(annotation['result'], 0) + 1
+        summary['result_mismatches'] += int(annotation.get('result_mismatch', False))
+        if annotation['illegal_move']:
+            summary['illegal_games'] += 1
+            if len(summary['first_illegal_games']) < ILLEGAL_LISTED:
+                summary['first_illegal_games'].append({'game': summary['games'], **annotation['illegal_move']})
+
+def run(path: str, workers: int | None = None, chunks: int | None = None,
+        sink: Callable[[list[dict[str, Any]]], None] | None = None) -> dict[str, Any]:
+    """Runs the whole pipeline: splits the file, fans the chunks out to the process pool and merges results.
+    At most CHUNKS_IN_FLIGHT chunks per worker are submitted at once, completed chunks are merged in file order.
+
+    Args:
+
+     - path (str): Path to the PGN file.
+     - workers (int | None, optional): Number of worker processes. Defaults to None which means number of CPUs.
+     - chunks (int | None, optional): Number of chunks. Defaults to None which means four chunks per worker,
+     more for large files so no chunk exceeds CHUNK_BYTES.
+     - sink (Callable[[list[dict[str, Any]]], None] | None, optional): Receives annotations of every chunk in file order,
+     e.g. to write them. Defaults to None.
+
+    Returns:
+
+     - dict[str, Any]: The summary report.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = iter(split_offsets(path, chunks or max(workers * 4, os.path.getsize(path) // CHUNK_BYTES + 1)))
+    started = time.perf_counter()
+    summary = new_summary()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures: deque[Future] = deque()
+        while True:
+            while len(futures) < workers * CHUNKS_IN_FLIGHT and (chunk := next(ranges, None)):
+                futures.append(executor.submit(analyse_chunk, path, *chunk))
+            if not futures:
+                break
+            annotations = futures.popleft().result()
+            merge(summary, annotations)
+            if sink:
+                sink(annotations)
+    summary['seconds'] = time.perf_counter() - started
+    summary['games_per_second'] = summary['games'] / summary['seconds'] if summary['seconds'] else 0.0
+    summary['moves_per_second'] = summary['plies'] / summary['seconds'] if summary['seconds'] else 0.0
+    return summary
+
+def main() -> None:
+    """Command line entry point printing the summary report and throughput.
+    """
+    parser = argparse.ArgumentParser(description='Validate and annotate PGN archive.')
+    parser.add_argument('path', help='PGN file to analyse')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--chunks', type=int, default=None, help='number of chunks the file is split into')
+    parser.add_argument('--output', default=None, help='JSON lines file for per game annotations')
+    args = parser.parse_args()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            summary = run(args.path, args.workers, args.chunks,
+                          lambda annotations: output.writelines(json.dumps(annotation) + '\n' for annotation in annotations))
+    else:
+        summary = run(args.path, args.workers, args.chunks)
+    illegal = summary.pop('first_illegal_games')
+    print(json.dumps(summary, indent=2))
+    for entry in illegal:
+        print(f'Illegal move in game {entry['game']} at ply {entry['ply']}: {entry['move']}')
+    print(f'{summary['games_per_second']:.1f} games/sec, {summary['moves_per_second']:.1f} moves/sec')
+
+if __name__ == '__main__':
+    main()
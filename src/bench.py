@@ -0,0 +1,188 @@
+"""Microbenchmarks of the rules and rendering layers on a fixed set of positions. Results are saved as versioned JSON
+baseline and later runs can be compared against it, failing when any benchmark got slower than the threshold allows.
+
+The GUI rules (piece.py and Board) are measured on a headless board, which holds figures in plain cells without any widgets.
+
+Usage:
+
+    python src/bench.py [--filter movegen] [--save baseline.json] [--compare baseline.json --threshold 0.15]
+"""
+
+from typing import Any, Callable
+import argparse
+import platform
+import json
+import time
+import sys
+
+from tools import get_from_config
+from themes import SPRITES
+from headless import headless_board
+from cell import Board
+import rules
+import piece
+
+BASELINE_VERSION: int = 1
+
+POSITIONS: list[str] = [
+    rules.STARTING_FEN,
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+    'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+    'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+    'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+    '6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1',
+]
+
+def figures(board: Board, kind: type[piece.Piece] | None = None) -> list[piece.Piece]:
+    """Lists figures on the board.
+
+    Args:
+
+     - board (Board): Headless board.
+     - kind (type[piece.Piece] | None, optional): Only figures of this class. Defaults to None.
+
+    Returns:
+
+     - list[piece.Piece]: Figures in board order.
+    """
+    return [cell.figure for row in board.board for cell in row if cell.figure and (kind is None or type(cell.figure) is kind)]
+
+def measure(function: Callable[[], Any], repeat: int, min_time: float) -> dict[str, Any]:
+    """Times the function like timeit: number of calls per round is raised until the round takes min_time,
+    the best of the rounds is reported.
+
+    Args:
+
+     - function (Callable[[], Any]): Benchmarked function.
+     - repeat (int): Number of timed rounds.
+     - min_time (float): Minimum duration of one round in seconds.
+
+    Returns:
+
+     - dict[str, Any]: Best, median time per call in microseconds and number of calls per round.
+    """
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed * 4 < min_time else 1 + int(min_time / max(elapsed, 1e-9))
+    rounds = [elapsed]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        rounds.append(time.perf_counter() - started)
+    per_call = sorted(elapsed / number * 1e6 for elapsed in rounds)
+    return {'best_us': per_call[0], 'median_us': per_call[len(per_call) // 2], 'number': number}
+
+def benchmarks() -> dict[str, Callable[[], Any]]:
+    """Prepares all benchmarks. Every benchmark processes the whole position set once per call.
+
+    Returns:
+
+     - dict[str, Callable[[], Any]]: Benchmarks keyed by name.
+    """
+    boards = [headless_board(fen) for fen in POSITIONS]
+    positions = [rules.Position(fen) for fen in POSITIONS]
+    legal_moves = [position.legal_moves() for position in positions]
+    candidate_moves = [[(figure.position, move) for figure in figures(board) if figure.color == board.current_turn
+                        for move in figure.check_possible_moves(board.current_turn)] for board in boards]
+    theme, size = str(get_from_config('theme')), int(get_from_config('size')) - 10
+    suite: dict[str, Callable[[], Any]] = {}
+    for kind in piece.FIGURES.values():
+        pieces = [figure for board in boards for figure in figures(board, kind)]
+        suite[f'movegen.{kind.__name__}'] = lambda pieces=pieces: [figure.check_possible_moves(figure.color) for figure in pieces]
+    suite['movegen.rules'] = lambda: [position.legal_moves() for position in positions]
+    suite['board.check_check'] = lambda: [board.check_check(start, end) for board, moves in zip(boards, candidate_moves) for start, end in moves]
+    suite['board.is_under_attack'] = lambda: [board.is_under_attack((row, col), color) for board in boards
+                                              for row in range(8) for col in range(8) for color in 'wb']
+    suite['board.is_game_over'] = lambda: [board.is_game_over() for board in boards]
+    suite['notation.san'] = lambda: [position.san(move) for position, moves in zip(positions, legal_moves) for move in moves]
+    suite['render.headless_board'] = lambda: [headless_board(fen) for fen in POSITIONS]
+    suite['render.load_theme'] = lambda: SPRITES.load_theme(theme, size)
+    return suite
+
+def run(pattern: str = '', repeat: int = 5, min_time: float = 0.1) -> dict[str, Any]:
+    """Runs benchmarks matching the pattern.
+
+    Args:
+
+     - pattern (str, optional): Substring of benchmark names to run. Defaults to ''.
+     - repeat (int, optional): Number of timed rounds. Defaults to 5.
+     - min_time (float, optional): Minimum duration of one round in seconds. Defaults to 0.1.
+
+    Returns:
+
+     - dict[str, Any]: Baseline with version, environment and results keyed by benchmark name.
+    """
+    results: dict[str, Any] = {}
+    for name, function in benchmarks().items():
+        if pattern in name:
+            results[name] = measure(function, repeat, min_time)
+            print(f'{name:<28} {results[name]['best_us']:>12.1f} us {results[name]['median_us']:>12.1f} us', file=sys.stderr)
+    return {'version': BASELINE_VERSION, 'python': platform.python_version(), 'platform': platform.platform(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'positions': len(POSITIONS), 'results': results}
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Compares best times with the baseline.
+
+    Args:
+
+     - current (dict[str, Any]): Results of this run.
+     - baseline (dict[str, Any]): Loaded baseline.
+     - threshold (float): Allowed slowdown, 0.15 means 15 %.
+
+    Raises:
+
+     - ValueError: If the baseline was saved by a different version of the suite.
+
+    Returns:
+
+     - list[str]: Names of benchmarks slower than allowed.
+    """
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError(f'Baseline version {baseline.get('version')} doesn`t match suite version {BASELINE_VERSION}')
+    regressions: list[str] = []
+    print(f'{'benchmark':<28} {'baseline us':>12} {'current us':>12} {'change':>8}')
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            print(f'{name:<28} {'-':>12} {result['best_us']:>12.1f} {'new':>8}')
+            continue
+        before = baseline['results'][name]['best_us']
+        change = result['best_us'] / before - 1
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print(f'{name:<28} {before:>12.1f} {result['best_us']:>12.1f} {change:>+7.1%}{' REGRESSION' if regressed else ''}')
+    return regressions
+
+def main() -> None:
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description='Microbenchmarks of the rules and rendering layers.')
+    parser.add_argument('--filter', default='', help='run only benchmarks containing this text')
+    parser.add_argument('--repeat', type=int, default=5, help='timed rounds per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.1, help='minimum duration of one round in seconds')
+    parser.add_argument('--save', default=None, help='save results as baseline JSON')
+    parser.add_argument('--compare', default=None, help='baseline JSON to compare with, exits with 1 on regression')
+    parser.add_argument('--threshold', type=float, default=0.15, help='allowed slowdown against the baseline')
+    args = parser.parse_args()
+    current = run(args.filter, args.repeat, args.min_time)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as output:
+            json.dump(current, output, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f'{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}: {', '.join(regressions)}')
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
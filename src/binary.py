@@ -0,0 +1,348 @@
+"""Compact binary format of games for archival storage. Archive starts with magic bytes and version, followed by games:
+
+    flags        1 byte, bit 0 set when moves are stored as indexes
+    headers      varint count, then tag (1 byte index in TAGS, 0 followed by varint length and UTF-8 name) and value
+                 (varint length and UTF-8), starting position is the FEN tag like in PGN
+    moves        varint count, then 16-bit little endian words (from | to << 6 | promotion << 12)
+                 or single bytes with index of the move in the legal moves of the position
+
+Words decode without move generation, so loading is fast, indexes take half the space but every move has to be generated.
+
+Usage:
+
+    python src/binary.py games.pgn games.chb [--index]
+    python src/binary.py games.chb games.pgn
+"""
+
+from typing import Iterable, Iterator
+from array import array
+import argparse
+import time
+import sys
+
+from rules import Position, Move, IllegalMoveError, STARTING_FEN
+from pgn import Game, read_games, write_game
+
+MAGIC: bytes = b'CHSB'
+VERSION: int = 1
+INDEXED: int = 1
+PROMOTIONS: str = ' nbrq'
+TAGS: list[str] = ['Event', 'Site', 'Date', 'Round', 'White', 'Black', 'Result', 'FEN', 'SetUp', 'ECO', 'Opening', 'Variation',
+                   'WhiteElo', 'BlackElo', 'TimeControl', 'Termination', 'PlyCount', 'EventDate', 'Annotator', 'Mode']
+TAG_CODES: dict[str, int] = {tag: code for code, tag in enumerate(TAGS, start=1)}
+WORD_MOVES: list[Move] = [(word & 63, word >> 6 & 63, PROMOTIONS[word >> 12].strip()) for word in range(len(PROMOTIONS) << 12)]
+
+class BinaryGame:
+    """Class holding single game: PGN headers and moves as tuples of the rules core.
+    """
+    __slots__ = ('headers', 'moves')
+
+    def __init__(self, headers: dict[str, str] | None = None, moves: list[Move] | None = None) -> None:
+        """Constructor:
+
+        Args:
+
+         - headers (dict[str, str] | None, optional): PGN tag pairs. Defaults to None.
+         - moves (list[Move] | None, optional): Moves from the starting position. Defaults to None.
+        """
+        self.headers: dict[str, str] = headers if headers is not None else {}
+        self.moves: list[Move] = moves if moves is not None else []
+
+    @property
+    def start_fen(self) -> str:
+        """Starting position of the game taken from FEN tag.
+
+        Returns:
+
+         - str: FEN of the starting position.
+        """
+        return self.headers.get('FEN', STARTING_FEN)
+
+    @classmethod
+    def from_game(cls, game: Game) -> 'BinaryGame':
+        """Converts PGN game.
+
+        Args:
+
+         - game (Game): Game with moves in SAN.
+
+        Raises:
+
+         - IllegalMoveError: If any of the moves is illegal.
+
+        Returns:
+
+         - BinaryGame: Game with the same headers.
+        """
+        position = Position(game.start_fen)
+        return cls(dict(game.headers), [position.push_san(move) for move in game.moves])
+
+    def to_game(self) -> Game:
+        """Converts into PGN game, every move is validated.
+
+        Raises:
+
+         - IllegalMoveError: If any of the moves is illegal.
+
+        Returns:
+
+         - Game: Game with moves in SAN.
+        """
+        position = Position(self.start_fen)
+        moves: list[str] = []
+        for move in self.moves:
+            if move not in position.legal_moves():
+                raise IllegalMoveError(f'Illegal move {position.uci(move)} in {position.fen()}')
+            moves.append(position.san(move))
+            position.push(move)
+        return Game(dict(self.headers), moves)
+
+def encode_move(move: Move) -> int:
+    """Packs the move into 16-bit word.
+
+    Args:
+
+     - move (Move): Move to pack.
+
+    Returns:
+
+     - int: from | to << 6 | promotion << 12.
+    """
+    return move[0] | move[1] << 6 | PROMOTIONS.index(move[2] or ' ') << 12
+
+def write_varint(output: bytearray, value: int) -> None:
+    """Appends unsigned integer in 7 bits per byte, the highest bit marks following byte.
+
+    Args:
+
+     - output (bytearray): Buffer to append to.
+     - value (int): Non-negative number.
+    """
+    while value > 127:
+        output.append(value & 127 | 128)
+        value >>= 7
+    output.append(value)
+
+def read_varint(data: bytes | memoryview, offset: int) -> tuple[int, int]:
+    """Reads unsigned integer written by write_varint.
+
+    Args:
+
+     - data (bytes | memoryview): Encoded data.
+     - offset (int): Position of the first byte.
+
+    Returns:
+
+     - tuple[int, int]: Value and offset after it.
+    """
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 127) << shift
+        if byte < 128:
+            return value, offset
+        shift += 7
+
+def write_text(output: bytearray, text: str) -> None:
+    """Appends length prefixed UTF-8 string.
+
+    Args:
+
+     - output (bytearray): Buffer to append to.
+     - text (str): String to write.
+    """
+    encoded = text.encode('utf-8')
+    write_varint(output, len(encoded))
+    output += encoded
+
+def read_text(data: bytes | memoryview, offset: int) -> tuple[str, int]:
+    """Reads string written by write_text.
+
+    Args:
+
+     - data (bytes | memoryview): Encoded data.
+     - offset (int): Position of the length.
+
+    Returns:
+
+     - tuple[str, int]: String and offset after it.
+    """
+    length, offset = read_varint(data, offset)
+    return bytes(data[offset:offset + length]).decode('utf-8'), offset + length
+
+def encode_game(game: BinaryGame, output: bytearray, indexed: bool = False) -> None:
+    """Appends encoded game to the buffer.
+
+    Args:
+
+     - game (BinaryGame): Game to encode.
+     - output (bytearray): Buffer to append to.
+     - indexed (bool, optional): Store indexes of moves in legal moves instead of words. Defaults to False.
+
+    Raises:
+
+     - IllegalMoveError: If indexed and any of the moves is illegal.
+    """
+    output.append(INDEXED if indexed else 0)
+    write_varint(output, len(game.headers))
+    for tag, value in game.headers.items():
+        if tag in TAG_CODES:
+            output.append(TAG_CODES[tag])
+        else:
+            output.append(0)
+            write_text(output, tag)
+        write_text(output, value)
+    write_varint(output, len(game.moves))
+    if not indexed:
+        words = array('H', map(encode_move, game.moves))
+        if sys.byteorder == 'big':
+            words.byteswap()
+        output += words.tobytes()
+        return
+    position = Position(game.start_fen)
+    for move in game.moves:
+        try:
+            output.append(position.legal_moves().index(move))
+        except ValueError:
+            raise IllegalMoveError(f'Illegal move {position.uci(move)} in {position.fen()}')
+        position.push(move)
+
+def decode_game(data: bytes | memoryview, offset: int) -> tuple[BinaryGame, int]:
+    """Reads one game written by encode_game.
+
+    Args:
+
+     - data (bytes | memoryview): Encoded data.
+     - offset (int): Position of the game.
+
+    Raises:
+
+     - ValueError: If the data is malformed.
+
+    Returns:
+
+     - tuple[BinaryGame, int]: Game and offset after it.
+    """
+    try:
+        flags = data[offset]
+        count, offset = read_varint(data, offset + 1)
+        headers: dict[str, str] = {}
+        for _ in range(count):
+            code = data[offset]
+            if code:
+                tag, offset = TAGS[code - 1], offset + 1
+            else:
+                tag, offset = read_text(data, offset + 1)
+            headers[tag], offset = read_text(data, offset)
+        plies, offset = read_varint(data, offset)
+        end = offset + (plies if flags & INDEXED else plies * 2)
+        if end > len(data):
+            raise ValueError('Truncated moves')
+        if flags & INDEXED:
+            position = Position(headers.get('FEN', STARTING_FEN))
+            moves: list[Move] = []
+            for index in data[offset:offset + plies]:
+                moves.append(position.legal_moves()[index])
+                position.push(moves[-1])
+            return BinaryGame(headers, moves), end
+        words = array('H', bytes(data[offset:end]))
+        if sys.byteorder == 'big':
+            words.byteswap()
+        return BinaryGame(headers, [WORD_MOVES[word] for word in words]), end
+    except IndexError:
+        raise ValueError('Malformed game')
+
+def encode_games(games: Iterable[BinaryGame], indexed: bool = False) -> bytes:
+    """Encodes the games into archive.
+
+    Args:
+
+     - games (Iterable[BinaryGame]): Games to encode.
+     - indexed (bool, optional): Store indexes of moves in legal moves instead of words. Defaults to False.
+
+    Returns:
+
+     - bytes: Archive with magic bytes and version.
+    """
+    output = bytearray(MAGIC)
+    output.append(VERSION)
+    for game in games:
+        encode_game(game, output, indexed)
+    return bytes(output)
+
+def decode_games(data: bytes) -> Iterator[BinaryGame]:
+    """Decodes games of the archive one by one.
+
+    Args:
+
+     - data (bytes): Archive written by encode_games.
+
+    Raises:
+
+     - ValueError: If the data isn't an archive of this version or it's malformed.
+
+    Yields:
+
+     - Iterator[BinaryGame]: Games in stored order.
+    """
+    if data[:len(MAGIC)] != MAGIC or len(data) <= len(MAGIC) or data[len(MAGIC)] != VERSION:
+        raise ValueError(f'Not a binary game archive of version {VERSION}')
+    view = memoryview(data)
+    offset = len(MAGIC) + 1
+    while offset < len(data):
+        game, offset = decode_game(view, offset)
+        yield game
+
+def convert(source: str, target: str, indexed: bool = False) -> int:
+    """Converts PGN file into binary archive or back, direction is given by the extension of the source.
+
+    Args:
+
+     - source (str): Path of .pgn or binary archive.
+     - target (str): Path of the output.
+     - indexed (bool, optional): Store indexes of moves in legal moves instead of words. Defaults to False.
+
+    Raises:
+
+     - IllegalMoveError: If any game contains illegal move.
+     - ValueError: If the binary archive is malformed.
+
+    Returns:
+
+     - int: Number of converted games.
+    """
+    if source.lower().endswith('.pgn'):
+        with open(source, encoding='utf-8', errors='replace') as pgn_file:
+            games = [BinaryGame.from_game(game) for game in read_games(pgn_file)]
+        with open(target, 'wb') as output:
+            output.write(encode_games(games, indexed))
+        return len(games)
+    with open(source, 'rb') as archive:
+        data = archive.read()
+    count = 0
+    with open(target, 'w', encoding='utf-8') as output:
+        for game in decode_games(data):
+            output.write(write_game(game.to_game()))
+            output.write('\n')
+            count += 1
+    return count
+
+def main() -> None:
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description='Converts PGN into compact binary archive and back.')
+    parser.add_argument('source', help='.pgn file or binary archive')
+    parser.add_argument('target', help='output file')
+    parser.add_argument('--index', action='store_true', help='store moves as indexes in legal moves, half the size but slower')
+    args = parser.parse_args()
+    started = time.perf_counter()
+    try:
+        count = convert(args.source, args.target, args.index)
+    except ValueError as error:
+        print(f'Conversion failed: {error}', file=sys.stderr)
+        sys.exit(1)
+    print(f'{count} games converted in {time.perf_counter() - started:.2f} s')
+
+if __name__ == '__main__':
+    main()
@@ -2,15 +2,21 @@
 """
 
 import customtkinter as ctk
-from typing import Any
+from typing import Any, Callable
+import time
 
 from notifications import Notification
 from properties import COLOR
+from style import STYLE
+from instrumentation import PROBES, LATENCY
 from menus import MovesRecord
 
 from tools import get_from_config
 
 import piece
+import rules
+import pgn
+import replay
 
 class Cell(ctk.CTkLabel):
     """Class handling actions in specific cells.
@@ -44,16 +50,33 @@ class Cell(ctk.CTkLabel):
         self.pack(side=ctk.LEFT, padx=2, pady=2)
 
     def on_click(self, event: Any) -> None:
-        """Handles clicks by calling board functions handling game logic.
+        """Handles clicks by calling board functions handling game logic. When latency is measured, the time until
+        the board is redrawn is recorded.
 
         Args:
 
          - event (Any): Event type. Doesn't matter but is required parameter by customtkinter.
         """
+        started = time.perf_counter() if LATENCY.enabled else 0.0
         if self.figure and not self.board.clicked_figure:
+            kind = 'click_to_highlight'
             self.board.handle_clicks(self.figure, self.position)
         else:
+            kind = 'move_to_render'
             self.board.handle_move(self.position)
+        if started:
+            self.after_idle(self.record_latency, kind, started)
+
+    def record_latency(self, kind: str, started: float) -> None:
+        """Flushes pending redraws and records latency of the click.
+
+        Args:
+
+         - kind (str): 'click_to_highlight' or 'move_to_render'.
+         - started (float): Value of time.perf_counter taken when the click was handled.
+        """
+        self.update_idletasks()
+        LATENCY.record(kind, started)
 
     def update(self) -> None:
         """Updates the asset shown on a cell.
@@ -80,11 +103,18 @@ class Board(ctk.CTkFrame):
          - size (int): Size n of the n x n board.
         """
         super().__init__(master, fg_color=COLOR.DARK_TEXT, corner_radius=0)
+        STYLE.subscribe(self, fg_color='DARK_TEXT')
+        STYLE.listen(self.recolor)
         self.master: Any = master
         self.loading_screen: ctk.CTkLabel | None = None
         self.font_name: str = str(get_from_config('font_name'))
         self.loading_animation(0)
         self.size: int = size
+        self.position: rules.Position = rules.Position()
+        self.redo_moves: list[rules.Move] = []
+        self.replay: replay.GameReplay | None = None
+        self.position_listeners: list[Callable[[rules.Position], None]] = []
+        self.candidates: list[Cell] = []
         self.board: list[list[Cell]] = self.create_board()
         self.previous_click: tuple[None, None] | tuple[int, int] = (None, None)
         self.highlighted: list[Cell] = []
@@ -93,7 +123,6 @@ class Board(ctk.CTkFrame):
         self.current_turn: str = 'w'
         self.notification: None | Notification = None
         self.moves_record: MovesRecord = moves_record
-        self.capture: bool = False
 
     @staticmethod
     def determine_tile_color(pos: tuple[int, int]) -> str:
@@ -112,21 +141,52 @@ class Board(ctk.CTkFrame):
         else:
             return COLOR.TILE_2
 
+    @staticmethod
+    def highlight_color(pos: tuple[int, int]) -> str:
+        """Static method to determine color of the highlighted cell.
+
+        Args:
+
+         - pos (tuple[int, int]): Position of the cell on the board.
+
+        Returns:
+
+         - str: Highlight color matching color of the cell.
+        """
+        return COLOR.HIGH_TILE_1 if (pos[0] + pos[1]) % 2 == 0 else COLOR.HIGH_TILE_2
+
+    def recolor(self, changed: set[str]) -> None:
+        """Recolors cells after palette change, highlighted cells keep their highlight.
+
+        Args:
+
+         - changed (set[str]): Names of changed colors.
+        """
+        if not changed & {'TILE_1', 'TILE_2', 'HIGH_TILE_1', 'HIGH_TILE_2', 'BACKGROUND'}:
+            return
+        for row in self.board:
+            for cell in row:
+                color = self.highlight_color(cell.position) if cell in self.highlighted else self.determine_tile_color(cell.position)
+                cell.configure(fg_color=color, bg_color=COLOR.BACKGROUND)
+
     def create_outline_l_r_t(self) -> None:
         """Creates outline of the board.
         """
-        ctk.CTkLabel(self, text=f' ', font=ctk.CTkFont(self.font_name, self.size//3), text_color=COLOR.DARK_TEXT).pack(padx=10, pady=1)
+        STYLE.subscribe(ctk.CTkLabel(self, text=f' ', font=ctk.CTkFont(self.font_name, self.size//3), text_color=COLOR.DARK_TEXT),
+                        text_color='DARK_TEXT').pack(padx=10, pady=1)
         new_frame = ctk.CTkFrame(self, fg_color=COLOR.DARK_TEXT, corner_radius=0)
-        new_frame.pack(side=ctk.LEFT, padx=0, pady=0, fill=ctk.Y)
+        STYLE.subscribe(new_frame, fg_color='DARK_TEXT').pack(side=ctk.LEFT, padx=0, pady=0, fill=ctk.Y)
         for i in range(8):
-            ctk.CTkLabel(new_frame, text=f' {i+1}', font=ctk.CTkFont(self.font_name, self.size//3), fg_color=COLOR.DARK_TEXT, anchor=ctk.E).pack(side=ctk.TOP, padx=10, pady=0, expand=True)
+            STYLE.subscribe(ctk.CTkLabel(new_frame, text=f' {i+1}', font=ctk.CTkFont(self.font_name, self.size//3), fg_color=COLOR.DARK_TEXT, anchor=ctk.E),
+                            fg_color='DARK_TEXT').pack(side=ctk.TOP, padx=10, pady=0, expand=True)
         ctk.CTkLabel(new_frame, text='\n', font=ctk.CTkFont(self.font_name, 22)).pack(side=ctk.BOTTOM, padx=0, pady=0)
         new_frame = ctk.CTkFrame(self, fg_color=COLOR.DARK_TEXT, corner_radius=0)
-        new_frame.pack(side=ctk.RIGHT, padx=0, pady=0, fill=ctk.Y)
-        ctk.CTkLabel(new_frame, text='  ', font=ctk.CTkFont(self.font_name, self.size//3), text_color=COLOR.DARK_TEXT, fg_color=COLOR.DARK_TEXT).pack(padx=10, pady=1)
+        STYLE.subscribe(new_frame, fg_color='DARK_TEXT').pack(side=ctk.RIGHT, padx=0, pady=0, fill=ctk.Y)
+        STYLE.subscribe(ctk.CTkLabel(new_frame, text='  ', font=ctk.CTkFont(self.font_name, self.size//3), text_color=COLOR.DARK_TEXT, fg_color=COLOR.DARK_TEXT),
+                        text_color='DARK_TEXT', fg_color='DARK_TEXT').pack(padx=10, pady=1)
 
     def create_board(self) -> list[list[Cell]]:
-        """Creates a board filled with colored cells. Uses prepared dictionary of the correct figures placement to place the Figures.
+        """Creates a board filled with colored cells. Figures are placed according to the headless position.
 
         Returns:
 
@@ -135,35 +195,263 @@ class Board(ctk.CTkFrame):
         self.create_outline_l_r_t()
         board: list[list[Cell]] = []
         board_frame = ctk.CTkFrame(self, corner_radius=0, fg_color=COLOR.DARK_TEXT)
-        board_frame.pack(side=ctk.TOP, padx=0, pady=0)
-        piece_positions = {
-            (0, 0): piece.Rook('b', self, (0, 0)), (0, 7): piece.Rook('b', self, (0, 7)),
-            (7, 0): piece.Rook('w', self, (7, 0)), (7, 7): piece.Rook('w', self, (7, 7)),
-            (0, 1): piece.Knight('b', self, (0, 1)), (0, 6): piece.Knight('b', self, (0, 6)),
-            (7, 1): piece.Knight('w', self, (7, 1)), (7, 6): piece.Knight('w', self, (7, 6)),
-            (0, 2): piece.Bishop('b', self, (0, 2)), (0, 5): piece.Bishop('b', self, (0, 5)),
-            (7, 2): piece.Bishop('w', self, (7, 2)), (7, 5): piece.Bishop('w', self, (7, 5)),
-            (0, 3): piece.Queen('b', self, (0, 3)), (7, 3): piece.Queen('w', self, (7, 3)),
-            (0, 4): piece.King('b', self, (0, 4)), (7, 4): piece.King('w', self, (7, 4))
-        }
+        STYLE.subscribe(board_frame, fg_color='DARK_TEXT').pack(side=ctk.TOP, padx=0, pady=0)
         for i in range(8):
             row = []
             new_frame = ctk.CTkFrame(board_frame, fg_color=COLOR.DARK_TEXT)
-            new_frame.pack(padx=0, pady=0)
+            STYLE.subscribe(new_frame, fg_color='DARK_TEXT').pack(padx=0, pady=0)
             for j in range(8):
                 if self.loading_screen:
                     self.loading_screen.lift()
                 color = self.determine_tile_color((i, j))
-                figure = piece_positions.get((i, j)) if (i, j) in piece_positions else (piece.Pawn('b' if i == 1 else 'w', self, (i, j), self.notation_promotion) if i in [1, 6] else None)
+                figure = self.create_figure(self.position.board[i * 8 + j], (i, j))
                 cell = Cell(new_frame, figure, (i, j), color, self)
                 row.append(cell)
             board.append(row)
         new_frame = ctk.CTkFrame(self, fg_color=COLOR.DARK_TEXT, corner_radius=0)
-        new_frame.pack(padx=2, pady=2, fill=ctk.X)
+        STYLE.subscribe(new_frame, fg_color='DARK_TEXT').pack(padx=2, pady=2, fill=ctk.X)
         for letter in ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']:
-            ctk.CTkLabel(new_frame, text=letter, font=ctk.CTkFont(self.font_name, self.size//3), fg_color=COLOR.DARK_TEXT).pack(side=ctk.LEFT, padx=0, pady=0, expand=True)
+            STYLE.subscribe(ctk.CTkLabel(new_frame, text=letter, font=ctk.CTkFont(self.font_name, self.size//3), fg_color=COLOR.DARK_TEXT),
+                            fg_color='DARK_TEXT').pack(side=ctk.LEFT, padx=0, pady=0, expand=True)
         return board
 
+    @staticmethod
+    def figure_letter(figure: piece.Piece | None) -> str:
+        """Returns FEN letter of the figure.
+
+        Args:
+
+         - figure (piece.Piece | None): Figure from the cell.
+
+        Returns:
+
+         - str: FEN letter, upper case for white. Empty string for empty cell.
+        """
+        if not figure:
+            return ''
+        letter = next(key for key, value in piece.FIGURES.items() if type(figure) is value)
+        return letter if figure.color == 'w' else letter.lower()
+
+    def create_figure(self, letter: str, position: tuple[int, int]) -> piece.Piece | None:
+        """Creates figure from its FEN letter. Flags used by castling and en passant are taken from the headless position.
+
+        Args:
+
+         - letter (str): FEN letter of the figure, upper case for white. Empty string for empty cell.
+         - position (tuple[int, int]): Position of the figure on the board.
+
+        Returns:
+
+         - piece.Piece | None: New figure or None for empty cell.
+        """
+        if not letter:
+            return None
+        color = 'w' if letter.isupper() else 'b'
+        figure: piece.Piece
+        if letter.upper() == 'P':
+            figure = piece.Pawn(color, self, position, self.notation_promotion)
+        else:
+            figure = piece.FIGURES[letter.upper()](color, self, position)
+        self.set_flags(figure)
+        return figure
+
+    def set_flags(self, figure: piece.Piece) -> None:
+        """Sets first_move and moved_by_two flags of the figure from castling rights and en passant square of the headless position.
+
+        Args:
+
+         - figure (piece.Piece): Figure placed on the board.
+        """
+        position = figure.position
+        row = 7 if figure.color == 'w' else 0
+        if isinstance(figure, piece.Pawn):
+            figure.first_move = position[0] == (6 if figure.color == 'w' else 1)
+            figure.can_en_passant = False
+            figure.moved_by_two = False
+            en_passant = self.position.en_passant
+            if en_passant != -1:
+                pawn_row = en_passant // 8 + (1 if en_passant // 8 == 2 else -1)
+                figure.moved_by_two = (pawn_row, en_passant % 8) == position
+            return
+        rights = ''.join(right.upper() for right in self.position.castling if right.isupper() == (figure.color == 'w'))
+        if isinstance(figure, piece.King):
+            figure.first_move = position == (row, 4) and bool(rights)
+        elif isinstance(figure, piece.Rook):
+            figure.first_move = (position == (row, 7) and 'K' in rights) or (position == (row, 0) and 'Q' in rights)
+
+    def sync_with_position(self) -> None:
+        """Makes the board match the headless position. Only cells whose figure changed get a new figure,
+        flags of the others are refreshed and the changed cells are repainted once at the end.
+        """
+        self.remove_highlights()
+        self.clicked_figure = None
+        self.previous_coords = None
+        self.current_turn = self.position.turn
+        changed: list[Cell] = []
+        for row in self.board:
+            for cell in row:
+                letter = self.position.board[rules.to_square(cell.position)]
+                if self.figure_letter(cell.figure) != letter:
+                    cell.figure = self.create_figure(letter, cell.position)
+                    changed.append(cell)
+                elif cell.figure:
+                    cell.figure.position = cell.position
+                    self.set_flags(cell.figure)
+        for cell in changed:
+            cell.update()
+        self.notify_position()
+
+    def show_candidates(self, moves: list[tuple[int, int]]) -> None:
+        """Marks target cells of candidate moves with their rank, previous marks are removed.
+
+        Args:
+
+         - moves (list[tuple[int, int]]): Start and target squares of the candidate moves, the best first.
+        """
+        for cell in self.candidates:
+            cell.configure(text='')
+        self.candidates = []
+        ranks: dict[int, list[str]] = {}
+        for rank, move in enumerate(moves, start=1):
+            ranks.setdefault(move[1], []).append(str(rank))
+        for square, labels in ranks.items():
+            row, col = rules.to_coords(square)
+            cell = self.board[row][col]
+            cell.configure(text=','.join(labels), text_color=COLOR.TEXT, font=ctk.CTkFont(self.font_name, self.size // 3))
+            self.candidates.append(cell)
+
+    def notify_position(self) -> None:
+        """Passes the headless position to listeners after it changed, e.g. to the analysis pane.
+        """
+        for listener in self.position_listeners:
+            listener(self.position)
+
+    def set_fen(self, fen: str) -> None:
+        """Sets up the position described by FEN string. Existing cells are reused, all figures are placed first
+        and the board is repainted once at the end.
+
+        Args:
+
+         - fen (str): Forsyth-Edwards Notation of the position.
+
+        Raises:
+
+         - ValueError: If FEN string is malformed.
+        """
+        self.position = rules.Position(fen)
+        self.redo_moves = []
+        self.stop_replay()
+        self.sync_with_position()
+        self.moves_record.restart()
+
+    def load_game(self, game: pgn.Game) -> None:
+        """Loads imported game in replay mode and shows its final position.
+
+        Args:
+
+         - game (pgn.Game): Parsed PGN game.
+
+        Raises:
+
+         - ValueError: If starting FEN of the game is malformed.
+        """
+        self.replay = replay.GameReplay.from_game(game)
+        self.position = self.replay.position
+        self.redo_moves = []
+        self.sync_with_position()
+        self.moves_record.restart()
+        for ply, notation in enumerate(self.replay.notations):
+            self.moves_record.record_move(notation, self.replay.turn_of(ply))
+        self.moves_record.show_replay(len(self.replay), self.seek)
+
+    def seek(self, ply: int) -> None:
+        """Jumps to given ply of the replayed game. Position is computed headlessly from the nearest snapshot
+        and the board is repainted once at the end.
+
+        Args:
+
+         - ply (int): Number of moves played in the desired position.
+        """
+        if not self.replay or self.is_promotion_pending():
+            return
+        previous = self.replay.ply
+        self.position = self.replay.seek(ply)
+        self.redo_moves = self.replay.moves[self.replay.ply:][::-1]
+        self.sync_with_position()
+        for index in range(previous - 1, self.replay.ply - 1, -1):
+            self.moves_record.remove_last(self.replay.turn_of(index))
+        for index in range(previous, self.replay.ply):
+            self.moves_record.record_move(self.replay.notations[index], self.replay.turn_of(index))
+        self.moves_record.set_replay_ply(self.replay.ply)
+
+    def stop_replay(self) -> None:
+        """Leaves replay mode, the game continues from the current position.
+        """
+        if self.replay:
+            self.replay = None
+            self.moves_record.hide_replay()
+
+    def is_promotion_pending(self) -> bool:
+        """Checks if player is still choosing the figure for promoted pawn.
+
+        Returns:
+
+         - bool: True if promotion menu is open, False otherwise.
+        """
+        return isinstance(self.clicked_figure, piece.Pawn) and self.clicked_figure.position[0] in {0, 7}
+
+    def undo(self) -> None:
+        """Takes back the last move from the headless position and repaints only changed cells.
+        """
+        if self.replay:
+            self.seek(self.replay.ply - 1)
+            return
+        if self.is_promotion_pending() or not self.position.undo_stack:
+            return
+        color = 'b' if self.position.turn == 'w' else 'w'
+        self.redo_moves.append(self.position.pop())
+        self.sync_with_position()
+        self.moves_record.remove_last(color)
+
+    def redo(self) -> None:
+        """Plays again the last move taken back with undo.
+        """
+        if self.replay:
+            self.seek(self.replay.ply + 1)
+            return
+        if self.is_promotion_pending() or not self.redo_moves:
+            return
+        self.play_move(self.redo_moves.pop())
+        self.sync_with_position()
+
+    def get_fen(self) -> str:
+        """Serializes figures on the board into FEN string. Castling rights are read from first_move flags
+        and en passant square from moved_by_two flag of the pawn.
+
+        Returns:
+
+         - str: Forsyth-Edwards Notation of the position.
+        """
+        position = self.position.copy()
+        for row in self.board:
+            for cell in row:
+                position.board[rules.to_square(cell.position)] = self.figure_letter(cell.figure)
+        position.turn = self.current_turn
+        castling = ''
+        for right, (row, rook_col) in zip('KQkq', [(7, 7), (7, 0), (0, 7), (0, 0)]):
+            king, rook = self.board[row][4].figure, self.board[row][rook_col].figure
+            color = 'w' if row == 7 else 'b'
+            if isinstance(king, piece.King) and king.color == color and king.first_move and \
+                isinstance(rook, piece.Rook) and rook.color == color and rook.first_move:
+                castling += right
+        position.castling = castling
+        position.en_passant = -1
+        for row in self.board:
+            for cell in row:
+                if isinstance(cell.figure, piece.Pawn) and cell.figure.moved_by_two and cell.figure.color != self.current_turn:
+                    position.en_passant = rules.to_square((cell.position[0] - cell.figure.move, cell.position[1]))
+        return position.fen()
+
     def remove_highlights(self) -> None:
         """Removes highlights from the cell.
         """
@@ -229,9 +517,7 @@ class Board(ctk.CTkFrame):
                 if not check:
                     valid_moves.append(coords)
             for coords in valid_moves:
-                color = self.board[coords[0]][coords[1]].cget('fg_color')
-                new_color = COLOR.HIGH_TILE_1 if color == COLOR.TILE_1 else COLOR.HIGH_TILE_2
-                self.board[coords[0]][coords[1]].configure(fg_color=new_color)
+                self.board[coords[0]][coords[1]].configure(fg_color=self.highlight_color(coords))
                 self.highlighted.append(self.board[coords[0]][coords[1]])
 
     def check_check(self, move_from: tuple[int, int], move_to: tuple[int, int]) -> bool:
@@ -303,11 +589,8 @@ class Board(ctk.CTkFrame):
         if self.clicked_figure and self.previous_coords:
             row, col = position
             cell = self.board[row][col]
-            capture = bool(cell.figure)
-            self.capture = bool(cell.figure)
             promotion = False
             if cell in self.highlighted and self.previous_coords != position:
-                castle = False
                 if not self.check_check(self.previous_coords, position):
                     if isinstance(self.clicked_figure, piece.Pawn) and self.clicked_figure.can_en_passant and col != self.previous_coords[1] and not cell.figure:
                         self.board[row - self.clicked_figure.move][col].figure = None
@@ -320,16 +603,12 @@ class Board(ctk.CTkFrame):
                                 self.board[row][5].figure.position = (row, 5) # type: ignore
                                 self.board[row][5].update()
                                 self.board[row][7].update()
-                                self.moves_record.record_move(self.clicked_figure, castle="kingside")
-                                castle = True
                             elif col == 2:
                                 self.board[row][3].figure = self.board[row][0].figure
                                 self.board[row][0].figure = None
                                 self.board[row][3].figure.position = (row, 3) # type: ignore
                                 self.board[row][3].update()
                                 self.board[row][0].update()
-                                self.moves_record.record_move(self.clicked_figure, castle="queenside")
-                                castle =True
                     cell.figure = self.clicked_figure
                     cell.figure.position = position
                     cell.update()
@@ -346,19 +625,14 @@ class Board(ctk.CTkFrame):
                     if cell.figure.first_move:
                         cell.figure.first_move = False
                     self.current_turn = 'b' if self.current_turn == 'w' else 'w'
-                    check = self.is_under_attack(self.get_king_position(self.current_turn), self.current_turn)
                     game_over, in_check = self.is_game_over()
                     if game_over:
                         if in_check:
                             self.display_message(f'Checkmate  {"White wins!" if self.current_turn == "b" else "Black wins!"}', 9)
-                            if not promotion:
-                                self.moves_record.record_move(self.clicked_figure, capture=capture, previous_coords=self.previous_coords, check=check, checkmate=game_over and in_check)
                         else:
                             self.display_message('Stalemate', 9)
-                            if not promotion:
-                                self.moves_record.record_move(self.clicked_figure, capture=capture, previous_coords=self.previous_coords, check=check, checkmate=game_over and in_check)
-                    elif not castle and not promotion:
-                        self.moves_record.record_move(self.clicked_figure, capture=capture, previous_coords=self.previous_coords, check=check, checkmate=game_over and in_check)
+                    if not promotion:
+                        self.record_move(self.previous_coords, position)
             if not promotion:
                 self.clicked_figure = None
                 self.previous_coords = None
@@ -371,24 +645,70 @@ class Board(ctk.CTkFrame):
 
          - promotion (str): Figure representation to which pawn was promoted.
         """
-        capture = self.capture
-        check = self.is_under_attack(self.get_king_position(self.current_turn), self.current_turn)
         game_over, in_check = self.is_game_over()
         if game_over:
             if in_check:
                 self.display_message(f'Checkmate  {"White wins!" if self.current_turn == "b" else "Black wins!"}', 9)
-                if self.clicked_figure:
-                    self.moves_record.record_move(self.clicked_figure, capture=capture, previous_coords=self.previous_coords, check=check, checkmate=game_over and in_check, promotion=promotion[0])
             else:
                 self.display_message('Stalemate', 9)
-                if self.clicked_figure:
-                    self.moves_record.record_move(self.clicked_figure, capture=capture, previous_coords=self.previous_coords, check=check, checkmate=game_over and in_check, promotion=promotion[0])
-        else:
-            if self.clicked_figure:
-                self.moves_record.record_move(self.clicked_figure, capture=capture, previous_coords=self.previous_coords, check=check, checkmate=game_over and in_check, promotion=promotion[0])
+        if self.clicked_figure and self.previous_coords:
+            self.record_move(self.previous_coords, self.clicked_figure.position, 'N' if promotion == 'Knight' else promotion[0])
         self.clicked_figure = None
         self.previous_coords = None
 
+    def record_move(self, move_from: tuple[int, int], move_to: tuple[int, int], promotion: str = '') -> None:
+        """Plays the move in the headless position and displays its notation.
+
+        Args:
+
+         - move_from (tuple[int, int]): Starting position.
+         - move_to (tuple[int, int]): Desired position.
+         - promotion (str, optional): Letter of the figure pawn was promoted to. Defaults to ''.
+        """
+        self.redo_moves = []
+        self.stop_replay()
+        self.play_move(self.position.find_move(move_from, move_to, promotion))
+
+    def play_move(self, move: rules.Move) -> None:
+        """Plays the move in the headless position and adds its notation to the moves record.
+
+        Args:
+
+         - move (rules.Move): Move to play.
+        """
+        color = self.position.turn
+        notation = self.position.san(move)
+        self.position.push(move)
+        self.moves_record.record_move(notation, color)
+        self.notify_position()
+
+    def play_engine_move(self, move: rules.Move) -> None:
+        """Plays the move chosen by the engine opponent and announces the end of the game.
+
+        Args:
+
+         - move (rules.Move): Legal move of the current position.
+        """
+        if self.is_promotion_pending():
+            return
+        self.redo_moves = []
+        self.stop_replay()
+        self.play_move(move)
+        self.sync_with_position()
+        if self.position.is_checkmate():
+            self.display_message(f'Checkmate  {"White wins!" if self.current_turn == "b" else "Black wins!"}', 9)
+        elif self.position.is_stalemate():
+            self.display_message('Stalemate', 9)
+
+    def export_pgn(self) -> str:
+        """Exports moves played on the board.
+
+        Returns:
+
+         - str: Current game in PGN format.
+        """
+        return pgn.write_game(pgn.Game.from_position(self.position, {'Event': 'Chess', 'Site': 'Local'}))
+
     def get_king_position(self, color: str) -> tuple[int, int]:
         """Function returning king position on the board.
 
@@ -433,7 +753,12 @@ class Board(ctk.CTkFrame):
         self.previous_coords = None
         self.current_turn = 'w'
         self.notification = None
+        self.position = rules.Position()
+        self.redo_moves = []
+        self.stop_replay()
+        self.candidates = []
         self.board = self.create_board()
+        self.notify_position()
 
     def destroy_loading_screen(self) -> None:
         """Destroys loading screen widget.
@@ -463,3 +788,5 @@ class Board(ctk.CTkFrame):
                 self.master.after(270, self.loading_animation, i)
             else:
                 self.master.after(270, self.destroy_loading_screen)
+
+PROBES.register_all([Board], ('handle_clicks', 'handle_move', 'check_check', 'is_under_attack', 'is_game_over'))
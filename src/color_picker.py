@@ -3,9 +3,65 @@
 
 import customtkinter as ctk
 from typing import Any
+from functools import lru_cache
+from PIL import Image, ImageTk
+import numpy as np
+import colorsys
 
 from properties import COLOR
 
+HUE_BUCKETS: int = 360
+FRAME_MS: int = 16
+
+def hue_to_rgb(hue: np.ndarray) -> np.ndarray:
+    """Function converting hues of fully saturated and bright colors to RGB.
+
+    Args:
+
+     - hue (np.ndarray): Hues in range 0-1.
+
+    Returns:
+
+     - np.ndarray: RGB values in range 0-1, with channels in the last axis.
+    """
+    sector = hue[..., None] * 6 - np.array([3, 2, 4])
+    return np.clip(np.abs(sector) * np.array([1, -1, -1]) + np.array([-1, 2, 2]), 0, 1)
+
+@lru_cache(maxsize=64)
+def saturation_value_field(bucket: int, size: int) -> Image.Image:
+    """Function rendering saturation (x axis) and value (y axis) field of the hue. Rendered fields are cached per hue bucket.
+
+    Args:
+
+     - bucket (int): Hue bucket in range 0 - HUE_BUCKETS.
+     - size (int): Width and height of the field.
+
+    Returns:
+
+     - Image.Image: Rendered field.
+    """
+    base = hue_to_rgb(np.array(bucket / HUE_BUCKETS))
+    saturation = np.linspace(0, 1, size)[None, :, None]
+    value = np.linspace(1, 0, size)[:, None, None]
+    field = value * (1 - saturation * (1 - base))
+    return Image.fromarray(np.round(field * 255).astype(np.uint8), 'RGB')
+
+@lru_cache(maxsize=4)
+def hue_strip(width: int, height: int) -> Image.Image:
+    """Function rendering vertical strip of all hues.
+
+    Args:
+
+     - width (int): Width of the strip.
+     - height (int): Height of the strip.
+
+    Returns:
+
+     - Image.Image: Rendered strip.
+    """
+    strip = hue_to_rgb(np.linspace(0, 1, height, endpoint=False))
+    return Image.fromarray(np.round(np.repeat(strip[:, None, :], width, axis=1) * 255).astype(np.uint8), 'RGB')
+
 class ColorPicker(ctk.CTkToplevel):
     """Class used to pick custom theme color. Is also a module that can be reused with apps using customtkinter.
 
@@ -13,7 +69,8 @@ class ColorPicker(ctk.CTkToplevel):
 
      - ctk.CTkTopLevel : Inheritance from customtkinter CTkTopLevel window.
     """
-    def __init__(self, fg_color: str | None=None, preview_size: int=100, r: int=0, g: int=0, b: int=0, font: ctk.CTkFont | None=None) -> None:
+    def __init__(self, fg_color: str | None=None, preview_size: int=100, r: int=0, g: int=0, b: int=0, font: ctk.CTkFont | None=None,
+                 field_size: int=150) -> None:
         """Constructor handling most important function calls and variable setup.
 
         Args:
@@ -24,6 +81,7 @@ class ColorPicker(ctk.CTkToplevel):
          - g (int, optional): Default green intensity value. Defaults to 0.
          - b (int, optional): Default blue intensity value. Defaults to 0.
          - font (ctk.CTkFont | None, optional): Custom font. Defaults to None.
+         - field_size (int, optional): Size of saturation and value field. Defaults to 150.
         """
         super().__init__(fg_color=fg_color)
         self.grab_set()
@@ -36,9 +94,16 @@ class ColorPicker(ctk.CTkToplevel):
         self.g_val: int = g
         self.b_val: int = b
         self.hex_val: str | None = self.convert_to_hex()
+        self.field_size: int = field_size
+        self.hue, self.saturation, self.value = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+        self.field_images: dict[int, ImageTk.PhotoImage] = {}
+        self.field_bucket: int = -1
+        self.pending_source: str | None = None
+        self.pending_update: str | None = None
         self.main_frame: ctk.CTkFrame = ctk.CTkFrame(self, corner_radius=0, fg_color=COLOR.BACKGROUND)
         self.main_frame.pack(side=ctk.TOP, expand=True, ipadx=10, ipady=10)
         self.color_preview()
+        self.hsv_field()
         self.r_g_b_sliders()
         self.update_sliders(None)
         self.bottom_frame: ctk.CTkFrame = ctk.CTkFrame(self.main_frame, corner_radius=0, fg_color='transparent')
@@ -66,6 +131,107 @@ class ColorPicker(ctk.CTkToplevel):
                                             height=self.preview_size, corner_radius=0, border_color=COLOR.TILE_2)
         self.color_prev_box.pack(side=ctk.RIGHT, padx=3, pady=3, expand=True)
 
+    def hsv_field(self) -> None:
+        """Function creating saturation and value field with hue strip next to it. Both can be clicked or dragged.
+        """
+        frame = ctk.CTkFrame(self.main_frame, fg_color='transparent', corner_radius=0)
+        frame.pack(side=ctk.TOP, padx=3, pady=3)
+        self.field_canvas = ctk.CTkCanvas(frame, width=self.field_size, height=self.field_size, highlightthickness=0, bg=COLOR.BACKGROUND)
+        self.field_canvas.pack(side=ctk.LEFT, padx=3, pady=3)
+        self.field_image = self.field_canvas.create_image(0, 0, anchor=ctk.NW)
+        self.field_marker = self.field_canvas.create_oval(0, 0, 0, 0, outline='white', width=2)
+        strip_width = max(self.field_size // 8, 10)
+        self.hue_canvas = ctk.CTkCanvas(frame, width=strip_width, height=self.field_size, highlightthickness=0, bg=COLOR.BACKGROUND)
+        self.hue_canvas.pack(side=ctk.LEFT, padx=3, pady=3)
+        self.hue_image = ImageTk.PhotoImage(hue_strip(strip_width, self.field_size), master=self.hue_canvas)
+        self.hue_canvas.create_image(0, 0, anchor=ctk.NW, image=self.hue_image)
+        self.hue_marker = self.hue_canvas.create_rectangle(0, 0, strip_width, 0, outline='white', width=2)
+        for sequence in ('<Button-1>', '<B1-Motion>'):
+            self.field_canvas.bind(sequence, self.field_on_drag)
+            self.hue_canvas.bind(sequence, self.hue_on_drag)
+        self.redraw_field()
+
+    def redraw_field(self) -> None:
+        """Function moving markers to current color. Field image is swapped only if the hue bucket changed.
+        """
+        bucket = round(self.hue * HUE_BUCKETS) % HUE_BUCKETS
+        if bucket != self.field_bucket:
+            if bucket not in self.field_images:
+                self.field_images[bucket] = ImageTk.PhotoImage(saturation_value_field(bucket, self.field_size), master=self.field_canvas)
+            self.field_canvas.itemconfigure(self.field_image, image=self.field_images[bucket])
+            self.field_bucket = bucket
+        x = self.saturation * (self.field_size - 1)
+        y = (1 - self.value) * (self.field_size - 1)
+        self.field_canvas.coords(self.field_marker, x - 5, y - 5, x + 5, y + 5)
+        y = self.hue * (self.field_size - 1)
+        self.hue_canvas.coords(self.hue_marker, 1, y - 2, int(self.hue_canvas.cget('width')) - 1, y + 2)
+
+    def field_on_drag(self, event: Any) -> None:
+        """Function handling click or drag on saturation and value field.
+
+        Args:
+
+         - event (Any): Mouse event with position on the field.
+        """
+        self.saturation = min(max(event.x / (self.field_size - 1), 0), 1)
+        self.value = 1 - min(max(event.y / (self.field_size - 1), 0), 1)
+        self.schedule_update('hsv')
+
+    def hue_on_drag(self, event: Any) -> None:
+        """Function handling click or drag on hue strip.
+
+        Args:
+
+         - event (Any): Mouse event with position on the strip.
+        """
+        self.hue = min(max(event.y / (self.field_size - 1), 0), 1)
+        self.schedule_update('hsv')
+
+    def schedule_update(self, source: str) -> None:
+        """Function coalescing drag events, all changes made during one frame are applied together.
+
+        Args:
+
+         - source (str): 'hsv' if field or hue strip was changed, 'rgb' if slider was changed.
+        """
+        if self.pending_update is None:
+            self.pending_update = self.after(FRAME_MS, self.apply_update)
+        self.pending_source = source
+
+    def apply_update(self) -> None:
+        """Function applying the latest change to sliders, entry boxes, preview and the field.
+        """
+        if self.pending_update is not None:
+            self.after_cancel(self.pending_update)
+            self.pending_update = None
+        source, self.pending_source = self.pending_source, None
+        if source == 'hsv':
+            r, g, b = colorsys.hsv_to_rgb(self.hue, self.saturation, self.value)
+            self.r_val, self.g_val, self.b_val = round(r * 255), round(g * 255), round(b * 255)
+            self.r_slider.set(self.r_val)
+            self.g_slider.set(self.g_val)
+            self.b_slider.set(self.b_val)
+            self.redraw_field()
+        elif source == 'rgb':
+            self.r_val, self.g_val, self.b_val = int(self.r_slider.get()), int(self.g_slider.get()), int(self.b_slider.get())
+            self.sync_hsv()
+        else:
+            return
+        for label, value in ((self.r_val_label, self.r_val), (self.g_val_label, self.g_val), (self.b_val_label, self.b_val)):
+            label.delete(0, ctk.END)
+            label.insert(0, value)
+        self.color_prev_box.configure(fg_color=self.convert_to_hex())
+        self.hex_val_label.delete(0, ctk.END)
+        self.hex_val_label.insert(0, f'{self.convert_to_hex()}')
+
+    def sync_hsv(self) -> None:
+        """Function updating the field after RGB value changed. Hue is kept for gray colors, where it's undefined.
+        """
+        hue, self.saturation, self.value = colorsys.rgb_to_hsv(self.r_val / 255, self.g_val / 255, self.b_val / 255)
+        if self.saturation and self.value:
+            self.hue = hue
+        self.redraw_field()
+
     @staticmethod
     def validate_hex_color(value_if_allowed: str) -> bool:
         """Function validating new character in hex entry box. Can take one character or longer string to allow pasting.
@@ -249,9 +415,10 @@ class ColorPicker(ctk.CTkToplevel):
         self.g_slider.set(g) if 0 < g <= 255 else self.g_slider.set(0)
         self.b_slider.set(b) if 0 < b <= 255 else self.b_slider.set(0)
         self.color_prev_box.configure(fg_color=self.convert_to_hex())
+        self.sync_hsv()
 
     def slider_on_change(self, event: Any, r: bool=False, g: bool=False, b: bool=False) -> None:
-        """Updates corresponding RGB color code and hex color value based on value of slider.
+        """Schedules update of corresponding RGB color code and hex color value based on value of slider, once per frame.
 
         Args:
 
@@ -260,21 +427,7 @@ class ColorPicker(ctk.CTkToplevel):
          - g (bool, optional): Flag to set which slider was changed [g]. Defaults to False.
          - b (bool, optional): Flag to set which slider was changed [b]. Defaults to False.
         """
-        if r:
-            self.r_val = int(self.r_slider.get())
-            self.r_val_label.delete(0, ctk.END)
-            self.r_val_label.insert(0, self.r_val)
-        elif g:
-            self.g_val = int(self.g_slider.get())
-            self.g_val_label.delete(0, ctk.END)
-            self.g_val_label.insert(0, self.g_val)
-        elif b:
-            self.b_val = int(self.b_slider.get())
-            self.b_val_label.delete(0, ctk.END)
-            self.b_val_label.insert(0, self.b_val)
-        self.color_prev_box.configure(fg_color=self.convert_to_hex())
-        self.hex_val_label.delete(0, ctk.END)
-        self.hex_val_label.insert(0, f'{self.convert_to_hex()}')
+        self.schedule_update('rgb')
 
     def convert_to_hex(self) -> str:
         """Function converting RGB value to hex color code.
@@ -303,12 +456,15 @@ class ColorPicker(ctk.CTkToplevel):
         """Custom closing function ensuring proper closing of the window. Sets hex_val to None to omit color change.
         """
         self.hex_val = None
+        if self.pending_update is not None:
+            self.after_cancel(self.pending_update)
         self.grab_release()
         self.destroy()
 
     def on_ok_button(self) -> None:
-        """Custom closing function.
+        """Custom closing function. Change still waiting for the next frame is applied first.
         """
+        self.apply_update()
         self.destroy()
 
     def get_color(self) -> str | None:
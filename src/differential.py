@@ -0,0 +1,240 @@
+"""Differential harness comparing the legacy GUI rules (piece.py generators filtered by Board.check_check) with another
+move generation backend, by default the headless rules core. Positions come from perft trees of fixed positions
+and from random games, which are played on the legacy board with handle_clicks and handle_move, so castling,
+en passant and flags of the figures carried between moves are compared too. The first diverging position is printed as FEN.
+
+Usage:
+
+    python src/differential.py [--candidate rules] [--depth 1] [--games 20] [--seed 1] [--keep-going]
+"""
+
+from typing import Any, Callable
+import argparse
+import random
+import sys
+
+from headless import HeadlessBoard, headless_board
+from bench import POSITIONS
+import rules
+
+Report = dict[str, Any]
+
+def legacy_report(board: HeadlessBoard) -> Report:
+    """Collects legal moves and game state as seen by the legacy GUI rules.
+
+    Args:
+
+     - board (HeadlessBoard): Board with figures of the position.
+
+    Returns:
+
+     - Report: Set of (from, to) square pairs, check, checkmate and stalemate flags.
+    """
+    moves: set[tuple[int, int]] = set()
+    for row in board.board:
+        for cell in row:
+            if cell.figure and cell.figure.color == board.current_turn:
+                for target in cell.figure.check_possible_moves(board.current_turn):
+                    if not board.check_check(cell.position, target):
+                        moves.add((rules.to_square(cell.position), rules.to_square(target)))
+    king = board.get_king_position(board.current_turn)
+    check = board.check_check(king, king)
+    game_over, in_check = board.is_game_over()
+    return {'moves': moves, 'check': check, 'checkmate': game_over and in_check, 'stalemate': game_over and not in_check}
+
+def rules_report(fen: str) -> Report:
+    """Collects legal moves and game state from the headless rules core. Promotions to different figures count as one move.
+
+    Args:
+
+     - fen (str): Position to analyse.
+
+    Returns:
+
+     - Report: Set of (from, to) square pairs, check, checkmate and stalemate flags.
+    """
+    position = rules.Position(fen)
+    return {'moves': {(move[0], move[1]) for move in position.legal_moves()}, 'check': position.in_check(),
+            'checkmate': position.is_checkmate(), 'stalemate': position.is_stalemate()}
+
+CANDIDATES: dict[str, Callable[[str], Report]] = {'rules': rules_report}
+
+def differences(legacy: Report, candidate: Report) -> list[str]:
+    """Describes differences between two reports.
+
+    Args:
+
+     - legacy (Report): Report of the legacy rules.
+     - candidate (Report): Report of the candidate backend.
+
+    Returns:
+
+     - list[str]: Human readable differences, empty if the reports match.
+    """
+    found: list[str] = []
+    name = lambda move: f'{rules.square_name(move[0])}{rules.square_name(move[1])}'
+    if missing := sorted(map(name, candidate['moves'] - legacy['moves'])):
+        found.append(f'moves only in candidate: {' '.join(missing)}')
+    if extra := sorted(map(name, legacy['moves'] - candidate['moves'])):
+        found.append(f'moves only in legacy: {' '.join(extra)}')
+    for flag in ('check', 'checkmate', 'stalemate'):
+        if legacy[flag] != candidate[flag]:
+            found.append(f'{flag}: legacy {legacy[flag]}, candidate {candidate[flag]}')
+    return found
+
+def board_differences(board: HeadlessBoard) -> list[str]:
+    """Compares figures on the legacy board with the headless position it played the moves into.
+
+    Args:
+
+     - board (HeadlessBoard): Board after handle_move.
+
+    Returns:
+
+     - list[str]: Squares holding different figures and turn mismatch, empty if the board matches.
+    """
+    found = [f'{rules.square_name(rules.to_square(cell.position))}: legacy {board.figure_letter(cell.figure) or '-'}, '
+             f'candidate {board.position.board[rules.to_square(cell.position)] or '-'}'
+             for row in board.board for cell in row if board.figure_letter(cell.figure) != board.position.board[rules.to_square(cell.position)]]
+    if board.current_turn != board.position.turn:
+        found.append(f'turn: legacy {board.current_turn}, candidate {board.position.turn}')
+    return found
+
+def perft_positions(fens: list[str], depth: int) -> list[str]:
+    """Collects unique positions reachable from the given positions in up to depth moves.
+
+    Args:
+
+     - fens (list[str]): Root positions.
+     - depth (int): Maximum number of moves from the root.
+
+    Returns:
+
+     - list[str]: FEN strings in breadth first order, roots first.
+    """
+    seen: dict[str, None] = dict.fromkeys(fens)
+    frontier = list(fens)
+    for _ in range(depth):
+        following: list[str] = []
+        for fen in frontier:
+            position = rules.Position(fen)
+            for move in position.legal_moves():
+                position.push(move)
+                if (child := position.fen()) not in seen:
+                    seen[child] = None
+                    following.append(child)
+                position.pop()
+        frontier = following
+    return list(seen)
+
+def compare_position(fen: str, candidate: Callable[[str], Report], board: HeadlessBoard | None = None) -> list[str]:
+    """Compares legacy rules and the candidate in one position.
+
+    Args:
+
+     - fen (str): Position to compare.
+     - candidate (Callable[[str], Report]): Candidate backend.
+     - board (HeadlessBoard | None, optional): Legacy board already holding the position, built from FEN if None.
+
+    Returns:
+
+     - list[str]: Differences, empty if both agree.
+    """
+    return differences(legacy_report(board or headless_board(fen)), candidate(fen))
+
+def play(board: HeadlessBoard, move: rules.Move) -> None:
+    """Plays the move on the legacy board like clicks in the app. Promotion opens the menu in the app,
+    so after promotion the board is set up again from the headless position.
+
+    Args:
+
+     - board (HeadlessBoard): Legacy board.
+     - move (rules.Move): Legal move of the headless position.
+    """
+    start, end = rules.to_coords(move[0]), rules.to_coords(move[1])
+    figure = board.board[start[0]][start[1]].figure
+    if move[2]:
+        board.position.push(move)
+        fen = board.position.fen()
+        board.board = headless_board(fen).board
+        for row in board.board:
+            for cell in row:
+                if cell.figure:
+                    cell.figure.board = board
+        board.current_turn = board.position.turn
+        return
+    board.handle_clicks(figure, start)
+    board.handle_move(end)
+
+def random_game(candidate: Callable[[str], Report], rng: random.Random, max_plies: int) -> tuple[str, list[str]] | None:
+    """Plays random game on the legacy board and compares every position with the candidate.
+
+    Args:
+
+     - candidate (Callable[[str], Report]): Candidate backend.
+     - rng (random.Random): Random generator choosing the moves.
+     - max_plies (int): Maximum length of the game.
+
+    Returns:
+
+     - tuple[str, list[str]] | None: First diverging FEN with differences, None if the whole game matched.
+    """
+    board = headless_board()
+    for _ in range(max_plies):
+        fen = board.position.fen()
+        if found := compare_position(fen, candidate, board):
+            return fen, found
+        moves = board.position.legal_moves()
+        if not moves:
+            return None
+        move = rng.choice(moves)
+        play(board, move)
+        if found := board_differences(board):
+            return f'{fen} after {rules.square_name(move[0])}{rules.square_name(move[1])}', found
+    return None
+
+def report_divergence(fen: str, found: list[str]) -> None:
+    """Prints the diverging position.
+
+    Args:
+
+     - fen (str): Diverging position.
+     - found (list[str]): Differences.
+    """
+    print(f'Divergence at {fen}')
+    for difference in found:
+        print(f'  {difference}')
+
+def main() -> None:
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description='Compares legacy GUI rules with another move generation backend.')
+    parser.add_argument('--candidate', choices=sorted(CANDIDATES), default='rules', help='backend compared with the legacy rules')
+    parser.add_argument('--depth', type=int, default=1, help='depth of perft trees of the fixed positions')
+    parser.add_argument('--games', type=int, default=20, help='number of random games')
+    parser.add_argument('--max-plies', type=int, default=120, help='maximum length of random game')
+    parser.add_argument('--seed', type=int, default=1, help='seed of random games')
+    parser.add_argument('--keep-going', action='store_true', help='report all divergences instead of stopping at the first one')
+    args = parser.parse_args()
+    candidate = CANDIDATES[args.candidate]
+    divergences = 0
+    positions = perft_positions(POSITIONS, args.depth)
+    for fen in positions:
+        if found := compare_position(fen, candidate):
+            report_divergence(fen, found)
+            divergences += 1
+            if not args.keep_going:
+                sys.exit(1)
+    print(f'{len(positions)} perft positions compared')
+    rng = random.Random(args.seed)
+    for _ in range(args.games):
+        if divergence := random_game(candidate, rng, args.max_plies):
+            report_divergence(*divergence)
+            divergences += 1
+            if not args.keep_going:
+                sys.exit(1)
+    print(f'{args.games} random games compared, {divergences} divergences')
+    sys.exit(1 if divergences else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,496 @@
+"""Headless chess engine working on the rules core. Iterative deepening alpha-beta search with transposition table,
+quiescence search and simple move ordering. Doesn't import any of the app widgets, so it can be used by UCI front end,
+tools and worker processes.
+"""
+
+from typing import Callable
+import threading
+import time
+
+from rules import Position, Move
+
+MATE: int = 100000
+INFINITY: int = 1000000
+EXACT, LOWER, UPPER = 0, 1, 2
+# rough size of one transposition table entry in the dictionary, used to convert hash size in MB into number of entries
+ENTRY_BYTES: int = 160
+
+PIECE_VALUES: dict[str, int] = {'P': 100, 'N': 320, 'B': 330, 'R': 500, 'Q': 900, 'K': 0}
+# piece square tables from white point of view, index 0 is a8 like in the rules core
+PIECE_TABLES: dict[str, list[int]] = {
+    'P': [  0,   0,   0,   0,   0,   0,   0,   0,
+           50,  50,  50,  50,  50,  50,  50,  50,
+           10,  10,  20,  30,  30,  20,  10,  10,
+            5,   5,  10,  25,  25,  10,   5,   5,
+            0,   0,   0,  20,  20,   0,   0,   0,
+            5,  -5, -10,   0,   0, -10,  -5,   5,
+            5,  10,  10, -20, -20,  10,  10,   5,
+            0,   0,   0,   0,   0,   0,   0,   0],
+    'N': [-50, -40, -30, -30, -30, -30, -40, -50,
+          -40, -20,   0,   0,   0,   0, -20, -40,
+          -30,   0,  10,  15,  15,  10,   0, -30,
+          -30,   5,  15,  20,  20,  15,   5, -30,
+          -30,   0,  15,  20,  20,  15,   0, -30,
+          -30,   5,  10,  15,  15,  10,   5, -30,
+          -40, -20,   0,   5,   5,   0, -20, -40,
+          -50, -40, -30, -30, -30, -30, -40, -50],
+    'B': [-20, -10, -10, -10, -10, -10, -10, -20,
+          -10,   0,   0,   0,   0,   0,   0, -10,
+          -10,   0,   5,  10,  10,   5,   0, -10,
+          -10,   5,   5,  10,  10,   5,   5, -10,
+          -10,   0,  10,  10,  10,  10,   0, -10,
+          -10,  10,  10,  10,  10,  10,  10, -10,
+          -10,   5,   0,   0,   0,   0,   5, -10,
+          -20, -10, -10, -10, -10, -10, -10, -20],
+    'R': [  0,   0,   0,   0,   0,   0,   0,   0,
+            5,  10,  10,  10,  10,  10,  10,   5,
+           -5,   0,   0,   0,   0,   0,   0,  -5,
+           -5,   0,   0,   0,   0,   0,   0,  -5,
+           -5,   0,   0,   0,   0,   0,   0,  -5,
+           -5,   0,   0,   0,   0,   0,   0,  -5,
+           -5,   0,   0,   0,   0,   0,   0,  -5,
+            0,   0,   0,   5,   5,   0,   0,   0],
+    'Q': [-20, -10, -10,  -5,  -5, -10, -10, -20,
+          -10,   0,   0,   0,   0,   0,   0, -10,
+          -10,   0,   5,   5,   5,   5,   0, -10,
+           -5,   0,   5,   5,   5,   5,   0,  -5,
+            0,   0,   5,   5,   5,   5,   0,  -5,
+          -10,   5,   5,   5,   5,   5,   0, -10,
+          -10,   0,   5,   0,   0,   0,   0, -10,
+          -20, -10, -10,  -5,  -5, -10, -10, -20],
+    'K': [-30, -40, -40, -50, -50, -40, -40, -30,
+          -30, -40, -40, -50, -50, -40, -40, -30,
+          -30, -40, -40, -50, -50, -40, -40, -30,
+          -30, -40, -40, -50, -50, -40, -40, -30,
+          -20, -30, -30, -40, -40, -30, -30, -20,
+          -10, -20, -20, -20, -20, -20, -20, -10,
+           20,  20,   0,   0,   0,   0,  20,  20,
+           20,  30,  10,   0,   0,  10,  30,  20],
+}
+# value of the figure on the square from white point of view, black squares are mirrored
+PIECE_SQUARE: dict[str, list[int]] = {}
+for _kind, _table in PIECE_TABLES.items():
+    PIECE_SQUARE[_kind] = [PIECE_VALUES[_kind] + _table[square] for square in range(64)]
+    PIECE_SQUARE[_kind.lower()] = [-(PIECE_VALUES[_kind] + _table[square ^ 56]) for square in range(64)]
+VICTIM_VALUES: dict[str, int] = {**PIECE_VALUES, **{kind.lower(): value for kind, value in PIECE_VALUES.items()}, '': 0}
+
+class SearchLimits:
+    """Class holding conditions stopping the search. Search without any limit runs until stop is called.
+    """
+    def __init__(self, depth: int | None = None, movetime: float | None = None, nodes: int | None = None, multipv: int = 1) -> None:
+        """Constructor:
+
+        Args:
+
+         - depth (int | None, optional): Maximum depth in plies. Defaults to None.
+         - movetime (float | None, optional): Maximum search time in milliseconds. Defaults to None.
+         - nodes (int | None, optional): Maximum number of visited nodes. Defaults to None.
+         - multipv (int, optional): Number of best lines with exact scores. Defaults to 1.
+        """
+        self.depth: int | None = depth
+        self.movetime: float | None = movetime
+        self.nodes: int | None = nodes
+        self.multipv: int = max(1, multipv)
+
+class SearchResult:
+    """Class holding outcome of the search.
+    """
+    def __init__(self, best_move: Move | None, score: int, depth: int, nodes: int, seconds: float, pv: list[Move],
+                 lines: list[tuple[int, list[Move]]] | None = None) -> None:
+        """Constructor:
+
+        Args:
+
+         - best_move (Move | None): Best move found, None if there is no legal move.
+         - score (int): Score in centipawns from side to move point of view, mate scores are close to MATE.
+         - depth (int): Last fully searched depth.
+         - nodes (int): Number of visited nodes.
+         - seconds (float): Duration of the search.
+         - pv (list[Move]): Principal variation starting with the best move.
+         - lines (list[tuple[int, list[Move]]] | None, optional): Score and variation of the best lines in multi-PV search,
+         the first one is the principal variation. Defaults to None, meaning only the principal variation.
+        """
+        self.best_move: Move | None = best_move
+        self.score: int = score
+        self.depth: int = depth
+        self.nodes: int = nodes
+        self.seconds: float = seconds
+        self.pv: list[Move] = pv
+        self.lines: list[tuple[int, list[Move]]] = lines if lines is not None else [(score, pv)]
+
+    @property
+    def ponder_move(self) -> Move | None:
+        """Expected reply of the opponent taken from principal variation.
+
+        Returns:
+
+         - Move | None: Second move of the principal variation if there is one.
+        """
+        return self.pv[1] if len(self.pv) > 1 else None
+
+def evaluate(position: Position) -> int:
+    """Static evaluation: material and piece square tables.
+
+    Args:
+
+     - position (Position): Position to evaluate.
+
+    Returns:
+
+     - int: Score in centipawns from side to move point of view.
+    """
+    score = 0
+    for square, figure in enumerate(position.board):
+        if figure:
+            score += PIECE_SQUARE[figure][square]
+    return score if position.turn == 'w' else -score
+
+def format_score(score: int) -> str:
+    """Formats score the way UCI protocol expects it.
+
+    Args:
+
+     - score (int): Score from the search.
+
+    Returns:
+
+     - str: 'cp <centipawns>' or 'mate <moves>'.
+    """
+    if abs(score) >= MATE - 1000:
+        plies = MATE - abs(score)
+        return f'mate {(plies + 1) // 2 if score > 0 else -(plies // 2)}'
+    return f'cp {score}'
+
+class Engine:
+    """Class running the search. Transposition table is kept between searches until clear is called.
+    """
+    def __init__(self, table_size: int = 1 << 20) -> None:
+        """Constructor:
+
+        Args:
+
+         - table_size (int, optional): Maximum number of transposition table entries. Defaults to 1 << 20.
+        """
+        self.table_size: int = table_size
+        self.table: dict[int, tuple[int, int, int, Move | None]] = {}
+        self.stop_event: threading.Event = threading.Event()
+        self.killers: list[list[Move | None]] = []
+        self.history: dict[Move, int] = {}
+        self.nodes: int = 0
+        self.deadline: float | None = None
+        self.node_limit: int | None = None
+        self.stopped: bool = False
+
+    def clear(self) -> None:
+        """Clears transposition table and move ordering statistics, used when new game starts.
+        """
+        self.table.clear()
+        self.history.clear()
+
+    def stop(self) -> None:
+        """Requests running search to stop as soon as possible. Safe to call from another thread.
+        """
+        self.stop_event.set()
+
+    def search(self, position: Position, limits: SearchLimits, info: Callable[[SearchResult], None] | None = None) -> SearchResult:
+        """Searches the position with iterative deepening until one of the limits is reached. In multi-PV mode the best
+        lines are found in the same pass over root moves, sharing the transposition table.
+
+        Args:
+
+         - position (Position): Position to search, it is restored after the search.
+         - limits (SearchLimits): Conditions stopping the search.
+         - info (Callable[[SearchResult], None] | None, optional): Called after every completed depth. Defaults to None.
+
+        Returns:
+
+         - SearchResult: Best move, score and principal variation of the last completed depth.
+        """
+        started = time.perf_counter()
+        self.stop_event.clear()
+        self.stopped = False
+        self.nodes = 0
+        self.deadline = started + limits.movetime / 1000 if limits.movetime is not None else None
+        self.node_limit = limits.nodes
+        if len(self.table) > self.table_size:
+            self.table.clear()
+        root_moves = position.legal_moves()
+        result = SearchResult(root_moves[0] if root_moves else None, 0, 0, 0, 0.0, root_moves[:1])
+        if not root_moves:
+            result.score = -MATE if position.in_check() else 0
+            return result
+        max_depth = limits.depth if limits.depth is not None else 100
+        for depth in range(1, max_depth + 1):
+            self.killers = [[None, None] for _ in range(depth + 64)]
+            best = self._root(position, root_moves, depth, limits.multipv)
+            if self.stopped:
+                break
+            score, best_move = best[0]
+            for _, move in reversed(best):
+                root_moves.remove(move)
+                root_moves.insert(0, move)
+            pv = self.principal_variation(position, depth)
+            lines = [(score, pv)] + [(line_score, self.line(position, move, depth)) for line_score, move in best[1:]]
+            result = SearchResult(best_move, score, depth, self.nodes, time.perf_counter() - started, pv, lines)
+            if info:
+                info(result)
+            if abs(score) >= MATE - depth or len(root_moves) == 1 and limits.depth is None and limits.movetime is not None:
+                break
+        result.nodes = self.nodes
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def _root(self, position: Position, moves: list[Move], depth: int, multipv: int = 1) -> list[tuple[int, Move]]:
+        """Searches all root moves to given depth. Alpha is the score of the worst of the multipv best moves found so far,
+        so every move entering the best ones gets exact score, with multipv 1 it's plain alpha-beta.
+
+        Args:
+
+         - position (Position): Root position.
+         - moves (list[Move]): Legal root moves, the best ones from previous iteration first.
+         - depth (int): Depth of the iteration.
+         - multipv (int, optional): Number of best moves with exact scores. Defaults to 1.
+
+        Returns:
+
+         - list[tuple[int, Move]]: Scores and moves of the best moves, the best first.
+        """
+        beta = INFINITY
+        best: list[tuple[int, Move]] = []
+        for move in moves:
+            alpha = best[-1][0] if len(best) >= multipv else -INFINITY
+            position.push(move)
+            score = -self._search(position, depth - 1, -beta, -alpha, 1)
+            position.pop()
+            if self.stopped:
+                break
+            if score > alpha:
+                index = next((i for i, (other, _) in enumerate(best) if score > other), len(best))
+                best.insert(index, (score, move))
+                del best[multipv:]
+        if not best:
+            return [(-INFINITY, moves[0])]
+        self.table[position.hash] = (depth, best[0][0], EXACT, best[0][1])
+        return best
+
+    def _check_limits(self) -> None:
+        """Sets stopped flag when time, node limit or stop request is reached.
+        """
+        if self.stop_event.is_set() or (self.deadline is not None and time.perf_counter() >= self.deadline) or \
+            (self.node_limit is not None and self.nodes >= self.node_limit):
+            self.stopped = True
+
+    def _search(self, position: Position, depth: int, alpha: int, beta: int, ply: int) -> int:
+        """Negamax alpha-beta search with transposition table.
+
+        Args:
+
+         - position (Position): Searched position.
+         - depth (int): Remaining depth.
+         - alpha (int): Lower bound.
+         - beta (int): Upper bound.
+         - ply (int): Distance from the root.
+
+        Returns:
+
+         - int: Score from side to move point of view.
+        """
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            self._check_limits()
+        if self.stopped:
+            return 0
+        if position.halfmove_clock >= 100 or position.is_repetition(2):
+            return 0
+        in_check = position.in_check()
+        if in_check:
+            depth += 1
+        if depth <= 0:
+            return self._quiescence(position, alpha, beta, ply)
+        entry = self.table.get(position.hash)
+        table_move = None
+        if entry:
+            entry_depth, entry_score, flag, table_move = entry
+            if entry_depth >= depth:
+                entry_score = self._score_from_table(entry_score, ply)
+                if flag == EXACT or (flag == LOWER and entry_score >= beta) or (flag == UPPER and entry_score <= alpha):
+                    return entry_score
+        original_alpha = alpha
+        best_score, best_move = -INFINITY, None
+        legal = 0
+        for move in self._order(position, position.pseudo_legal_moves(), table_move, ply):
+            if not position.is_legal(move):
+                continue
+            legal += 1
+            quiet = not position.board[move[1]] and not move[2]
+            position.push(move)
+            score = -self._search(position, depth - 1, -beta, -alpha, ply + 1)
+            position.pop()
+            if self.stopped:
+                return 0
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if quiet:
+                            killers = self.killers[ply]
+                            if killers[0] != move:
+                                killers[1], killers[0] = killers[0], move
+                            self.history[move] = self.history.get(move, 0) + depth * depth
+                        break
+        if not legal:
+            return -MATE + ply if in_check else 0
+        flag = UPPER if best_score <= original_alpha else LOWER if best_score >= beta else EXACT
+        self.table[position.hash] = (depth, self._score_to_table(best_score, ply), flag, best_move)
+        return best_score
+
+    def _quiescence(self, position: Position, alpha: int, beta: int, ply: int) -> int:
+        """Searches only captures and promotions until the position is quiet.
+
+        Args:
+
+         - position (Position): Searched position.
+         - alpha (int): Lower bound.
+         - beta (int): Upper bound.
+         - ply (int): Distance from the root.
+
+        Returns:
+
+         - int: Score from side to move point of view.
+        """
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            self._check_limits()
+        if self.stopped:
+            return 0
+        stand_pat = evaluate(position)
+        if stand_pat >= beta:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+        board = position.board
+        captures = [move for move in position.pseudo_legal_moves() if board[move[1]] or move[2] == 'q']
+        captures.sort(key=lambda move: VICTIM_VALUES[board[move[1]]] * 10 - VICTIM_VALUES[board[move[0]]], reverse=True)
+        for move in captures:
+            if not position.is_legal(move):
+                continue
+            position.push(move)
+            score = -self._quiescence(position, -beta, -alpha, ply + 1)
+            position.pop()
+            if self.stopped:
+                return 0
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    def _order(self, position: Position, moves: list[Move], table_move: Move | None, ply: int) -> list[Move]:
+        """Orders moves: move from transposition table, captures by victim and attacker value, promotions, killers and history.
+
+        Args:
+
+         - position (Position): Searched position.
+         - moves (list[Move]): Pseudo legal moves.
+         - table_move (Move | None): Best move stored in transposition table.
+         - ply (int): Distance from the root.
+
+        Returns:
+
+         - list[Move]: Moves sorted from the most promising.
+        """
+        board = position.board
+        killers = self.killers[ply] if ply < len(self.killers) else [None, None]
+        history = self.history
+        def priority(move: Move) -> int:
+            if move == table_move:
+                return 1 << 30
+            victim = board[move[1]]
+            if victim:
+                return (1 << 25) + VICTIM_VALUES[victim] * 10 - VICTIM_VALUES[board[move[0]]]
+            if move[2]:
+                return 1 << 24
+            if move == killers[0] or move == killers[1]:
+                return 1 << 23
+            return history.get(move, 0)
+        return sorted(moves, key=priority, reverse=True)
+
+    @staticmethod
+    def _score_to_table(score: int, ply: int) -> int:
+        """Converts mate score into distance from the current node before storing it.
+
+        Args:
+
+         - score (int): Score relative to the root.
+         - ply (int): Distance from the root.
+
+        Returns:
+
+         - int: Score relative to the node.
+        """
+        if score >= MATE - 1000:
+            return score + ply
+        if score <= -MATE + 1000:
+            return score - ply
+        return score
+
+    @staticmethod
+    def _score_from_table(score: int, ply: int) -> int:
+        """Converts mate score read from transposition table back to distance from the root.
+
+        Args:
+
+         - score (int): Score relative to the node.
+         - ply (int): Distance from the root.
+
+        Returns:
+
+         - int: Score relative to the root.
+        """
+        if score >= MATE - 1000:
+            return score - ply
+        if score <= -MATE + 1000:
+            return score + ply
+        return score
+
+    def line(self, position: Position, move: Move, depth: int) -> list[Move]:
+        """Variation starting with the given root move followed by best moves stored in transposition table.
+
+        Args:
+
+         - position (Position): Root position, it is restored afterwards.
+         - move (Move): First move of the line.
+         - depth (int): Maximum length of the line.
+
+        Returns:
+
+         - list[Move]: Variation starting with the move.
+        """
+        position.push(move)
+        line = [move] + self.principal_variation(position, depth - 1)
+        position.pop()
+        return line
+
+    def principal_variation(self, position: Position, depth: int) -> list[Move]:
+        """Follows best moves stored in transposition table.
+
+        Args:
+
+         - position (Position): Root position, it is restored afterwards.
+         - depth (int): Maximum length of the variation.
+
+        Returns:
+
+         - list[Move]: Principal variation.
+        """
+        pv: list[Move] = []
+        seen: set[int] = set()
+        while len(pv) < depth and position.hash not in seen:
+            seen.add(position.hash)
+            entry = self.table.get(position.hash)
+            if not entry or not entry[3] or entry[3] not in position.legal_moves():
+                break
+            pv.append(entry[3])
+            position.push(entry[3])
+        for _ in pv:
+            position.pop()
+        return pv
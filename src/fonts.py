@@ -0,0 +1,177 @@
+"""File with persistent cache of font family names. Reading the name from TTF file requires fontTools and parsing the
+file, so names are stored on disk together with size and modification time of the file and only new or changed fonts
+are parsed again, in a background thread.
+"""
+
+from typing import Callable
+import threading
+import json
+import os
+
+from tools import resource_path
+
+def read_font_name(ttf_path: str) -> str | None:
+    """Reads full font name (name record 4) from the font file. Tables are loaded lazily, so only the name table is parsed.
+
+    Args:
+
+     - ttf_path (str): Path to .ttf font file.
+
+    Returns:
+
+     - str | None: Font name on success, None otherwise.
+    """
+    from fontTools.ttLib import TTFont # imported on first use, it's the heaviest import of the app
+    try:
+        with TTFont(ttf_path, lazy=True) as font:
+            for record in font['name'].names:
+                if record.nameID == 4:
+                    if b'\000' in record.string:
+                        return record.string.decode('utf-16-be')
+                    return record.string.decode('utf-8')
+        return ''
+    except Exception as e: # dont really know what kind of error might occur here
+        print(f"An error occurred: {e}")
+        return None
+
+class FontCache:
+    """Class holding font names keyed by path, valid as long as size and modification time of the file don't change.
+    """
+    def __init__(self, cache_path: str) -> None:
+        """Constructor:
+
+        Args:
+
+         - cache_path (str): JSON file storing the cache.
+        """
+        self.cache_path: str = cache_path
+        self.entries: dict[str, dict[str, str | int]] | None = None
+        self.lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def signature(path: str) -> tuple[int, int] | None:
+        """Returns size and modification time of the file.
+
+        Args:
+
+         - path (str): Path to the font file.
+
+        Returns:
+
+         - tuple[int, int] | None: Size and modification time in nanoseconds, None if file doesn't exist.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def load(self) -> dict[str, dict[str, str | int]]:
+        """Reads the cache file on first use.
+
+        Returns:
+
+         - dict[str, dict[str, str | int]]: Cached entries with name, size and mtime keyed by path.
+        """
+        if self.entries is None:
+            try:
+                with open(self.cache_path, encoding='utf-8') as cache_file:
+                    self.entries = json.load(cache_file)
+            except (OSError, ValueError):
+                self.entries = {}
+        return self.entries
+
+    def save(self) -> None:
+        """Writes the cache file through temporary file, so it's never left half written.
+        """
+        temporary_path = f'{self.cache_path}.tmp'
+        try:
+            with open(temporary_path, 'w', encoding='utf-8') as cache_file:
+                json.dump(self.entries, cache_file, indent=1)
+            os.replace(temporary_path, self.cache_path)
+        except OSError as e:
+            print(f'Couldn`t save font cache due to error: {e}')
+
+    def get(self, path: str) -> str | None:
+        """Returns cached name of the font if the file didn't change.
+
+        Args:
+
+         - path (str): Path to the font file.
+
+        Returns:
+
+         - str | None: Cached name or None if the font has to be parsed.
+        """
+        signature = self.signature(path)
+        with self.lock:
+            entry = self.load().get(os.path.abspath(path))
+        if entry is None or signature is None or (entry['size'], entry['mtime']) != signature:
+            return None
+        return str(entry['name'])
+
+    def name(self, path: str) -> str | None:
+        """Returns name of the font, parsing and caching it if necessary.
+
+        Args:
+
+         - path (str): Path to the font file.
+
+        Returns:
+
+         - str | None: Name of the font, None if the file couldn't be read.
+        """
+        if (name := self.get(path)) is not None:
+            return name
+        name = self.parse(path)
+        with self.lock:
+            self.save()
+        return name
+
+    def parse(self, path: str) -> str | None:
+        """Parses the font and stores its name in memory.
+
+        Args:
+
+         - path (str): Path to the font file.
+
+        Returns:
+
+         - str | None: Name of the font, None if the file couldn't be read.
+        """
+        signature = self.signature(path)
+        name = read_font_name(path)
+        if name is not None and signature is not None:
+            with self.lock:
+                self.load()[os.path.abspath(path)] = {'name': name, 'size': signature[0], 'mtime': signature[1]}
+        return name
+
+    def refresh(self, paths: list[str], on_name: Callable[[str, str], None]) -> threading.Thread:
+        """Parses new and changed fonts in the background thread, removes entries of deleted files and saves the cache.
+
+        Args:
+
+         - paths (list[str]): Paths of all available fonts.
+         - on_name (Callable[[str, str], None]): Called from the worker thread with path and name of every parsed font.
+
+        Returns:
+
+         - threading.Thread: Started worker thread.
+        """
+        stale = [path for path in paths if self.get(path) is None]
+        def thread_task():
+            for path in stale:
+                if name := self.parse(path):
+                    on_name(path, name)
+            with self.lock:
+                entries = self.load()
+                removed = [path for path in entries if not os.path.exists(path)]
+                for path in removed:
+                    del entries[path]
+                if stale or removed:
+                    self.save()
+        thread = threading.Thread(target=thread_task, daemon=True)
+        thread.start()
+        return thread
+
+FONT_CACHE: FontCache = FontCache(resource_path(os.path.join('assets', 'fonts.json')))
@@ -0,0 +1,88 @@
+"""File with headless variant of the Board. Figures are held in plain cells without any widgets, so the GUI rules
+(piece.py generators, check_check, is_game_over and handle_clicks with handle_move) run without a window.
+Used by benchmarks and by the differential harness.
+"""
+
+from typing import Any
+
+from cell import Board
+import rules
+
+class HeadlessCell:
+    """Cell of the headless board, holds only the figure and its position.
+    """
+    __slots__ = ('figure', 'position')
+
+    def __init__(self, figure: Any, position: tuple[int, int]) -> None:
+        """Constructor:
+
+        Args:
+
+         - figure (piece.Piece | None): Figure on a cell.
+         - position (tuple[int, int]): Position on a board.
+        """
+        self.figure: Any = figure
+        self.position: tuple[int, int] = position
+
+    def configure(self, **kwargs: Any) -> None:
+        """Ignores visual changes e.g. highlights.
+        """
+
+    def update(self) -> None:
+        """Ignores repainting of the figure.
+        """
+
+class HeadlessRecord:
+    """Moves record which doesn't display anything.
+    """
+    def record_move(self, notation: str, color: str) -> None:
+        """Ignores recorded move.
+        """
+
+    def remove_last(self, color: str) -> None:
+        """Ignores removed move.
+        """
+
+    def hide_replay(self) -> None:
+        """Ignores leaving the replay.
+        """
+
+class HeadlessBoard(Board):
+    """Board created without widgets by headless_board.
+    """
+    def display_message(self, message: str, duration_sec: int) -> None:
+        """Ignores messages like checkmate notification.
+
+        Args:
+
+         - message (str): Message which would be displayed.
+         - duration_sec (int): Duration of the message.
+        """
+
+def headless_board(fen: str = rules.STARTING_FEN) -> HeadlessBoard:
+    """Creates Board with figures placed from the FEN without creating any widgets. Moves can be played
+    with handle_clicks followed by handle_move like clicks in the app, except promotions, which open the menu.
+
+    Args:
+
+     - fen (str, optional): Position to set up. Defaults to rules.STARTING_FEN.
+
+    Returns:
+
+     - HeadlessBoard: Board holding the figures and the headless position.
+    """
+    board = HeadlessBoard.__new__(HeadlessBoard)
+    board.position = rules.Position(fen)
+    board.current_turn = board.position.turn
+    board.redo_moves = []
+    board.replay = None
+    board.highlighted = []
+    board.clicked_figure = None
+    board.previous_coords = None
+    board.notification = None
+    board.moves_record = HeadlessRecord()
+    board.position_listeners = []
+    board.board = []
+    for i in range(8):
+        board.board.append([HeadlessCell(board.create_figure(board.position.board[i * 8 + j], (i, j)), (i, j)) for j in range(8)])
+    return board
@@ -0,0 +1,255 @@
+"""File with toggleable instrumentation of the hot paths of the game. Instrumented methods are wrapped only while
+instrumentation is enabled, disabling it restores the original methods, so there is no overhead when it's off.
+Every method records number of calls, cumulative time and per call latency.
+Latency of interactions, from the click until the board is redrawn, is kept in rolling histograms.
+
+Usage:
+
+    python src/main.py --instrument [--latency] [--instrument-output stats.json]
+
+F12 toggles instrumentation in the app, Ctrl+F12 toggles latency histograms and Shift+F12 shows the report.
+"""
+
+from typing import Any, Callable, Iterable
+from collections import deque
+import functools
+import time
+
+LATENCY_BUCKETS_MS: list[float] = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+
+class Probes:
+    """Class holding instrumented methods and their statistics.
+    """
+    def __init__(self) -> None:
+        """Constructor:
+        """
+        self.targets: dict[str, tuple[type, str, Callable]] = {}
+        self.stats: dict[str, list[int]] = {}
+        self.enabled: bool = False
+
+    def register(self, owner: type, name: str) -> None:
+        """Registers method of the class to be instrumented, it's reported as 'Class.method'.
+
+        Args:
+
+         - owner (type): Class defining the method.
+         - name (str): Name of the method.
+        """
+        label = f'{owner.__name__}.{name}'
+        self.targets[label] = (owner, name, owner.__dict__[name])
+        if self.enabled:
+            setattr(owner, name, self.wrap(label, owner.__dict__[name]))
+
+    def register_all(self, owners: Iterable[type], names: Iterable[str]) -> None:
+        """Registers the methods of every class.
+
+        Args:
+
+         - owners (Iterable[type]): Classes defining the methods.
+         - names (Iterable[str]): Names of the methods.
+        """
+        names = tuple(names)
+        for owner in owners:
+            for name in names:
+                self.register(owner, name)
+
+    def wrap(self, label: str, function: Callable) -> Callable:
+        """Creates wrapper measuring calls of the function.
+
+        Args:
+
+         - label (str): Name of the method in the report.
+         - function (Callable): Original method.
+
+        Returns:
+
+         - Callable: Wrapped method.
+        """
+        stats = self.stats.setdefault(label, [0, 0, 0, 0]) # calls, total ns, min ns, max ns
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - start
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] = elapsed if stats[0] == 1 else min(stats[2], elapsed)
+                stats[3] = max(stats[3], elapsed)
+        return wrapper
+
+    def enable(self) -> None:
+        """Replaces registered methods with measuring wrappers.
+        """
+        if self.enabled:
+            return
+        for label, (owner, name, function) in self.targets.items():
+            setattr(owner, name, self.wrap(label, function))
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Restores original methods, collected statistics are kept.
+        """
+        if not self.enabled:
+            return
+        for owner, name, function in self.targets.values():
+            setattr(owner, name, function)
+        self.enabled = False
+
+    def toggle(self) -> bool:
+        """Enables or disables the instrumentation.
+
+        Returns:
+
+         - bool: True if instrumentation is enabled now.
+        """
+        self.disable() if self.enabled else self.enable()
+        return self.enabled
+
+    def reset(self) -> None:
+        """Clears collected statistics.
+        """
+        for stats in self.stats.values():
+            stats[:] = [0, 0, 0, 0]
+
+    def results(self) -> list[dict[str, Any]]:
+        """Returns statistics of methods which were called, the slowest in total first.
+
+        Returns:
+
+         - list[dict[str, Any]]: Name, number of calls, total, mean, min and max time in milliseconds.
+        """
+        results = [{'name': label, 'calls': calls, 'total_ms': total / 1e6, 'mean_ms': total / calls / 1e6,
+                    'min_ms': fastest / 1e6, 'max_ms': slowest / 1e6}
+                   for label, (calls, total, fastest, slowest) in self.stats.items() if calls]
+        return sorted(results, key=lambda result: result['total_ms'], reverse=True)
+
+    def report(self) -> str:
+        """Formats the statistics. Times are inclusive, e.g. check_check contains check_possible_moves it calls.
+
+        Returns:
+
+         - str: Human readable report.
+        """
+        lines = [f'{'method':<32} {'calls':>8} {'total ms':>10} {'mean ms':>9} {'min ms':>9} {'max ms':>9}']
+        for result in self.results():
+            lines.append(f'{result['name']:<32} {result['calls']:>8} {result['total_ms']:>10.2f} {result['mean_ms']:>9.3f} '
+                         f'{result['min_ms']:>9.3f} {result['max_ms']:>9.3f}')
+        if len(lines) == 1:
+            lines.append('No calls recorded' if self.enabled else 'Instrumentation is disabled')
+        return '\n'.join(lines)
+
+class LatencyHistograms:
+    """Class holding latencies of the last interactions of every kind, e.g. click until highlights are drawn.
+    """
+    def __init__(self, window: int = 1000) -> None:
+        """Constructor:
+
+        Args:
+
+         - window (int, optional): Number of the latest samples kept for every kind. Defaults to 1000.
+        """
+        self.window: int = window
+        self.samples: dict[str, deque[float]] = {}
+        self.enabled: bool = False
+
+    def toggle(self) -> bool:
+        """Enables or disables measuring of the interactions.
+
+        Returns:
+
+         - bool: True if measuring is enabled now.
+        """
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def record(self, kind: str, started: float) -> None:
+        """Records latency of the interaction which ends now.
+
+        Args:
+
+         - kind (str): Kind of the interaction.
+         - started (float): Value of time.perf_counter taken when the interaction started.
+        """
+        self.samples.setdefault(kind, deque(maxlen=self.window)).append((time.perf_counter() - started) * 1000)
+
+    def reset(self) -> None:
+        """Clears recorded samples.
+        """
+        self.samples.clear()
+
+    @staticmethod
+    def percentile(ordered: list[float], percent: float) -> float:
+        """Returns percentile of the samples using nearest rank.
+
+        Args:
+
+         - ordered (list[float]): Sorted samples.
+         - percent (float): Percentile in range 0-100.
+
+        Returns:
+
+         - float: Sample at the percentile.
+        """
+        return ordered[max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))]
+
+    def results(self) -> dict[str, dict[str, Any]]:
+        """Computes percentiles and histogram of every kind of interaction.
+
+        Returns:
+
+         - dict[str, dict[str, Any]]: Number of samples, p50, p95, p99, max in milliseconds and counts of samples
+         in histogram buckets, keyed by kind.
+        """
+        results: dict[str, dict[str, Any]] = {}
+        for kind, samples in self.samples.items():
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+            buckets = {f'<={bound:g}': 0 for bound in LATENCY_BUCKETS_MS}
+            buckets[f'>{LATENCY_BUCKETS_MS[-1]:g}'] = 0
+            for sample in ordered:
+                bound = next((bound for bound in LATENCY_BUCKETS_MS if sample <= bound), None)
+                buckets[f'<={bound:g}' if bound is not None else f'>{LATENCY_BUCKETS_MS[-1]:g}'] += 1
+            results[kind] = {'samples': len(ordered), 'p50_ms': self.percentile(ordered, 50), 'p95_ms': self.percentile(ordered, 95),
+                             'p99_ms': self.percentile(ordered, 99), 'max_ms': ordered[-1], 'histogram': buckets}
+        return results
+
+    def report(self) -> str:
+        """Formats percentiles of the interactions.
+
+        Returns:
+
+         - str: Human readable report.
+        """
+        lines = [f'{'interaction':<32} {'samples':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}']
+        for kind, result in self.results().items():
+            lines.append(f'{kind:<32} {result['samples']:>8} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} '
+                         f'{result['p99_ms']:>9.2f} {result['max_ms']:>9.2f}')
+        if len(lines) == 1:
+            lines.append('No interactions recorded' if self.enabled else 'Latency measuring is disabled')
+        return '\n'.join(lines)
+
+PROBES: Probes = Probes()
+LATENCY: LatencyHistograms = LatencyHistograms()
+
+def report() -> str:
+    """Formats reports of instrumented methods and interaction latency.
+
+    Returns:
+
+     - str: Human readable report.
+    """
+    return f'{PROBES.report()}\n\n{LATENCY.report()}'
+
+def dump(path: str) -> None:
+    """Saves statistics of instrumented methods and interaction latency as JSON.
+
+    Args:
+
+     - path (str): Output file.
+    """
+    import json
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump({'methods': PROBES.results(), 'latency': LATENCY.results()}, output, indent=2)
@@ -0,0 +1,218 @@
+"""Load generator of the game server. Simulates many concurrent games spread over a number of connections:
+every game asks for legal moves and plays a random one until it ends or reaches the ply limit. Some connections
+only watch the games and count the broadcast updates. Prints moves per second, latency percentiles and memory per game
+reported by the server.
+
+Usage:
+
+    python src/loadgen.py [--host 127.0.0.1] [--port 5050] [--unix /tmp/chess.sock] [--games 2000] [--connections 50]
+"""
+
+from collections import deque
+from typing import Any
+import argparse
+import asyncio
+import random
+import time
+
+from server import DEFAULT_PORT
+
+class Connection:
+    """Client connection with pipelined requests. Replies come in the order of requests, update lines are only counted.
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Constructor:
+            - starts reading replies
+
+        Args:
+
+         - reader (asyncio.StreamReader): Lines from the server.
+         - writer (asyncio.StreamWriter): Commands to the server.
+        """
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+        self.waiting: deque[asyncio.Future] = deque()
+        self.updates: int = 0
+        self.reading: asyncio.Task = asyncio.create_task(self.read())
+
+    @classmethod
+    async def open(cls, host: str, port: int, unix: str | None) -> 'Connection':
+        """Connects to the server.
+
+        Args:
+
+         - host (str): Address of the server.
+         - port (int): TCP port.
+         - unix (str | None): Path of Unix socket used instead of TCP.
+
+        Returns:
+
+         - Connection: Connected client.
+        """
+        if unix:
+            reader, writer = await asyncio.open_unix_connection(unix, limit=1024 * 1024)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=1024 * 1024)
+        return cls(reader, writer)
+
+    async def read(self) -> None:
+        """Passes replies to the waiting requests.
+        """
+        while line := await self.reader.readline():
+            text = line.decode().rstrip('\n')
+            if text.startswith('update '):
+                self.updates += 1
+            elif self.waiting:
+                self.waiting.popleft().set_result(text)
+        while self.waiting:
+            self.waiting.popleft().set_exception(ConnectionError('Server closed the connection'))
+
+    async def request(self, line: str) -> str:
+        """Sends the command and waits for its reply.
+
+        Args:
+
+         - line (str): Command without the new line character.
+
+        Raises:
+
+         - RuntimeError: If the server replied with error.
+
+        Returns:
+
+         - str: Reply without 'ok'.
+        """
+        reply = asyncio.get_running_loop().create_future()
+        self.waiting.append(reply)
+        self.writer.write(f'{line}\n'.encode())
+        text = await reply
+        if not text.startswith('ok'):
+            raise RuntimeError(f'{line}: {text}')
+        return text[3:]
+
+    async def close(self) -> None:
+        """Says goodbye and closes the connection.
+        """
+        self.writer.write(b'quit\n')
+        await self.writer.drain()
+        self.writer.close()
+        await self.reading
+
+async def play_game(connection: Connection, rng: random.Random, max_plies: int, latencies: list[float],
+                    watcher: Connection | None) -> int:
+    """Plays one random game on the server.
+
+    Args:
+
+     - connection (Connection): Connection playing the game.
+     - rng (random.Random): Random generator choosing the moves.
+     - max_plies (int): Maximum length of the game.
+     - latencies (list[float]): Collects round trip times of moves in seconds.
+     - watcher (Connection | None): Connection watching the game.
+
+    Returns:
+
+     - int: Number of played moves.
+    """
+    number = (await connection.request('new')).split()[0]
+    if watcher:
+        await watcher.request(f'watch {number}')
+    for ply in range(max_plies):
+        moves = (await connection.request(f'legal {number}')).split()[1:]
+        if not moves:
+            return ply
+        started = time.perf_counter()
+        reply = await connection.request(f'move {number} {rng.choice(moves)}')
+        latencies.append(time.perf_counter() - started)
+        if reply.split()[3] != '*':
+            return ply + 1
+    return max_plies
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile.
+
+    Args:
+
+     - values (list[float]): Sorted values.
+     - fraction (float): Percentile as fraction e.g. 0.99.
+
+    Returns:
+
+     - float: Value of the percentile, 0 if there are no values.
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+def parse_stats(reply: str) -> dict[str, int]:
+    """Parses reply of the stats command.
+
+    Args:
+
+     - reply (str): Reply without 'ok'.
+
+    Returns:
+
+     - dict[str, int]: Values keyed by name.
+    """
+    return {key: int(value) for key, value in (item.split('=') for item in reply.split())}
+
+async def run(host: str, port: int, unix: str | None, games: int, connections: int, watchers: int,
+              max_plies: int, seed: int) -> dict[str, Any]:
+    """Runs the simulation. Games are kept open until all of them finished, so the memory reported by the server
+    includes all of them.
+
+    Args:
+
+     - host (str): Address of the server.
+     - port (int): TCP port.
+     - unix (str | None): Path of Unix socket used instead of TCP.
+     - games (int): Number of concurrent games.
+     - connections (int): Number of playing connections, games are spread evenly between them.
+     - watchers (int): Number of connections watching the games.
+     - max_plies (int): Maximum length of one game.
+     - seed (int): Seed of random moves.
+
+    Returns:
+
+     - dict[str, Any]: Games, moves, duration, moves per second, latency percentiles in ms, updates received
+     by watchers and memory per game in kB.
+    """
+    players = [await Connection.open(host, port, unix) for _ in range(connections)]
+    spectators = [await Connection.open(host, port, unix) for _ in range(watchers)]
+    before = parse_stats(await players[0].request('stats'))
+    latencies: list[float] = []
+    started = time.perf_counter()
+    moves = await asyncio.gather(*(play_game(players[index % connections], random.Random(seed + index), max_plies, latencies,
+                                             spectators[index % watchers] if watchers else None) for index in range(games)))
+    elapsed = time.perf_counter() - started
+    after = parse_stats(await players[0].request('stats'))
+    await asyncio.sleep(0.1) # last updates still on the way to watchers
+    for connection in players + spectators:
+        await connection.close()
+    latencies.sort()
+    games_added = max(1, after['games'] - before['games'])
+    return {'games': games, 'moves': sum(moves), 'seconds': elapsed, 'moves_per_second': sum(moves) / elapsed,
+            'latency_p50_ms': percentile(latencies, 0.5) * 1000, 'latency_p99_ms': percentile(latencies, 0.99) * 1000,
+            'updates': sum(connection.updates for connection in spectators),
+            'memory_per_game_kb': (after['memory_kb'] - before['memory_kb']) / games_added}
+
+def main() -> None:
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description='Load generator of the game server.')
+    parser.add_argument('--host', default='127.0.0.1', help='address of the server')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='TCP port')
+    parser.add_argument('--unix', default=None, help='path of Unix socket used instead of TCP')
+    parser.add_argument('--games', type=int, default=2000, help='number of concurrent games')
+    parser.add_argument('--connections', type=int, default=50, help='number of playing connections')
+    parser.add_argument('--watchers', type=int, default=5, help='number of watching connections')
+    parser.add_argument('--max-plies', type=int, default=80, help='maximum length of one game')
+    parser.add_argument('--seed', type=int, default=1, help='seed of random moves')
+    args = parser.parse_args()
+    result = asyncio.run(run(args.host, args.port, args.unix, args.games, max(1, args.connections), args.watchers,
+                             args.max_plies, args.seed))
+    print(f'{result['games']} games, {result['moves']} moves in {result['seconds']:.2f} s, {result['moves_per_second']:.0f} moves/s')
+    print(f'move latency p50 {result['latency_p50_ms']:.2f} ms, p99 {result['latency_p99_ms']:.2f} ms')
+    print(f'{result['updates']} updates received by watchers, {result['memory_per_game_kb']:.1f} kB per game')
+
+if __name__ == '__main__':
+    main()
@@ -16,16 +16,29 @@ Libraries used:
  - built in libraries
 """
 
+import time
+STARTED: float = time.perf_counter()
+
+from typing import Any
 import customtkinter as ctk
+import argparse
 import os
 import platform
+import sys
 import threading
 
 from tools import resource_path, get_from_config
 from properties import COLOR
 
-from menus import MovesRecord, Options
+from menus import MovesRecord, Options, AnalysisPane, OpeningExplorer
+from startup import StartupProfile, import_times
+import instrumentation
+from instrumentation import PROBES, LATENCY
+from themes import SPRITES
+from style import STYLE
 from cell import Board
+import pgn
+import rules
 
 class MainWindow(ctk.CTk):
     """Main class handling the app. Setting size, minimum size, font loading, icon setting,
@@ -35,7 +48,7 @@ class MainWindow(ctk.CTk):
 
      - ctk.CTk : Main app window of customtkinter library (master).
     """
-    def __init__(self) -> None:
+    def __init__(self, profile: StartupProfile | None = None) -> None:
         """Constructor for the MainWindow class: 
             - sets title
             - sets geometry
@@ -44,10 +57,19 @@ class MainWindow(ctk.CTk):
             - Creates instances of the classes:
                 - MoveRecord
                 - Options
-                - Board
+            - Board is created once the window is shown: create_board
             - loads theme of the app from the config: get_from_config
+
+        Args:
+
+         - profile (StartupProfile | None, optional): Collects timestamps of startup phases. Defaults to None.
         """
+        self.profile: StartupProfile | None = profile
+        self.mark('imports')
         super().__init__(fg_color=COLOR.BACKGROUND)
+        STYLE.attach(self)
+        STYLE.subscribe(self, fg_color='BACKGROUND')
+        self.mark('window created')
         self.title('Chess')
         self.geometry(self.set_window_size())
         size: int = int(get_from_config('size'))
@@ -55,12 +77,111 @@ class MainWindow(ctk.CTk):
         self.load_font()
         self.moves_record: MovesRecord = MovesRecord(self)
         self.moves_record.pack(side=ctk.RIGHT, padx=10, pady=10, fill=ctk.Y)
-        self.options: Options = Options(self, self.restart_game, self.update_assets, self.update_font)
+        self.options: Options = Options(self, self.restart_game, self.update_assets, self.update_font, self.save_game, self.set_position,
+                                        self.board_undo, self.board_redo, self.load_game, self.toggle_analysis,
+                                        self.toggle_engine, self.toggle_explorer)
         self.options.pack(side=ctk.LEFT, padx=10, pady=10, fill=ctk.Y)
-        self.board: Board = Board(self, self.moves_record, size)
-        self.board.pack(side=ctk.RIGHT, padx=10, pady=10, expand=True, ipadx=5, ipady=5, anchor=ctk.CENTER)
+        self.mark('menus built')
         self.theme: str = str(get_from_config('theme'))
+        SPRITES.preload(self.theme, size - 10)
         self.set_icon()
+        self.size: int = size
+        self.board_created: bool = False
+        self.analysis_pane: AnalysisPane | None = None
+        self.explorer: OpeningExplorer | None = None
+        self.opponent: Any = None # opponent.EngineOpponent, imported with the first use of the engine
+        self.engine_poll: str | None = None
+        self.archived: tuple[str, list[rules.Move]] | None = None
+        self.bind('<Map>', self.on_map, add='+')
+
+    def mark(self, label: str) -> None:
+        """Records the end of the startup phase when startup is profiled.
+
+        Args:
+
+         - label (str): Name of the phase.
+        """
+        if self.profile:
+            self.profile.mark(label)
+
+    def on_map(self, event) -> None:
+        """Schedules creation of the board after the window is shown for the first time, so the window doesn't wait
+        for all cells and figures.
+
+        Args:
+
+         - event (Any): Map event of the window or any of its children.
+        """
+        if event.widget is not self or self.board_created:
+            return
+        self.board_created = True
+        self.mark('window shown')
+        self.after_idle(self.create_board)
+
+    def create_board(self) -> None:
+        """Creates the Board and binds keyboard shortcuts using it.
+        """
+        self.board: Board = Board(self, self.moves_record, self.size)
+        self.board.pack(side=ctk.RIGHT, padx=10, pady=10, expand=True, ipadx=5, ipady=5, anchor=ctk.CENTER)
+        self.mark('board built')
+        self.board.position_listeners.append(self.archive_game)
+        self.bind('<Control-z>', lambda e: self.board_undo())
+        self.bind('<Control-y>', lambda e: self.board_redo())
+        self.bind('<Left>', lambda e: self.board_undo())
+        self.bind('<Right>', lambda e: self.board_redo())
+        self.bind('<Home>', lambda e: self.board.seek(0))
+        self.bind('<End>', lambda e: self.board.seek(len(self.board.replay) if self.board.replay else 0))
+        self.bind('<F12>', lambda e: self.toggle_instrumentation())
+        self.bind('<Control-F12>', lambda e: self.toggle_latency())
+        self.bind('<Shift-F12>', lambda e: self.show_instrumentation())
+        if self.profile:
+            self.after_idle(self.finish_profile)
+
+    def finish_profile(self) -> None:
+        """Marks the first frame with the board drawn and closes the app, the report is printed after the main loop ends.
+        """
+        self.update_idletasks()
+        self.mark('board drawn')
+        self.destroy()
+
+    def toggle_instrumentation(self) -> None:
+        """Enables or disables measuring of the hot paths and notifies the user.
+        """
+        self.board.display_message(f'Instrumentation {'on' if PROBES.toggle() else 'off'}', 1)
+
+    def toggle_latency(self) -> None:
+        """Enables or disables measuring of click latency and notifies the user.
+        """
+        self.board.display_message(f'Latency {'on' if LATENCY.toggle() else 'off'}', 1)
+
+    def show_instrumentation(self) -> None:
+        """Shows window with the instrumentation report, which can be refreshed, reset or saved as JSON.
+        """
+        window = ctk.CTkToplevel(self, fg_color=COLOR.BACKGROUND)
+        window.title('Instrumentation')
+        window.attributes('-topmost', True)
+        text = ctk.CTkTextbox(window, width=720, height=360, font=ctk.CTkFont('Courier', 13), wrap=ctk.NONE,
+                              fg_color=COLOR.NOTATION_BACKGROUND_W, text_color=COLOR.TEXT, corner_radius=0)
+        text.pack(side=ctk.TOP, padx=10, pady=10, fill=ctk.BOTH, expand=True)
+        def refresh():
+            text.configure(state=ctk.NORMAL)
+            text.delete('1.0', ctk.END)
+            text.insert('1.0', instrumentation.report())
+            text.configure(state=ctk.DISABLED)
+        def reset():
+            PROBES.reset()
+            LATENCY.reset()
+            refresh()
+        def save():
+            path = ctk.filedialog.asksaveasfilename(parent=window, defaultextension='.json', filetypes=[('JSON', '*.json')])
+            if path:
+                instrumentation.dump(path)
+        buttons = ctk.CTkFrame(window, fg_color='transparent')
+        buttons.pack(side=ctk.BOTTOM, padx=10, pady=(0, 10))
+        for label, command in (('Refresh', refresh), ('Reset', reset), ('Save JSON', save)):
+            ctk.CTkButton(buttons, text=label, command=command, corner_radius=0, fg_color=COLOR.TILE_1,
+                          hover_color=COLOR.HIGH_TILE_1, text_color=COLOR.TEXT).pack(side=ctk.LEFT, padx=5)
+        refresh()
 
     def load_font(self) -> None:
         """Function loads font independently on the users operating system.
@@ -95,6 +216,136 @@ class MainWindow(ctk.CTk):
         """
         self.board.restart_game()
         self.moves_record.restart()
+        self.archived = None
+
+    def save_game(self) -> None:
+        """Asks for the file name and saves the current game in PGN format.
+        """
+        path = ctk.filedialog.asksaveasfilename(parent=self, defaultextension='.pgn', filetypes=[('PGN', '*.pgn')])
+        if not path:
+            return
+        with open(path, 'w', encoding='utf-8') as pgn_file:
+            pgn_file.write(self.board.export_pgn())
+
+    def archive_game(self, position: rules.Position) -> None:
+        """Queues the game played on the board for the archive once it ends. Replayed games aren't archived again.
+        The board doesn't stop the game after a draw by repetition or 50 moves, so moves played after the archived end
+        belong to the archived game. Game taken back before its end is archived again when it ends.
+
+        Args:
+
+         - position (rules.Position): Current position on the board.
+        """
+        if self.board.replay or not position.undo_stack or position.result() == '*':
+            return
+        moves = position.move_stack
+        if self.archived and self.archived[0] == position.start_fen and moves[:len(self.archived[1])] == self.archived[1]:
+            return
+        self.archived = (position.start_fen, moves)
+        from archive import ARCHIVE # sqlite and the binary format are loaded with the first finished game
+        from binary import BinaryGame
+        headers = pgn.Game.from_position(position, {'Event': 'Chess', 'Site': 'Local', 'Date': time.strftime('%Y.%m.%d')}).headers
+        ARCHIVE.submit([BinaryGame(headers, position.move_stack)])
+
+    def toggle_analysis(self) -> None:
+        """Shows or hides the analysis pane between the board and the moves record. The pane is created on first use.
+        """
+        if self.analysis_pane is None:
+            self.analysis_pane = AnalysisPane(self, self.size, self.board.show_candidates)
+            self.board.position_listeners.append(self.analysis_pane.analyse)
+        if self.analysis_pane.active:
+            self.analysis_pane.hide()
+            self.analysis_pane.pack_forget()
+        else:
+            self.analysis_pane.pack(side=ctk.RIGHT, padx=0, pady=10, fill=ctk.Y, before=self.board)
+            self.analysis_pane.show(self.board.position)
+
+    def toggle_explorer(self) -> None:
+        """Shows or hides the opening explorer next to the moves record. The explorer is created on first use.
+        """
+        if self.explorer is None:
+            from archive import ARCHIVE
+            ARCHIVE.prepare() # schema is created or migrated in the writer thread, not in the window
+            self.explorer = OpeningExplorer(self, self.size, ARCHIVE.path)
+            self.board.position_listeners.append(self.explorer.explore)
+        if self.explorer.active:
+            self.explorer.hide()
+            self.explorer.pack_forget()
+        else:
+            self.explorer.pack(side=ctk.RIGHT, padx=0, pady=10, fill=ctk.Y, after=self.moves_record)
+            self.explorer.show(self.board.position)
+
+    def toggle_engine(self) -> None:
+        """Starts the engine playing the side to move or stops it. The engine keeps pondering while the user thinks.
+        """
+        if self.opponent is None:
+            from opponent import EngineOpponent
+            self.opponent = EngineOpponent()
+            self.board.position_listeners.append(self.opponent.on_position)
+        color = None if self.opponent.color else self.board.position.turn
+        self.opponent.play(color, self.board.position)
+        self.board.display_message(f'Engine plays {'white' if color == 'w' else 'black'}' if color else 'Engine off', 2)
+        if self.engine_poll:
+            self.after_cancel(self.engine_poll)
+            self.engine_poll = None
+        if color:
+            self.poll_engine()
+
+    def poll_engine(self) -> None:
+        """Plays the move chosen by the engine once it's ready, repeats while the engine plays.
+        """
+        from opponent import POLL_MS
+        self.engine_poll = None
+        if not self.opponent or not self.opponent.color:
+            return
+        move = self.opponent.poll()
+        if move and self.board.position.turn == self.opponent.color and move in self.board.position.legal_moves():
+            self.board.play_engine_move(move)
+        self.engine_poll = self.after(POLL_MS, self.poll_engine)
+
+    def board_undo(self) -> None:
+        """Handle for taking back the last move.
+        """
+        self.board.undo()
+
+    def board_redo(self) -> None:
+        """Handle for playing again the move taken back.
+        """
+        self.board.redo()
+
+    def load_game(self) -> None:
+        """Asks for PGN file and loads its first game in replay mode.
+        """
+        path = ctk.filedialog.askopenfilename(parent=self, filetypes=[('PGN', '*.pgn')])
+        if not path:
+            return
+        with open(path, encoding='utf-8', errors='replace') as pgn_file:
+            game = next(pgn.read_games(pgn_file), None)
+        if not game:
+            self.board.display_message('No game found', 3)
+            return
+        try:
+            self.board.load_game(game)
+        except ValueError:
+            self.board.display_message('Invalid game', 3)
+
+    def set_position(self) -> None:
+        """Copies FEN of the current position to the clipboard and asks for the FEN of the position to set up.
+        """
+        self.clipboard_clear()
+        self.clipboard_append(self.board.get_fen())
+        dialog = ctk.CTkInputDialog(text='Current position copied to clipboard.\nPaste FEN to set up position:', title='FEN',
+                                    fg_color=COLOR.BACKGROUND, button_fg_color=COLOR.TILE_1, button_hover_color=COLOR.HIGH_TILE_1,
+                                    font=ctk.CTkFont(str(get_from_config('font_name')), 20))
+        fen = dialog.get_input()
+        if not fen:
+            return
+        try:
+            self.board.set_fen(fen.strip())
+        except ValueError:
+            self.board.display_message('Invalid FEN', 3)
+            return
+        self.archived = None
 
     def update_assets(self) -> None:
         """Updates asset on the Board
@@ -127,6 +378,31 @@ class MainWindow(ctk.CTk):
         self.after(0, lambda: widget.configure(font=ctk.CTkFont(get_from_config('font_name'), size)))
 
 if __name__ == "__main__":
+    if getattr(sys, 'frozen', False): # processes spawned by the frozen app start here
+        import multiprocessing
+        multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description='Chess game.')
+    parser.add_argument('--profile-startup', action='store_true', help='print import times and startup phases, then exit')
+    parser.add_argument('--profile-output', default=None, help='JSON file for the startup profile')
+    parser.add_argument('--instrument', action='store_true', help='measure calls of move generation and click handling from the start')
+    parser.add_argument('--latency', action='store_true', help='record latency histograms of clicks from the start')
+    parser.add_argument('--instrument-output', default=None, help='JSON file for the instrumentation report, saved on exit')
+    args = parser.parse_args()
+    if args.instrument:
+        PROBES.enable()
+    if args.latency:
+        LATENCY.toggle()
+    profile = StartupProfile(STARTED) if args.profile_startup or args.profile_output else None
     ctk.deactivate_automatic_dpi_awareness()
-    app = MainWindow()
+    app = MainWindow(profile)
     app.mainloop()
+    if profile:
+        imports = import_times()
+        print(profile.report(imports))
+        if args.profile_output:
+            profile.save(args.profile_output, imports)
+    if args.instrument_output:
+        instrumentation.dump(args.instrument_output)
+    if 'archive' in sys.modules: # imported only if a game was archived or explored
+        from archive import ARCHIVE
+        ARCHIVE.close()
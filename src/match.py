@@ -0,0 +1,321 @@
+"""Engine versus engine match runner. Plays pairs of games from every opening of the suite with swapped colors, running
+several games at once in a pool of processes. Reports Elo difference with 95% error bars and optionally runs sequential
+probability ratio test, which stops the match as soon as the result is conclusive.
+
+Usage:
+
+    python src/match.py --first name=new,movetime=100 --second name=old,movetime=100 --openings openings.pgn
+        [--games N] [--concurrency N] [--sprt ELO0 ELO1] [--alpha A] [--beta B] [--max-plies N] [--pgn games.pgn]
+"""
+
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Any
+import argparse
+import math
+import os
+
+from rules import Position, STARTING_FEN
+from engine import Engine, SearchLimits, ENTRY_BYTES
+from pgn import Game, read_games, write_game
+
+def parse_config(text: str) -> dict[str, Any]:
+    """Parses engine configuration written as comma separated key=value pairs.
+
+    Args:
+
+     - text (str): Configuration e.g. 'name=new,depth=4,movetime=100,nodes=20000,hash=16'.
+
+    Raises:
+
+     - ValueError: If the key is unknown or the value isn't a number.
+
+    Returns:
+
+     - dict[str, Any]: Configuration with name, depth, movetime, nodes and hash keys.
+    """
+    config: dict[str, Any] = {'name': text, 'depth': None, 'movetime': None, 'nodes': None, 'hash': 16}
+    for pair in text.split(','):
+        key, _, value = pair.partition('=')
+        key = key.strip()
+        if key == 'name':
+            config['name'] = value.strip()
+        elif key in ('depth', 'movetime', 'nodes', 'hash'):
+            config[key] = int(value)
+        else:
+            raise ValueError(f'Unknown engine option: {key}')
+    if config['depth'] is None and config['movetime'] is None and config['nodes'] is None:
+        config['depth'] = 3
+    return config
+
+def load_openings(path: str | None) -> list[str]:
+    """Loads opening positions. PGN files give position after moves of every game, other files one FEN per line.
+
+    Args:
+
+     - path (str | None): Path to the opening suite, None for the starting position only.
+
+    Returns:
+
+     - list[str]: FEN of every opening.
+    """
+    if path is None:
+        return [STARTING_FEN]
+    with open(path, encoding='utf-8') as suite:
+        if path.lower().endswith('.pgn'):
+            return [game.replay().fen() for game in read_games(suite)]
+        return [line.strip() for line in suite if line.strip() and not line.startswith('#')]
+
+def insufficient_material(position: Position) -> bool:
+    """Checks if neither side can checkmate: bare kings or king with single minor piece against bare king.
+
+    Args:
+
+     - position (Position): Position to check.
+
+    Returns:
+
+     - bool: True if the game is a dead draw, False otherwise.
+    """
+    figures = [figure for figure in position.board if figure and figure not in 'Kk']
+    return not figures or (len(figures) == 1 and figures[0] in 'NBnb')
+
+def play_game(opening: str, white: dict[str, Any], black: dict[str, Any], max_plies: int) -> dict[str, Any]:
+    """Worker task playing single game between two engine configurations.
+
+    Args:
+
+     - opening (str): FEN of the starting position.
+     - white (dict[str, Any]): Configuration of the engine playing white.
+     - black (dict[str, Any]): Configuration of the engine playing black.
+     - max_plies (int): Number of plies after which the game is adjudicated as a draw.
+
+    Returns:
+
+     - dict[str, Any]: Result of the game, reason of the ending and moves in SAN.
+    """
+    position = Position(opening)
+    engines = {'w': Engine(white['hash'] * 1024 * 1024 // ENTRY_BYTES), 'b': Engine(black['hash'] * 1024 * 1024 // ENTRY_BYTES)}
+    configs = {'w': white, 'b': black}
+    moves: list[str] = []
+    result, reason = '*', ''
+    while result == '*':
+        result = position.result()
+        if result != '*':
+            reason = 'checkmate' if position.in_check() else 'draw by rule'
+        elif insufficient_material(position):
+            result, reason = '1/2-1/2', 'insufficient material'
+        elif len(moves) >= max_plies:
+            result, reason = '1/2-1/2', 'move limit'
+        else:
+            config = configs[position.turn]
+            limits = SearchLimits(config['depth'], config['movetime'], config['nodes'])
+            move = engines[position.turn].search(position, limits).best_move
+            moves.append(position.san(move))
+            position.push(move)
+    return {'white': white['name'], 'black': black['name'], 'opening': opening, 'result': result, 'reason': reason, 'moves': moves}
+
+def elo(score: float) -> float:
+    """Converts expected score into Elo difference.
+
+    Args:
+
+     - score (float): Expected score between 0 and 1.
+
+    Returns:
+
+     - float: Elo difference, infinite for score 0 or 1.
+    """
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return 400 * math.log10(score / (1 - score))
+
+def expected_score(elo_difference: float) -> float:
+    """Converts Elo difference into expected score.
+
+    Args:
+
+     - elo_difference (float): Elo difference.
+
+    Returns:
+
+     - float: Expected score between 0 and 1.
+    """
+    return 1 / (1 + 10 ** (-elo_difference / 400))
+
+class MatchStatistics:
+    """Class counting wins, draws and losses of the first engine and computing Elo and SPRT from them.
+    """
+    def __init__(self) -> None:
+        """Constructor:
+        """
+        self.wins: int = 0
+        self.draws: int = 0
+        self.losses: int = 0
+
+    @property
+    def games(self) -> int:
+        """Number of finished games.
+
+        Returns:
+
+         - int: Sum of wins, draws and losses.
+        """
+        return self.wins + self.draws + self.losses
+
+    def add(self, game: dict[str, Any], first: str) -> None:
+        """Adds result of the game.
+
+        Args:
+
+         - game (dict[str, Any]): Finished game returned by play_game.
+         - first (str): Name of the first engine.
+        """
+        if game['result'] == '1/2-1/2' or game['result'] == '*':
+            self.draws += 1
+        elif (game['result'] == '1-0') == (game['white'] == first):
+            self.wins += 1
+        else:
+            self.losses += 1
+
+    def score_and_variance(self) -> tuple[float, float]:
+        """Computes mean score and variance of the score of a single game.
+
+        Returns:
+
+         - tuple[float, float]: Mean score and per game variance.
+        """
+        games = self.games
+        if not games:
+            return 0.5, 0.0
+        score = (self.wins + self.draws / 2) / games
+        variance = (self.wins * (1 - score) ** 2 + self.draws * (0.5 - score) ** 2 + self.losses * score ** 2) / games
+        return score, variance
+
+    def elo(self) -> tuple[float, float]:
+        """Computes Elo difference with 95% confidence margin.
+
+        Returns:
+
+         - tuple[float, float]: Elo difference and its error margin.
+        """
+        score, variance = self.score_and_variance()
+        if not self.games:
+            return 0.0, math.inf
+        margin = 1.959964 * math.sqrt(variance / self.games)
+        difference = elo(score)
+        upper, lower = elo(min(score + margin, 1)), elo(max(score - margin, 0))
+        return difference, (upper - lower) / 2
+
+    def llr(self, elo0: float, elo1: float) -> float:
+        """Computes log likelihood ratio of hypothesis elo1 against elo0 using normal approximation of the trinomial model.
+
+        Args:
+
+         - elo0 (float): Elo difference of null hypothesis.
+         - elo1 (float): Elo difference of alternative hypothesis.
+
+        Returns:
+
+         - float: Log likelihood ratio.
+        """
+        score, variance = self.score_and_variance()
+        if not variance:
+            return 0.0
+        score0, score1 = expected_score(elo0), expected_score(elo1)
+        return self.games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+def sprt_bounds(alpha: float, beta: float) -> tuple[float, float]:
+    """Computes stopping bounds of the log likelihood ratio.
+
+    Args:
+
+     - alpha (float): Probability of false positive.
+     - beta (float): Probability of false negative.
+
+    Returns:
+
+     - tuple[float, float]: Lower bound accepting elo0 and upper bound accepting elo1.
+    """
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+def run(first: dict[str, Any], second: dict[str, Any], openings: list[str], games: int, concurrency: int | None = None,
+        sprt: tuple[float, float] | None = None, alpha: float = 0.05, beta: float = 0.05, max_plies: int = 400,
+        pgn_path: str | None = None) -> MatchStatistics:
+    """Plays the match and prints progress after every game.
+
+    Args:
+
+     - first (dict[str, Any]): Configuration of the tested engine.
+     - second (dict[str, Any]): Configuration of the reference engine.
+     - openings (list[str]): FEN of opening positions, each is played twice with swapped colors.
+     - games (int): Maximum number of games.
+     - concurrency (int | None, optional): Number of games played at once. Defaults to None which means number of CPUs.
+     - sprt (tuple[float, float] | None, optional): Elo hypotheses (elo0, elo1) of SPRT. Defaults to None.
+     - alpha (float, optional): SPRT false positive rate. Defaults to 0.05.
+     - beta (float, optional): SPRT false negative rate. Defaults to 0.05.
+     - max_plies (int, optional): Game length after which it is adjudicated as a draw. Defaults to 400.
+     - pgn_path (str | None, optional): File receiving finished games. Defaults to None.
+
+    Returns:
+
+     - MatchStatistics: Final statistics of the first engine.
+    """
+    statistics = MatchStatistics()
+    lower, upper = sprt_bounds(alpha, beta)
+    schedule = [(openings[i // 2 % len(openings)], first, second) if i % 2 == 0 else
+                (openings[i // 2 % len(openings)], second, first) for i in range(games)]
+    pgn_file = open(pgn_path, 'w', encoding='utf-8') if pgn_path else None
+    executor = ProcessPoolExecutor(max_workers=concurrency or os.cpu_count() or 1)
+    try:
+        pending: set[Future] = {executor.submit(play_game, opening, white, black, max_plies) for opening, white, black in schedule}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                game = future.result()
+                statistics.add(game, first['name'])
+                if pgn_file:
+                    headers = {'Event': 'Engine match', 'White': game['white'], 'Black': game['black'], 'Result': game['result'],
+                               'Round': str(statistics.games), 'Termination': game['reason']}
+                    if game['opening'] != STARTING_FEN:
+                        headers.update({'SetUp': '1', 'FEN': game['opening']})
+                    pgn_file.write(write_game(Game(headers, game['moves'])))
+            difference, margin = statistics.elo()
+            line = f'Games {statistics.games}: +{statistics.wins} ={statistics.draws} -{statistics.losses}  Elo {difference:.1f} +/- {margin:.1f}'
+            if sprt:
+                llr = statistics.llr(*sprt)
+                print(f'{line}  LLR {llr:.2f} ({lower:.2f}, {upper:.2f})', flush=True)
+                if llr <= lower or llr >= upper:
+                    print(f'SPRT: {'H1' if llr >= upper else 'H0'} accepted', flush=True)
+                    break
+            else:
+                print(line, flush=True)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if pgn_file:
+            pgn_file.close()
+    return statistics
+
+def main() -> None:
+    """Command line entry point of the match runner.
+    """
+    parser = argparse.ArgumentParser(description='Play engine versus engine match.')
+    parser.add_argument('--first', required=True, help='tested engine, e.g. name=new,movetime=100')
+    parser.add_argument('--second', required=True, help='reference engine, e.g. name=old,depth=3')
+    parser.add_argument('--openings', default=None, help='opening suite, PGN file or one FEN per line')
+    parser.add_argument('--games', type=int, default=100, help='maximum number of games')
+    parser.add_argument('--concurrency', type=int, default=None, help='number of games played at once')
+    parser.add_argument('--sprt', type=float, nargs=2, default=None, metavar=('ELO0', 'ELO1'), help='run SPRT with given hypotheses')
+    parser.add_argument('--alpha', type=float, default=0.05, help='SPRT false positive rate')
+    parser.add_argument('--beta', type=float, default=0.05, help='SPRT false negative rate')
+    parser.add_argument('--max-plies', type=int, default=400, help='adjudicate game as draw after this many plies')
+    parser.add_argument('--pgn', default=None, help='file receiving played games')
+    args = parser.parse_args()
+    first, second = parse_config(args.first), parse_config(args.second)
+    if first['name'] == second['name']:
+        second['name'] += '2'
+    run(first, second, load_openings(args.openings), args.games, args.concurrency, args.sprt, args.alpha, args.beta, args.max_plies, args.pgn)
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,17 @@
 """File with implementation for all menus: MoveRecord, Options and Settings.
 """
 
-from fontTools.ttLib import TTFont
 from typing import Callable, Any
 import customtkinter as ctk
-import subprocess
 import platform
 import os
-import re
 
-from tools import get_from_config, change_config, load_menu_image, resource_path, change_color
+from tools import get_from_config, change_config, load_menu_image, resource_path
 from properties import COLOR, STRING
 from notifications import Notification
-from color_picker import ColorPicker
-from piece import Piece, Knight
+from fonts import FONT_CACHE
+from themes import THEME_INDEX, SPRITES
+from style import STYLE
 
 class MovesRecord(ctk.CTkFrame):
     """Class handling recording the moves during playtime.
@@ -33,58 +31,129 @@ class MovesRecord(ctk.CTkFrame):
          - master (Any): Parent widget
         """
         super().__init__(master, fg_color=COLOR.BACKGROUND)
+        STYLE.subscribe(self, fg_color='BACKGROUND')
         self.create_frames()
         self.moves: list[list[str]] = []
+        self.replay_frame: ctk.CTkFrame | None = None
+        self.seek_func: Callable | None = None
+        self.replay_length: int = 0
+        self.pending_ply: int | None = None
 
-    def record_move(self, moved_piece: Piece, previous_coords: tuple[int, int] | None=None, capture: bool=False, castle: str | None=None, check: bool=False, checkmate: bool=False, promotion: str='') -> None:
+    def record_move(self, notation: str, color: str) -> None:
         """Displays the chess notation of the move on the frame for specific player color.
 
         Args:
 
-         - moved_piece (Piece): Figure which was moved
-         - previous_coords (tuple[int, int] | None, optional): Coordinates of position before moving the figure. Defaults to None.
-         - capture (bool, optional): Flag to check if figure captured another figure. Defaults to False.
-         - castle (str | None, optional): Flag to check if castle occurred. Defaults to None.
-         - check (bool, optional): Checks if move caused the check. Defaults to False.
-         - checkmate (bool, optional): Checks if move caused the checkmate. Defaults to False.
-         - promotion (str, optional): Checks if pawn was promoted. Defaults to '' which means the promotion didn't occurred.
-        """
-        y_axis: list[str] = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
-        x, y = 8 - moved_piece.position[0], y_axis[moved_piece.position[1]]
-        prev_x = 8 - previous_coords[0] if previous_coords else ''
-        prev_y = y_axis[previous_coords[1]] if previous_coords else ''
-        if not isinstance(moved_piece, Knight):
-            piece_name = moved_piece.__class__.__name__[0] if not moved_piece.__class__.__name__ == 'Pawn' else ''
-        else:
-            piece_name = 'N'
-        if not castle:
-            notation = f' {'+' if check and not checkmate else ''}{'#' if checkmate else ''}{'x' if capture else ''}{piece_name}{prev_y}{prev_x}-{y}{x}{promotion if promotion != 'K' else 'N'}'
-        else:
-            notation = f' {'+' if check and not checkmate else''}{'#' if checkmate else ''}{'0-0-0' if castle == 'queenside' else '0-0'}'
-        current_frame = self.white_scroll_frame if moved_piece.color == 'w' else self.black_scroll_frame
-        ctk.CTkLabel(current_frame, text=notation, font=ctk.CTkFont(str(get_from_config('font_name')), 32)).pack(side=ctk.BOTTOM)
+         - notation (str): Move in Standard Algebraic Notation.
+         - color (str): Color of the player who made the move.
+        """
+        current_frame = self.white_scroll_frame if color == 'w' else self.black_scroll_frame
+        ctk.CTkLabel(current_frame, text=f' {notation}', font=ctk.CTkFont(str(get_from_config('font_name')), 32)).pack(side=ctk.BOTTOM)
+
+    def show_replay(self, length: int, seek_func: Callable) -> None:
+        """Shows slider used to scrub through the replayed game. Slider events are coalesced, so only the latest
+        value is applied once Tk is idle.
+
+        Args:
+
+         - length (int): Number of plies in the game.
+         - seek_func (Callable): Function jumping to given ply.
+        """
+        self.hide_replay()
+        self.seek_func = seek_func
+        self.replay_length = length
+        self.pending_ply = None
+        self.replay_frame = ctk.CTkFrame(self, fg_color=COLOR.TRANSPARENT, corner_radius=0)
+        self.replay_frame.pack(side=ctk.BOTTOM, padx=15, pady=0, fill=ctk.X)
+        self.replay_label: ctk.CTkLabel = ctk.CTkLabel(self.replay_frame, text=f'{length}/{length}', text_color=COLOR.TEXT,
+                                                        font=ctk.CTkFont(str(get_from_config('font_name')), 20))
+        STYLE.subscribe(self.replay_label, text_color='TEXT')
+        self.replay_label.pack(side=ctk.RIGHT, padx=4, pady=0)
+        self.replay_slider: ctk.CTkSlider = ctk.CTkSlider(self.replay_frame, from_=0, to=max(length, 1), number_of_steps=max(length, 1),
+                                                        command=self.on_replay_slider, button_corner_radius=1, button_length=12,
+                                                        corner_radius=1, button_color=COLOR.TILE_2, hover=False,
+                                                        progress_color=COLOR.TEXT, fg_color=COLOR.DARK_TEXT)
+        STYLE.subscribe(self.replay_slider, button_color='TILE_2', progress_color='TEXT', fg_color='DARK_TEXT')
+        self.replay_slider.set(length)
+        self.replay_slider.pack(side=ctk.LEFT, padx=4, pady=0, fill=ctk.X, expand=True)
+
+    def hide_replay(self) -> None:
+        """Removes the replay slider.
+        """
+        if self.replay_frame:
+            self.replay_frame.destroy()
+        self.replay_frame = None
+
+    def on_replay_slider(self, value: float) -> None:
+        """Stores the latest slider value and schedules single seek for all motion events before Tk is idle.
+
+        Args:
+
+         - value (float): Position of the slider.
+        """
+        if self.pending_ply is None:
+            self.after_idle(self.apply_replay_slider)
+        self.pending_ply = int(value)
+
+    def apply_replay_slider(self) -> None:
+        """Jumps to the latest ply chosen with the slider.
+        """
+        ply, self.pending_ply = self.pending_ply, None
+        if ply is not None and self.seek_func:
+            self.seek_func(ply)
+
+    def set_replay_ply(self, ply: int) -> None:
+        """Updates slider and ply counter after jumping to the ply.
+
+        Args:
+
+         - ply (int): Current ply of the replay.
+        """
+        if self.replay_frame:
+            self.replay_slider.set(ply)
+            self.replay_label.configure(text=f'{ply}/{self.replay_length}')
+
+    def remove_last(self, color: str) -> None:
+        """Removes notation of the last move of the player.
+
+        Args:
+
+         - color (str): Color of the player whose move was taken back.
+        """
+        current_frame = self.white_scroll_frame if color == 'w' else self.black_scroll_frame
+        labels = current_frame.winfo_children()
+        if labels:
+            labels[-1].destroy()
 
     def create_frames(self) -> None:
         """Creates frames to reserve space for displaying move notations.
         """
         black_label: ctk.CTkLabel = ctk.CTkLabel(self, text='Black', font=ctk.CTkFont(str(get_from_config('font_name')), 32), text_color=COLOR.DARK_TEXT)
         black_label.pack(side=ctk.TOP, padx=1, pady=1)
+        STYLE.subscribe(black_label, text_color='DARK_TEXT')
         additional_frame: ctk.CTkFrame = ctk.CTkFrame(self, fg_color=COLOR.TRANSPARENT, corner_radius=0,
                                         border_color=COLOR.DARK_TEXT, border_width=7)
+        STYLE.subscribe(additional_frame, border_color='DARK_TEXT')
         additional_frame.pack(side=ctk.TOP, padx=15, expand=True, fill=ctk.Y)
         self.black_scroll_frame: ctk.CTkScrollableFrame = ctk.CTkScrollableFrame(additional_frame, scrollbar_button_color=COLOR.NOTATION_BACKGROUND_B,
                                                         fg_color=COLOR.NOTATION_BACKGROUND_B, corner_radius=0,
                                                         scrollbar_button_hover_color=COLOR.NOTATION_BACKGROUND_B,)
         self.black_scroll_frame.pack(side=ctk.TOP, padx=6, pady=7, fill=ctk.Y, expand=True)
+        STYLE.subscribe(self.black_scroll_frame, scrollbar_button_color='NOTATION_BACKGROUND_B', fg_color='NOTATION_BACKGROUND_B',
+                        scrollbar_button_hover_color='NOTATION_BACKGROUND_B')
         white_label: ctk.CTkLabel = ctk.CTkLabel(self, text='White', font=ctk.CTkFont(str(get_from_config('font_name')), 32), text_color=COLOR.TEXT)
         white_label.pack(side=ctk.TOP, padx=0, pady=0)
+        STYLE.subscribe(white_label, text_color='TEXT')
         additional_frame = ctk.CTkFrame(self, fg_color=COLOR.TRANSPARENT, corner_radius=0,
                                         border_color=COLOR.DARK_TEXT, border_width=7)
+        STYLE.subscribe(additional_frame, border_color='DARK_TEXT')
         additional_frame.pack(side=ctk.TOP, padx=15, expand=True, fill=ctk.Y)
         self.white_scroll_frame: ctk.CTkScrollableFrame = ctk.CTkScrollableFrame(additional_frame, scrollbar_button_color=COLOR.NOTATION_BACKGROUND_W,
                                                         fg_color=COLOR.NOTATION_BACKGROUND_W, corner_radius=0,
                                                         scrollbar_button_hover_color=COLOR.NOTATION_BACKGROUND_W)
         self.white_scroll_frame.pack(side=ctk.TOP, padx=6, pady=7, fill=ctk.Y, expand=True)
+        STYLE.subscribe(self.white_scroll_frame, scrollbar_button_color='NOTATION_BACKGROUND_W', fg_color='NOTATION_BACKGROUND_W',
+                        scrollbar_button_hover_color='NOTATION_BACKGROUND_W')
         space_label: ctk.CTkLabel = ctk.CTkLabel(self, text='\n')
         space_label.pack()
 
@@ -103,9 +172,11 @@ class Options(ctk.CTkFrame):
 
      - ctk.CTkFrame : Inheritance from customtkinter CTkFrame widget.
     """
-    def __init__(self, master, restart_func: Callable, update_assets_func: Callable, update_font_func: Callable):
+    def __init__(self, master, restart_func: Callable, update_assets_func: Callable, update_font_func: Callable, save_game_func: Callable,
+                    position_func: Callable, undo_func: Callable, redo_func: Callable, load_game_func: Callable, analysis_func: Callable,
+                    engine_func: Callable, explorer_func: Callable):
         """Constructor:
-            - places setting and replay buttons
+            - places setting, replay, undo, redo, game import/export and position setup buttons
 
         Args:
 
@@ -113,16 +184,42 @@ class Options(ctk.CTkFrame):
          - restart_func (Callable): Master function to restart the game
          - update_assets_func (Callable): Master function to update assets
          - update_font_func (Callable): Master function to update font
+         - save_game_func (Callable): Master function to save the game as PGN
+         - position_func (Callable): Master function to copy and load position as FEN
+         - undo_func (Callable): Master function to take back the last move
+         - redo_func (Callable): Master function to play again the move taken back
+         - load_game_func (Callable): Master function to load PGN game in replay mode
+         - analysis_func (Callable): Master function to show or hide the analysis pane
+         - engine_func (Callable): Master function to start or stop the engine playing the side to move
+         - explorer_func (Callable): Master function to show or hide the opening explorer
         """
         super().__init__(master, fg_color=COLOR.BACKGROUND)
+        STYLE.subscribe(self, fg_color='BACKGROUND')
         self.restart_func: Callable = restart_func
         self.update_assets_func: Callable = update_assets_func
         self.update_font_func: Callable = update_font_func
+        self.save_game_func: Callable = save_game_func
+        self.position_func: Callable = position_func
+        self.undo_func: Callable = undo_func
+        self.redo_func: Callable = redo_func
+        self.load_game_func: Callable = load_game_func
+        self.analysis_func: Callable = analysis_func
+        self.engine_func: Callable = engine_func
+        self.explorer_func: Callable = explorer_func
         self.setting_icon: ctk.CTkImage | None = load_menu_image('settings')
         self.replay_icon: ctk.CTkImage | None = load_menu_image('replay')
         self.setting_button()
         self.space_label()
         self.replay_button()
+        self.space_label()
+        self.text_button('UNDO', self.undo_func)
+        self.text_button('REDO', self.redo_func)
+        self.text_button('PGN', self.save_game_func)
+        self.text_button('LOAD', self.load_game_func)
+        self.text_button('FEN', self.position_func)
+        self.text_button('EVAL', self.analysis_func)
+        self.text_button('ENGINE', self.engine_func)
+        self.text_button('BOOK', self.explorer_func)
 
     def setting_button(self) -> None:
         """Setup of setting button.
@@ -138,6 +235,26 @@ class Options(ctk.CTkFrame):
         self.r_icon_label.pack(side=ctk.TOP, padx=10, pady=0)
         self.r_icon_label.bind('<Button-1>', self.replay)
 
+    def text_button(self, text: str, command: Callable) -> ctk.CTkButton:
+        """Setup of button described with text instead of an icon.
+
+        Args:
+
+         - text (str): Text displayed on the button.
+         - command (Callable): Function called after clicking the button.
+
+        Returns:
+
+         - ctk.CTkButton: Packed button.
+        """
+        size = int(get_from_config('size'))
+        button = ctk.CTkButton(self, text=text, command=command, width=size, corner_radius=0,
+                                font=ctk.CTkFont(str(get_from_config('font_name')), size // 4),
+                                fg_color=COLOR.TILE_1, hover_color=COLOR.HIGH_TILE_1, text_color=COLOR.TEXT)
+        STYLE.subscribe(button, fg_color='TILE_1', hover_color='HIGH_TILE_1', text_color='TEXT')
+        button.pack(side=ctk.TOP, padx=10, pady=2)
+        return button
+
     def space_label(self) -> None:
         """Space to maintain the desired spacing.
         """
@@ -175,6 +292,227 @@ class Options(ctk.CTkFrame):
         """
         self.notification: Notification = Notification(self.master, 'Not so fast', 1, 'top')
 
+class AnalysisPane(ctk.CTkFrame):
+    """Class showing evaluation bar, score, depth and the best lines of the background analysis.
+
+    Args:
+
+     - ctk.CTkFrame : Inheritance from customtkinter CTkFrame widget.
+    """
+    POLL_MS: int = 250
+
+    def __init__(self, master, size: int, candidates_func: Callable) -> None:
+        """Constructor:
+            - creates evaluation bar and labels
+            - the worker process is started with the first analysed position
+
+        Args:
+
+         - master (Any): Parent widget
+         - size (int): Size of the cell, used to scale the pane.
+         - candidates_func (Callable): Master function marking first moves of the best lines on the board
+        """
+        from analysis import AnalysisClient # engine and multiprocessing are loaded only when analysis is opened
+        super().__init__(master, fg_color=COLOR.BACKGROUND)
+        STYLE.subscribe(self, fg_color='BACKGROUND')
+        self.font_name: str = str(get_from_config('font_name'))
+        self.client: AnalysisClient = AnalysisClient()
+        self.candidates_func: Callable = candidates_func
+        self.active: bool = False
+        self.poll_job: str | None = None
+        self.bar: ctk.CTkProgressBar = ctk.CTkProgressBar(self, orientation='vertical', width=size // 3, height=size * 8, corner_radius=0,
+                                                          fg_color=COLOR.DARK_TEXT, progress_color=COLOR.TEXT, border_width=0)
+        STYLE.subscribe(self.bar, fg_color='DARK_TEXT', progress_color='TEXT').pack(side=ctk.LEFT, padx=5, pady=5, fill=ctk.Y)
+        self.bar.set(0.5)
+        info_frame = ctk.CTkFrame(self, fg_color='transparent')
+        info_frame.pack(side=ctk.LEFT, padx=5, pady=5, fill=ctk.Y)
+        self.score_label: ctk.CTkLabel = self.info_label(info_frame, size // 2)
+        self.depth_label: ctk.CTkLabel = self.info_label(info_frame, size // 5)
+        self.pv_label: ctk.CTkLabel = self.info_label(info_frame, size // 5, wraplength=size * 3)
+
+    def info_label(self, frame: ctk.CTkFrame, font_size: int, wraplength: int = 0) -> ctk.CTkLabel:
+        """Creates label of the pane.
+
+        Args:
+
+         - frame (ctk.CTkFrame): Parent frame.
+         - font_size (int): Size of the font.
+         - wraplength (int, optional): Width after which text is wrapped, 0 means no wrapping. Defaults to 0.
+
+        Returns:
+
+         - ctk.CTkLabel: Packed label.
+        """
+        label = ctk.CTkLabel(frame, text='', font=ctk.CTkFont(self.font_name, font_size), text_color=COLOR.TEXT,
+                             wraplength=wraplength, justify=ctk.LEFT, anchor=ctk.W)
+        STYLE.subscribe(label, text_color='TEXT').pack(side=ctk.TOP, padx=0, pady=2, anchor=ctk.W)
+        return label
+
+    def show(self, position: Any) -> None:
+        """Starts analysing the position and polling results.
+
+        Args:
+
+         - position (rules.Position): Position on the board.
+        """
+        self.active = True
+        self.analyse(position)
+        if self.poll_job is None:
+            self.poll_job = self.after(self.POLL_MS, self.poll)
+
+    def hide(self) -> None:
+        """Stops the search, the worker keeps its transposition table for the next time.
+        """
+        self.active = False
+        self.client.stop()
+        self.candidates_func([])
+        if self.poll_job is not None:
+            self.after_cancel(self.poll_job)
+            self.poll_job = None
+
+    def analyse(self, position: Any) -> None:
+        """Restarts the analysis with new position, called by the Board after every change of the position.
+
+        Args:
+
+         - position (rules.Position): Position on the board.
+        """
+        if not self.active:
+            return
+        self.client.analyse(position.fen())
+        self.depth_label.configure(text='depth 0')
+        self.candidates_func([])
+
+    def poll(self) -> None:
+        """Shows the latest result. Results are collected a few times per second, so fast depths don't flood the window.
+        """
+        result = self.client.poll()
+        if result:
+            self.show_result(result)
+        self.poll_job = self.after(self.POLL_MS, self.poll)
+
+    def show_result(self, result: dict[str, Any]) -> None:
+        """Updates the bar and labels.
+
+        Args:
+
+         - result (dict[str, Any]): Result sent by the worker.
+        """
+        from analysis import white_share
+        self.bar.set(white_share(result['score']))
+        self.score_label.configure(text=self.format_score(result['text']))
+        self.depth_label.configure(text=f'depth {result['depth']}  {result['nps'] // 1000} kN/s')
+        self.pv_label.configure(text='\n'.join(f'{rank}. {self.format_score(line['text'])}  {' '.join(line['pv'][:8])}'
+                                               for rank, line in enumerate(result['lines'], start=1)))
+        self.candidates_func([line['move'] for line in result['lines'] if line['move']])
+
+    @staticmethod
+    def format_score(text: str) -> str:
+        """Formats score for the pane, e.g. '+0.35' or '-M3'.
+
+        Args:
+
+         - text (str): Score formatted by the engine, 'cp <centipawns>' or 'mate <moves>'.
+
+        Returns:
+
+         - str: Score in pawns or moves to mate with sign.
+        """
+        kind, value = text.split()
+        sign = '+' if int(value) > 0 else '-' if int(value) < 0 else ''
+        return f'{sign}M{abs(int(value))}' if kind == 'mate' else f'{sign}{abs(int(value)) / 100:.2f}'
+
+    def destroy(self) -> None:
+        """Ends the worker process together with the pane.
+        """
+        self.client.close()
+        super().destroy()
+
+class OpeningExplorer(ctk.CTkFrame):
+    """Class listing moves played in the current position in archived games, with their frequencies and results.
+
+    Args:
+
+     - ctk.CTkFrame : Inheritance from customtkinter CTkFrame widget.
+    """
+    MAX_MOVES: int = 12
+
+    def __init__(self, master, size: int, path: str) -> None:
+        """Constructor:
+            - creates header and lines of the table
+            - the archive is opened with the first explored position
+
+        Args:
+
+         - master (Any): Parent widget
+         - size (int): Size of the cell, used to scale the panel.
+         - path (str): Path of the game archive, read only, tables are created and migrated by the archive writer.
+        """
+        super().__init__(master, fg_color=COLOR.BACKGROUND)
+        STYLE.subscribe(self, fg_color='BACKGROUND')
+        self.path: str = path
+        self.connection: Any = None
+        self.active: bool = False
+        font = ctk.CTkFont(str(get_from_config('font_name')), size // 5)
+        self.header: ctk.CTkLabel = ctk.CTkLabel(self, text=f'{'move':<7}{'games':>7}  white/draw/black', font=font,
+                                                 text_color=COLOR.TEXT, justify=ctk.LEFT, anchor=ctk.W)
+        STYLE.subscribe(self.header, text_color='TEXT').pack(side=ctk.TOP, padx=5, pady=(5, 2), anchor=ctk.W)
+        self.lines: list[ctk.CTkLabel] = []
+        for _ in range(self.MAX_MOVES):
+            label = ctk.CTkLabel(self, text='', font=font, text_color=COLOR.TEXT, justify=ctk.LEFT, anchor=ctk.W)
+            STYLE.subscribe(label, text_color='TEXT').pack(side=ctk.TOP, padx=5, pady=0, anchor=ctk.W)
+            self.lines.append(label)
+
+    def show(self, position: Any) -> None:
+        """Starts following the position on the board.
+
+        Args:
+
+         - position (rules.Position): Position on the board.
+        """
+        self.active = True
+        self.explore(position)
+
+    def hide(self) -> None:
+        """Stops following the position on the board.
+        """
+        self.active = False
+
+    def explore(self, position: Any) -> None:
+        """Shows the statistics of the position, called by the Board after every change of the position.
+        Costs one indexed read of the aggregated explorer table.
+
+        Args:
+
+         - position (rules.Position): Position on the board.
+        """
+        if not self.active:
+            return
+        import archive # sqlite is loaded only when the explorer is opened
+        import sqlite3
+        try:
+            if self.connection is None:
+                self.connection = archive.connect_readonly(self.path)
+            statistics = archive.explore(self.connection, position)[:self.MAX_MOVES]
+        except sqlite3.OperationalError: # archive not created or migrated by the writer yet, opened again with next position
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+            statistics = []
+        for index, label in enumerate(self.lines):
+            if index < len(statistics):
+                line = statistics[index]
+                label.configure(text=f'{line['san']:<7}{line['games']:>7}  {line['white']:.0f}/{line['draws']:.0f}/{line['black']:.0f}')
+            else:
+                label.configure(text='' if index or statistics else 'no games')
+
+    def destroy(self) -> None:
+        """Closes the archive together with the panel.
+        """
+        if self.connection is not None:
+            self.connection.close()
+        super().destroy()
+
 class Settings(ctk.CTkFrame):
     """Class handling changes in setting such as fonts, assets and colors.
 
@@ -195,12 +533,14 @@ class Settings(ctk.CTkFrame):
          - update_font_func (Callable): Master function to update font
         """
         super().__init__(master, fg_color=COLOR.BACKGROUND, corner_radius=0)
+        STYLE.subscribe(self, fg_color='BACKGROUND')
         self.place(relx=0, rely=0, relwidth=1, relheight=1)
         self.close_image: ctk.CTkImage | None = load_menu_image('close')
         self.color_picker_image: ctk.CTkImage | None = load_menu_image('colorpicker', resize=2)
         self.close_button()
         self.scrollable_frame: ctk.CTkScrollableFrame = ctk.CTkScrollableFrame(self, corner_radius=0, fg_color=COLOR.BACKGROUND,
                                                         scrollbar_button_color=COLOR.DARK_TEXT)
+        STYLE.subscribe(self.scrollable_frame, fg_color='BACKGROUND', scrollbar_button_color='DARK_TEXT')
         self.scrollable_frame.pack(side=ctk.TOP, padx=0, pady=0, fill=ctk.BOTH, expand=True)
         self.font_name: str = str(get_from_config('font_name'))
         self.choose_theme()
@@ -212,29 +552,7 @@ class Settings(ctk.CTkFrame):
         self.restart_func: Callable = restart_func
         self.update_assets_func: Callable = update_assets_func
         self.update_font_func: Callable = update_font_func
-        ctk.CTkLabel(self, text='', height=18, fg_color=COLOR.BACKGROUND).pack(padx=0, pady=0)
-
-    @staticmethod
-    def list_directories_os(path: str) -> list[str]:
-        """Lists all directories from given path.
-
-        Args:
-
-         - path (str): Desired path
-
-        Returns:
-
-         - list[str]: List of all directories from path
-        """
-        try:
-            entries: list[str] = os.listdir(path)
-            directories: list[str] = [
-                entry for entry in entries
-                if os.path.isdir(os.path.join(path, entry)) and os.listdir(os.path.join(path, entry))
-            ]
-            return directories
-        except FileNotFoundError:
-            return []
+        STYLE.subscribe(ctk.CTkLabel(self, text='', height=18, fg_color=COLOR.BACKGROUND), fg_color='BACKGROUND').pack(padx=0, pady=0)
 
     def close_button(self) -> None:
         """Setup of close button
@@ -243,6 +561,7 @@ class Settings(ctk.CTkFrame):
         top_frame.pack(side=ctk.TOP, padx=0, pady=0, fill=ctk.X)
         settings_text = ctk.CTkLabel(top_frame, text='Settings', font=ctk.CTkFont(str(get_from_config('font_name')), 38),
                                     text_color=COLOR.DARK_TEXT, anchor=ctk.N)
+        STYLE.subscribe(settings_text, text_color='DARK_TEXT')
         settings_text.pack(side=ctk.LEFT, padx=20, anchor=ctk.NW)
         close_button = ctk.CTkLabel(top_frame, text='', font=ctk.CTkFont(str(get_from_config('font_name')), 24),
                                     image=self.close_image, anchor=ctk.S)
@@ -261,26 +580,31 @@ class Settings(ctk.CTkFrame):
                                         font=ctk.CTkFont(str(get_from_config('font_name')), 30), corner_radius=0,
                                         fg_color=COLOR.TILE_1, hover_color=COLOR.HIGH_TILE_1,
                                         text_color=COLOR.TEXT)
+        STYLE.subscribe(theme_button, fg_color='TILE_1', hover_color='HIGH_TILE_1', text_color='TEXT')
         theme_button.pack(side=ctk.LEFT, padx=4, pady=4, expand=True)
 
     def choose_theme(self) -> None:
         """Setup of theme chooser.
         """
         self.previous_theme = str(get_from_config('theme'))
-        themes: list[str] = self.list_directories_os('assets')
+        themes: list[str] = THEME_INDEX.themes()
         if not themes:
             return
         text: ctk.CTkLabel = ctk.CTkLabel(self.scrollable_frame, text='Themes: ', font=ctk.CTkFont(str(get_from_config('font_name')), 32), text_color=COLOR.TEXT)
-        text.pack(side=ctk.TOP, anchor=ctk.SW, padx=75, pady=0)
-        themes.remove('menu') if 'menu' in themes else themes
+        STYLE.subscribe(text, text_color='TEXT').pack(side=ctk.TOP, anchor=ctk.SW, padx=75, pady=0)
         frame = ctk.CTkScrollableFrame(self.scrollable_frame, fg_color=COLOR.TILE_2, scrollbar_button_color=COLOR.DARK_TEXT,
                                         orientation=ctk.HORIZONTAL,
                                         height=70, corner_radius=0)
+        STYLE.subscribe(frame, fg_color='TILE_2', scrollbar_button_color='DARK_TEXT')
         frame.pack(side=ctk.TOP, padx=80, pady=5, anchor=ctk.W, fill=ctk.X)
         for theme in themes:
             self.create_theme_button(frame, theme)
-        warning_text: ctk.CTkLabel = ctk.CTkLabel(self.scrollable_frame, text=STRING.ASSETS_WARNING, font=ctk.CTkFont(str(get_from_config('font_name')), 18),
+        warning = STRING.ASSETS_WARNING.value
+        for theme, missing in THEME_INDEX.incomplete().items():
+            warning += f'\nTheme {theme} is missing: {', '.join(missing)}'
+        warning_text: ctk.CTkLabel = ctk.CTkLabel(self.scrollable_frame, text=warning, font=ctk.CTkFont(str(get_from_config('font_name')), 18),
                                     text_color=COLOR.CLOSE)
+        STYLE.subscribe(warning_text, text_color='CLOSE')
         warning_text.pack(side=ctk.TOP, anchor=ctk.SW, padx=100, pady=0)
 
     def select_theme(self, choice: str) -> None:
@@ -292,6 +616,7 @@ class Settings(ctk.CTkFrame):
         """
         self.choice = choice
         change_config('theme', choice)
+        SPRITES.preload(choice, int(get_from_config('size')) - 10)
 
     def on_close(self, event: Any) -> None:
         """Waits for close action to properly destroy the window
@@ -316,6 +641,7 @@ class Settings(ctk.CTkFrame):
 
          - path (str): Path to open.
         """
+        import subprocess
         system: str = platform.system()
         if system == 'Windows':
             os.startfile(path)
@@ -349,7 +675,7 @@ class Settings(ctk.CTkFrame):
 
     @staticmethod
     def get_font_name(ttf_path: str) -> str | None:
-        """Gets name of the font from file name.
+        """Gets name of the font from the font cache, parsing the file only if it's new or changed.
 
         Args:
 
@@ -359,20 +685,7 @@ class Settings(ctk.CTkFrame):
 
          - str | None: Returns font name on success otherwise None.
         """
-        try:
-            font: TTFont = TTFont(ttf_path)
-            name: str = ''
-            for record in font['name'].names:
-                if record.nameID == 4:
-                    if b'\000' in record.string:
-                        name = record.string.decode('utf-16-be')
-                    else:
-                        name = record.string.decode('utf-8')
-                    break
-            return name
-        except Exception as e: # dont really know what kind of error might occur here
-            print(f"An error occurred: {e}")
-            return None
+        return FONT_CACHE.name(ttf_path)
 
     def open_assets_folder(self) -> None:
         """Setup of open assets button.
@@ -380,17 +693,21 @@ class Settings(ctk.CTkFrame):
         text_label = ctk.CTkLabel(self.scrollable_frame, text='Open assets folder', text_color=COLOR.TEXT,
                                     font=ctk.CTkFont(str(get_from_config('font_name')), 32))
         text_label.pack(side=ctk.TOP, padx=75, pady=4, anchor=ctk.NW)
+        STYLE.subscribe(text_label, text_color='TEXT')
         additional_frame = ctk.CTkFrame(self.scrollable_frame, fg_color=COLOR.TILE_2, corner_radius=0)
+        STYLE.subscribe(additional_frame, fg_color='TILE_2')
         additional_frame.pack(side=ctk.TOP, padx=80, pady=0, fill=ctk.X)
         open_button = ctk.CTkButton(additional_frame, text='OPEN', font=ctk.CTkFont(str(get_from_config('font_name')), 20),
                                     text_color=COLOR.TEXT, command=lambda: self.open_file_explorer('assets'),
                                     fg_color=COLOR.TILE_1, hover_color=COLOR.HIGH_TILE_2,
                                     corner_radius=0)
+        STYLE.subscribe(open_button, text_color='TEXT', fg_color='TILE_1', hover_color='HIGH_TILE_2')
         open_button.pack(side=ctk.RIGHT, padx=10, pady=4, anchor=ctk.E)
         path_text = ctk.CTkLabel(additional_frame, text=resource_path('assets'), text_color=COLOR.DARK_TEXT,
                                 font=ctk.CTkFont(str(get_from_config('font_name')), 18))
-        path_text.pack(side=ctk.LEFT, padx=15, pady=15)
-        ctk.CTkLabel(self.scrollable_frame, fg_color=COLOR.DARK_TEXT, text='', corner_radius=0, height=16).pack(side=ctk.TOP, padx=80, pady=0, fill=ctk.X)
+        STYLE.subscribe(path_text, text_color='DARK_TEXT').pack(side=ctk.LEFT, padx=15, pady=15)
+        STYLE.subscribe(ctk.CTkLabel(self.scrollable_frame, fg_color=COLOR.DARK_TEXT, text='', corner_radius=0, height=16),
+                        fg_color='DARK_TEXT').pack(side=ctk.TOP, padx=80, pady=0, fill=ctk.X)
 
     def choose_font(self) -> None:
         """setup of choose option dialog.
@@ -400,12 +717,15 @@ class Settings(ctk.CTkFrame):
         if not fonts:
             return
         text = ctk.CTkLabel(self.scrollable_frame, text='Fonts: ', font=ctk.CTkFont(str(get_from_config('font_name')), 32), text_color=COLOR.TEXT)
-        text.pack(side=ctk.TOP, anchor=ctk.SW, padx=75, pady=0)
+        STYLE.subscribe(text, text_color='TEXT').pack(side=ctk.TOP, anchor=ctk.SW, padx=75, pady=0)
         frame = ctk.CTkScrollableFrame(self.scrollable_frame, fg_color=COLOR.TILE_2, scrollbar_button_color=COLOR.DARK_TEXT,
                                         orientation=ctk.HORIZONTAL, height=70, corner_radius=0, scrollbar_fg_color=COLOR.DARK_TEXT)
+        STYLE.subscribe(frame, fg_color='TILE_2', scrollbar_button_color='DARK_TEXT', scrollbar_fg_color='DARK_TEXT')
         frame.pack(side=ctk.TOP, padx=80, pady=5, anchor=ctk.W, fill=ctk.X)
+        self.font_buttons: dict[str, ctk.CTkButton] = {}
         for font in fonts:
             self.create_font_button(frame, font)
+        FONT_CACHE.refresh(fonts, lambda font, name: self.after(0, lambda: self.update_font_button(font, name)))
 
     def create_font_button(self, frame: ctk.CTkFrame, font: str) -> None:
         """Setup of font button.
@@ -414,12 +734,26 @@ class Settings(ctk.CTkFrame):
          - frame (ctk.CTkFrame): Frame in which button will be placed.
          - font (str): Font name.
         """
-        font_button = ctk.CTkButton(frame, text=self.get_font_name(font),
+        name = FONT_CACHE.get(font) or os.path.splitext(os.path.basename(font))[0]
+        font_button = ctk.CTkButton(frame, text=name,
                                         command=lambda: self.select_font(font),
                                         font=ctk.CTkFont(str(get_from_config('font_name')), 30), corner_radius=0,
                                         fg_color=COLOR.TILE_1, hover_color=COLOR.HIGH_TILE_1,
                                         text_color=COLOR.TEXT)
+        STYLE.subscribe(font_button, fg_color='TILE_1', hover_color='HIGH_TILE_1', text_color='TEXT')
         font_button.pack(side=ctk.LEFT, padx=4, pady=4, expand=True)
+        self.font_buttons[font] = font_button
+
+    def update_font_button(self, font: str, name: str) -> None:
+        """Shows the name of the font parsed in the background.
+
+        Args:
+
+         - font (str): Path to the font file.
+         - name (str): Font name.
+        """
+        if self.winfo_exists() and font in self.font_buttons:
+            self.font_buttons[font].configure(text=name)
 
     def select_font(self, font: str) -> None:
         """Helper function to save change of font to config file.
@@ -448,6 +782,7 @@ class Settings(ctk.CTkFrame):
 
          - bool: True if color passes regex pattern for hex color, False otherwise.
         """
+        import re
         hex_color_pattern = re.compile(r'^#[0-9a-fA-F]{6}$')
         return bool(hex_color_pattern.match(color))
 
@@ -469,38 +804,34 @@ class Settings(ctk.CTkFrame):
         """Function updating color preview.
         """
         text = ctk.CTkLabel(self.scrollable_frame, text='Colors: ', font=ctk.CTkFont(str(get_from_config('font_name')), 32), text_color=COLOR.TEXT)
-        text.pack(side=ctk.TOP, anchor=ctk.SW, padx=75, pady=0)
-        warning_text = ctk.CTkLabel(self.scrollable_frame, text=STRING.COLORS_WARNING, font=ctk.CTkFont(str(get_from_config('font_name')), 18),
-                                    text_color=COLOR.CLOSE)
-        warning_text.pack(side=ctk.TOP, anchor=ctk.SW, padx=100, pady=0)
+        STYLE.subscribe(text, text_color='TEXT').pack(side=ctk.TOP, anchor=ctk.SW, padx=75, pady=0)
         frame = ctk.CTkFrame(self.scrollable_frame, corner_radius=0, fg_color=COLOR.TILE_2)
-        frame.pack(side=ctk.TOP, padx=80, pady=0, anchor=ctk.W, fill=ctk.X)
+        STYLE.subscribe(frame, fg_color='TILE_2').pack(side=ctk.TOP, padx=80, pady=0, anchor=ctk.W, fill=ctk.X)
         ctk.CTkLabel(frame, text='', height=2).pack(padx=0, pady=0)
-        for color in COLOR:
-            self.color_label(frame, color) if color != 'transparent' else ...
+        for color_name, color in COLOR.items():
+            self.color_label(frame, color_name, color) if color != 'transparent' else ...
         ctk.CTkLabel(frame, text='', height=2).pack(padx=0, pady=0)
-        ctk.CTkLabel(self.scrollable_frame, fg_color=COLOR.DARK_TEXT, text='', corner_radius=0, height=16).pack(side=ctk.TOP, padx=80, pady=0, fill=ctk.X)
+        STYLE.subscribe(ctk.CTkLabel(self.scrollable_frame, fg_color=COLOR.DARK_TEXT, text='', corner_radius=0, height=16),
+                        fg_color='DARK_TEXT').pack(side=ctk.TOP, padx=80, pady=0, fill=ctk.X)
         ctk.CTkLabel(self.scrollable_frame, fg_color=COLOR.TRANSPARENT, text='', corner_radius=0, height=16).pack(side=ctk.TOP, padx=80, pady=0, fill=ctk.X)
 
-    def color_label(self, frame: ctk.CTkFrame, color: str) -> None:
+    def color_label(self, frame: ctk.CTkFrame, color_name: str, color: str) -> None:
         """Function creating color preview frame.
 
         Args:
 
          - frame (ctk.CTkFrame): Parent frame.
+         - color_name (str): Color name from config file.
          - color (str): New hex color string.
         """
-        for color_name , color_str in COLOR.__members__.items():
-            if color_str == color:
-                name_of_color = color_name
-                break
         color_frame = ctk.CTkFrame(frame, fg_color=COLOR.NOTATION_BACKGROUND_B, corner_radius=0)
-        color_frame.pack(side=ctk.TOP, padx=10, pady=4, fill=ctk.X)
+        STYLE.subscribe(color_frame, fg_color='NOTATION_BACKGROUND_B').pack(side=ctk.TOP, padx=10, pady=4, fill=ctk.X)
         vcmd = (self.register(self.validate_length), '%P')
         color_entry = ctk.CTkEntry(color_frame, border_width=0, corner_radius=0, fg_color=color,
                                                 font=ctk.CTkFont(get_from_config('font_name'), 20),
                                                 validate='key', validatecommand=vcmd,
-                                                text_color=COLOR.TEXT if color != COLOR.TEXT else COLOR.DARK_TEXT)
+                                                text_color=COLOR.TEXT if color_name != 'TEXT' else COLOR.DARK_TEXT)
+        STYLE.subscribe(color_entry, text_color='TEXT' if color_name != 'TEXT' else 'DARK_TEXT')
         color_entry.insert(0, color)
         rgb_color = color.lstrip('#')
         r = int(rgb_color[0:2], 16)
@@ -514,18 +845,18 @@ class Settings(ctk.CTkFrame):
                                     command=lambda: self.save_color(color_name, color_entry, color_entry),width=50,
                                     corner_radius=0, fg_color=COLOR.TILE_1, hover_color=COLOR.HIGH_TILE_2,
                                     text_color=COLOR.TEXT)
-        ok_button.pack(side=ctk.LEFT, padx=10, pady=4)
+        STYLE.subscribe(ok_button, fg_color='TILE_1', hover_color='HIGH_TILE_2', text_color='TEXT').pack(side=ctk.LEFT, padx=10, pady=4)
         cancel_button = ctk.CTkButton(color_frame, text='CANCEL', font=ctk.CTkFont(get_from_config('font_name'), 20),
                                     command=lambda: self.cancel(color_name, color_entry, color), width=50,
                                     corner_radius=0, fg_color=COLOR.CLOSE, hover_color=COLOR.CLOSE_HOVER,
                                     text_color=COLOR.TEXT)
-        cancel_button.pack(side=ctk.LEFT, padx=10, pady=4)
-        color_name_label = ctk.CTkLabel(color_frame, text=name_of_color, text_color=COLOR.TEXT,
+        STYLE.subscribe(cancel_button, fg_color='CLOSE', hover_color='CLOSE_HOVER', text_color='TEXT').pack(side=ctk.LEFT, padx=10, pady=4)
+        color_name_label = ctk.CTkLabel(color_frame, text=color_name, text_color=COLOR.TEXT,
                                         font=ctk.CTkFont(get_from_config('font_name'), 22))
-        color_name_label.pack(side=ctk.RIGHT, padx=4, pady=4)
+        STYLE.subscribe(color_name_label, text_color='TEXT').pack(side=ctk.RIGHT, padx=4, pady=4)
 
     def save_color(self, color_name: str, entry: ctk.CTkEntry, color_label: ctk.CTkLabel) -> None:
-        """Saves new color into config file.
+        """Saves new color into config file and reskins the app.
 
         Args:
 
@@ -535,7 +866,7 @@ class Settings(ctk.CTkFrame):
         """
         new_color = entry.get()
         if self.is_valid_color(new_color):
-            change_color(color_name, new_color)
+            STYLE.set_color(color_name, new_color)
             color_label.configure(fg_color=new_color)
 
     def ask_for_color(self, r: int, g: int, b: int, entry: ctk.CTkEntry, color_name: str) -> None:
@@ -548,13 +879,14 @@ class Settings(ctk.CTkFrame):
          - entry (ctk.CTkEntry): Entry frame for user input.
          - color_name (str): Color name from config file.
         """
+        from color_picker import ColorPicker
         picker = ColorPicker(fg_color=COLOR.BACKGROUND, r=r, g=g, b=b, font=ctk.CTkFont(self.font_name, 15))
         # self.master.after(201, lambda: picker.iconbitmap(resource_path('assets\\logo.ico')))
         color = picker.get_color()
         if color:
             entry.delete(0, ctk.END)
             entry.insert(0, color)
-            change_color(color_name, color)
+            STYLE.set_color(color_name, color)
             entry.configure(fg_color=color)
 
     def cancel(self, color_name: str, entry: ctk.CTkEntry, color: str) -> None:
@@ -568,5 +900,5 @@ class Settings(ctk.CTkFrame):
         """
         entry.delete(0, ctk.END)
         entry.insert(0, color)
-        change_color(color_name, color)
+        STYLE.set_color(color_name, color)
         entry.configure(fg_color=color)
@@ -0,0 +1,227 @@
+"""Engine playing against the human on the board. The search runs in a separate low priority process. While the human
+is thinking, the engine ponders: it searches the position after the reply expected from its principal variation.
+On ponder hit the running search gets its time limit and continues with the tree it already built, on ponder miss
+it's stopped and the real position is searched with the transposition table filled by pondering.
+Doesn't import any widgets and the worker process doesn't create any.
+"""
+
+from typing import Any
+import multiprocessing
+import threading
+import queue
+import time
+import os
+
+from rules import Position, Move
+from engine import Engine, SearchLimits, SearchResult, ENTRY_BYTES
+from analysis import MAX_DEPTH, NICENESS
+
+ENGINE_HASH: int = 64
+ENGINE_MOVETIME: int = 1000
+POLL_MS: int = 50
+
+def serve(commands: Any, results: Any, table_size: int) -> None:
+    """Worker process: searches positions on engine turn and ponders between them, keeping the transposition table.
+    Commands are ('go', generation, fen, movetime), ('ponder', generation, fen),
+    ('ponderhit', generation, movetime), ('stop', generation) and None which ends the worker.
+    Results are ('bestmove', generation, move, ponder move).
+
+    Args:
+
+     - commands (multiprocessing.Queue): Commands from the window.
+     - results (multiprocessing.Queue): Chosen moves.
+     - table_size (int): Maximum number of transposition table entries.
+    """
+    try:
+        os.nice(NICENESS)
+    except (AttributeError, OSError):
+        pass
+    engine = Engine(table_size)
+    pending: list[Any] = []
+    condition = threading.Condition()
+    state: dict[str, Any] = {'pondering': 0, 'started': 0.0, 'hit': 0, 'deadline': None}
+    def listen():
+        while True:
+            command = commands.get()
+            with condition:
+                if command and command[0] == 'ponderhit':
+                    generation, movetime = command[1], command[2] / 1000
+                    if state['pondering'] == generation:
+                        # search goes on with its tree, time spent pondering counts as thinking time
+                        state['hit'] = generation
+                        state['deadline'] = engine.deadline = state['started'] + movetime
+                        continue
+                    if pending and pending[0] and pending[0][:2] == ('ponder', generation):
+                        state['hit'] = generation
+                        state['deadline'] = time.perf_counter() + movetime
+                        continue
+                    pending[:] = [command] # pondering already finished
+                    condition.notify()
+                    continue
+                pending[:] = [command]
+                engine.stop()
+                condition.notify()
+            if command is None:
+                return
+    threading.Thread(target=listen, daemon=True).start()
+    finished_ponder: tuple[int, SearchResult] | None = None
+    while True:
+        with condition:
+            condition.wait_for(lambda: pending)
+            command = pending.pop()
+        if command is None:
+            return
+        kind, generation = command[0], command[1]
+        if kind == 'go':
+            result = engine.search(Position(command[2]), SearchLimits(movetime=command[3]))
+            results.put(('bestmove', generation, result.best_move, result.ponder_move))
+        elif kind == 'ponder':
+            with condition:
+                state.update(pondering=generation, started=time.perf_counter())
+            def info(result: SearchResult) -> None:
+                with condition:
+                    if state['hit'] == generation:
+                        engine.deadline = state['deadline'] # search start resets the deadline of early ponder hit
+                    if pending:
+                        engine.stop()
+            result = engine.search(Position(command[2]), SearchLimits(depth=MAX_DEPTH), info)
+            with condition:
+                state['pondering'] = 0
+                hit = state['hit'] == generation
+            if hit:
+                results.put(('bestmove', generation, result.best_move, result.ponder_move))
+            else:
+                finished_ponder = (generation, result)
+        elif kind == 'ponderhit' and finished_ponder and finished_ponder[0] == generation:
+            # pondering finished before the human moved, the result is ready
+            result = finished_ponder[1]
+            results.put(('bestmove', generation, result.best_move, result.ponder_move))
+
+class EngineOpponent:
+    """Class owning the worker process and deciding what it should search after every change of the position.
+    Used from the window thread only.
+    """
+    def __init__(self, hash_mb: int = ENGINE_HASH, movetime: int = ENGINE_MOVETIME) -> None:
+        """Constructor:
+
+        Args:
+
+         - hash_mb (int, optional): Size of the transposition table in MB. Defaults to ENGINE_HASH.
+         - movetime (int, optional): Thinking time per move in milliseconds. Defaults to ENGINE_MOVETIME.
+        """
+        self.table_size: int = hash_mb * 1024 * 1024 // ENTRY_BYTES
+        self.movetime: int = movetime
+        self.color: str | None = None
+        self.process: Any = None
+        self.commands: Any = None
+        self.results: Any = None
+        self.generation: int = 0
+        self.last_state: tuple[int, int] | None = None
+        self.best_move: Move | None = None
+        self.ponder_move: Move | None = None
+        self.pondering: bool = False
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def start(self) -> None:
+        """Starts the worker process, unless it's running.
+        """
+        if self.process and self.process.is_alive():
+            return
+        context = multiprocessing.get_context('spawn') # forking the process with open window isn't safe
+        self.commands = context.Queue()
+        self.results = context.Queue()
+        self.process = context.Process(target=serve, args=(self.commands, self.results, self.table_size), daemon=True)
+        self.process.start()
+
+    def play(self, color: str | None, position: Position) -> None:
+        """Sets the color played by the engine, None stops playing.
+
+        Args:
+
+         - color (str | None): 'w', 'b' or None.
+         - position (Position): Current position on the board.
+        """
+        self.color = color
+        self.last_state = None
+        self.best_move = self.ponder_move = None
+        if color is None:
+            self.stop()
+        else:
+            self.on_position(position)
+
+    def on_position(self, position: Position) -> None:
+        """Reacts to the position on the board: searches on engine turn, ponders after its own move and stops otherwise.
+
+        Args:
+
+         - position (Position): Current position on the board.
+        """
+        if self.color is None or self.last_state == (position.hash, len(position.undo_stack)):
+            return
+        self.last_state = (position.hash, len(position.undo_stack))
+        moves = position.move_stack
+        if position.turn == self.color:
+            if not position.has_legal_move():
+                self.stop()
+            elif self.pondering and moves and moves[-1] == self.ponder_move:
+                self.hits += 1
+                self.commands.put(('ponderhit', self.generation, self.movetime))
+            else:
+                self.misses += self.pondering
+                self.send('go', position.fen(), self.movetime)
+            self.pondering = False
+            return
+        self.stop()
+        if moves and moves[-1] == self.best_move and self.ponder_move and position.has_legal_move():
+            line = position.copy()
+            line.push(self.ponder_move)
+            self.send('ponder', line.fen())
+            self.pondering = True
+
+    def send(self, kind: str, *arguments: Any) -> None:
+        """Sends command for new search, results of the previous ones are ignored from now on.
+
+        Args:
+
+         - kind (str): 'go', 'ponder' or 'stop'.
+         - arguments (Any): Arguments of the command.
+        """
+        self.start()
+        self.generation += 1
+        self.commands.put((kind, self.generation, *arguments))
+
+    def stop(self) -> None:
+        """Stops searching or pondering.
+        """
+        self.pondering = False
+        if self.process:
+            self.send('stop')
+
+    def poll(self) -> Move | None:
+        """Returns the move chosen for the current position.
+
+        Returns:
+
+         - Move | None: Chosen move, None if the engine is still thinking.
+        """
+        chosen = None
+        while self.results:
+            try:
+                _, generation, move, ponder_move = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.generation and move is not None:
+                chosen, self.best_move, self.ponder_move = move, move, ponder_move
+        return chosen
+
+    def close(self) -> None:
+        """Ends the worker process.
+        """
+        if not self.process:
+            return
+        self.commands.put(None)
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+        self.process = None
@@ -0,0 +1,190 @@
+"""File handling PGN import and export. Reader works on a stream and yields games one at a time, so even multi-gigabyte
+archives are read with constant memory usage.
+"""
+
+from typing import Iterable, Iterator
+import re
+
+from rules import Position, STARTING_FEN
+
+TAG_REGEX = re.compile(r'^\[([A-Za-z0-9_]+)\s+"(.*)"\]\s*$')
+TOKEN_REGEX = re.compile(r'\{|\}|\(|\)|;|\$\d+|[^\s{}();]+')
+MOVE_NUMBER_REGEX = re.compile(r'^\d+\.*')
+RESULTS: set[str] = {'1-0', '0-1', '1/2-1/2', '*'}
+SEVEN_TAG_ROSTER: list[str] = ['Event', 'Site', 'Date', 'Round', 'White', 'Black', 'Result']
+
+class Game:
+    """Class holding single game: PGN headers and moves in Standard Algebraic Notation.
+    """
+    def __init__(self, headers: dict[str, str] | None = None, moves: list[str] | None = None) -> None:
+        """Constructor:
+
+        Args:
+
+         - headers (dict[str, str] | None, optional): PGN tag pairs. Defaults to None.
+         - moves (list[str] | None, optional): Moves in SAN. Defaults to None.
+        """
+        self.headers: dict[str, str] = headers if headers is not None else {}
+        self.moves: list[str] = moves if moves is not None else []
+
+    @property
+    def result(self) -> str:
+        """Result of the game taken from headers.
+
+        Returns:
+
+         - str: '1-0', '0-1', '1/2-1/2' or '*'.
+        """
+        return self.headers.get('Result', '*')
+
+    @property
+    def start_fen(self) -> str:
+        """Starting position of the game taken from FEN tag.
+
+        Returns:
+
+         - str: FEN of the starting position.
+        """
+        return self.headers.get('FEN', STARTING_FEN)
+
+    def replay(self) -> Position:
+        """Plays all moves of the game from its starting position.
+
+        Raises:
+
+         - IllegalMoveError: If any of the moves is illegal.
+
+        Returns:
+
+         - Position: Final position of the game.
+        """
+        position = Position(self.start_fen)
+        for move in self.moves:
+            position.push_san(move)
+        return position
+
+    @classmethod
+    def from_position(cls, position: Position, headers: dict[str, str] | None = None) -> 'Game':
+        """Creates game from moves played in the position.
+
+        Args:
+
+         - position (Position): Position with move history.
+         - headers (dict[str, str] | None, optional): Additional PGN tag pairs. Defaults to None.
+
+        Returns:
+
+         - Game: Game with moves converted to SAN.
+        """
+        replay = Position(position.start_fen)
+        moves: list[str] = []
+        for move in position.move_stack:
+            moves.append(replay.san(move))
+            replay.push(move)
+        game_headers: dict[str, str] = {tag: '?' for tag in SEVEN_TAG_ROSTER}
+        game_headers['Result'] = replay.result()
+        if position.start_fen != STARTING_FEN:
+            game_headers['SetUp'] = '1'
+            game_headers['FEN'] = position.start_fen
+        game_headers.update(headers or {})
+        return cls(game_headers, moves)
+
+def read_games(stream: Iterable[str]) -> Iterator[Game]:
+    """Reads games from the stream one at a time. Comments, variations and numeric annotation glyphs are skipped.
+
+    Args:
+
+     - stream (Iterable[str]): Opened PGN file or any other source of text lines.
+
+    Yields:
+
+     - Iterator[Game]: Parsed games in order of appearance.
+    """
+    game = Game()
+    in_comment = False
+    variation_depth = 0
+    has_movetext = False
+    for line in stream:
+        if in_comment:
+            end = line.find('}')
+            if end == -1:
+                continue
+            line = line[end + 1:]
+            in_comment = False
+        stripped = line.strip()
+        if not stripped or stripped.startswith('%'):
+            continue
+        if stripped.startswith('[') and not variation_depth:
+            tag = TAG_REGEX.match(stripped)
+            if tag:
+                if has_movetext:
+                    yield game
+                    game, has_movetext = Game(), False
+                game.headers[tag.group(1)] = tag.group(2).replace('\\"', '"')
+                continue
+        for match in TOKEN_REGEX.finditer(line):
+            token = match.group()
+            if in_comment:
+                in_comment = token != '}'
+                continue
+            if token == '{':
+                in_comment = True
+            elif token == ';':
+                break
+            elif token == '(':
+                variation_depth += 1
+            elif token == ')':
+                variation_depth = max(0, variation_depth - 1)
+            elif variation_depth or token.startswith('$'):
+                continue
+            elif token in RESULTS:
+                game.headers.setdefault('Result', token)
+                yield game
+                game, has_movetext = Game(), False
+            else:
+                move = MOVE_NUMBER_REGEX.sub('', token)
+                if move:
+                    game.moves.append(move)
+                has_movetext = True
+    if has_movetext or game.headers:
+        yield game
+
+def write_game(game: Game, line_length: int = 80) -> str:
+    """Serializes the game into PGN text.
+
+    Args:
+
+     - game (Game): Game to serialize.
+     - line_length (int, optional): Maximum length of movetext lines. Defaults to 80.
+
+    Returns:
+
+     - str: PGN text ending with an empty line.
+    """
+    tags = [tag for tag in SEVEN_TAG_ROSTER if tag in game.headers]
+    tags += [tag for tag in game.headers if tag not in SEVEN_TAG_ROSTER]
+    lines = [f'[{tag} "{game.headers[tag].replace('"', '\\"')}"]' for tag in tags]
+    lines.append('')
+    fields = game.start_fen.split()
+    black_first = fields[1] == 'b'
+    number = int(fields[5]) if len(fields) > 5 else 1
+    tokens: list[str] = []
+    for i, move in enumerate(game.moves):
+        white_move = (i % 2 == 0) != black_first
+        if white_move:
+            tokens.append(f'{number}.')
+        elif i == 0:
+            tokens.append(f'{number}...')
+        tokens.append(move)
+        if not white_move:
+            number += 1
+    tokens.append(game.result)
+    current = ''
+    for token in tokens:
+        if current and len(current) + len(token) + 1 > line_length:
+            lines.append(current)
+            current = token
+        else:
+            current = f'{current} {token}' if current else token
+    lines.append(current)
+    return '\n'.join(lines) + '\n\n'
@@ -3,14 +3,14 @@
 
 import customtkinter as ctk
 from typing import Callable
-from PIL import Image
 import platform
-import os
 if platform.system() == 'Windows':
     import pywinstyles
 
-from tools import resource_path, get_from_config
+from tools import get_from_config
 from properties import COLOR
+from themes import SPRITES
+from instrumentation import PROBES
 
 class Piece:
     def __init__(self, color: str, board, position) -> None:
@@ -60,7 +60,8 @@ class Piece:
         return False if current_color == self.color else True
 
     def load_image(self, piece: str | None=None) -> None | ctk.CTkImage:
-        """Loads asset for the piece.
+        """Loads asset for the piece. Images are taken from the sprite cache, so all pieces of the same kind share one image
+        and the theme is read from disk only once.
 
         Args:
 
@@ -69,24 +70,16 @@ class Piece:
         Returns:
 
          - None | ctk.CTkImage: If piece representation passed function will try to load asset. None otherwise.
-
-        Raises:
-
-         - FileExistsError: If file doesn't exist game will crash and give feedback in the console.
-         - FileNotFoundError: If file couldn't be found game will crash and give feedback in the console.
         """
         if not piece:
             piece_name = (self.__class__.__name__).lower()
         else:
-            piece_name = piece
-        path: str = resource_path(os.path.join('assets', f'{get_from_config('theme')}', f'{piece_name}_{self.color}.png'))
-        try: 
-            loaded_image = Image.open(path).convert('RGBA')
-            if piece:
-                return ctk.CTkImage(light_image=loaded_image, dark_image=loaded_image, size=(int(get_from_config('size'))-10, int(get_from_config('size'))-10))
-            self.image = ctk.CTkImage(light_image=loaded_image, dark_image=loaded_image, size=(int(get_from_config('size'))-10, int(get_from_config('size'))-10))
-        except (FileExistsError, FileNotFoundError) as e:
-            print(f'Couldn`t load image for due to error: {e}')
+            piece_name = piece.lower()
+        image = SPRITES.get(str(get_from_config('theme')), f'{piece_name}_{self.color}', int(get_from_config('size')) - 10)
+        if piece:
+            return image
+        if image:
+            self.image = image
         return None
 
     def update_image(self) -> None:
@@ -176,9 +169,6 @@ class Pawn(Piece):
             return True
         return False
 
-    def notate(self, figure_name, moves_record, capture, check, checkmate) -> None:
-        moves_record.record_move(figure_name, capture=capture, castle=None, check = check, checkmate = checkmate, promotion=f'{self.board.board[self.position[0]][self.position[1]].figure.__class__.__name__[0]}')
-
 class Knight(Piece):
     def __init__(self, color: str, board, position: tuple[int, int]) -> None:
         super().__init__(color, board, position)
@@ -380,3 +370,7 @@ class King(Piece):
                 return False
             return True
         return False
+
+FIGURES: dict[str, type[Piece]] = {'P': Pawn, 'N': Knight, 'B': Bishop, 'R': Rook, 'Q': Queen, 'K': King}
+
+PROBES.register_all(FIGURES.values(), ['check_possible_moves'])
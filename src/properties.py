@@ -1,44 +1,71 @@
-"""File mostly containing custom enum implementation allowing dynamic changes in it and loading it from config file.
+"""File mostly containing custom palette implementation allowing dynamic changes in it and loading it from config file.
 """
 
 from tools import get_colors
 from enum import Enum
 
-class StrEnum(str, Enum):
-    """Custom string enum for loading enum COLOR purposes.
+class Palette:
+    """Mutable palette of app colors loaded from config file. Colors are read as attributes named like config keys
+    in upper case, e.g. COLOR.TILE_1, and always return the current value, so widgets created after a color change
+    use the new color.
+    """
+    def __init__(self, colors: dict[str, str]) -> None:
+        """Constructor:
 
-    Args:
+        Args:
 
-     - str : String type.
-     - Enum : Enum class from enum library.  
-    """
-    def __str__(self) -> str:
-        """Representation of the class.
+         - colors (dict[str, str]): Color name : color code.
+        """
+        self.__dict__['colors'] = {name.upper(): value for name, value in colors.items()}
+
+    def __getattr__(self, name: str) -> str:
+        """Returns current value of the color.
+
+        Args:
+
+         - name (str): Color name in upper case.
+
+        Raises:
+
+         - AttributeError: If there is no such color.
+
+        Returns:
+
+         - str: Color code.
+        """
+        try:
+            return self.__dict__['colors'][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __iter__(self):
+        """Iterates over color codes.
 
         Returns:
 
-         - str: Return value of the color.
+         - Iterator[str]: Color codes in config order.
         """
-        return str(self.value)
+        return iter(self.__dict__['colors'].values())
 
-def create_color_enum():
-    """Function creating enum from dictionary read from config file.
+    def items(self) -> list[tuple[str, str]]:
+        """Returns names and codes of all colors.
 
-    Returns:
+        Returns:
 
-     - StrEnum: Custom string enum.
-    """
-    colors = get_colors()
-    capitalized_colors = {key.upper(): value for key, value in colors.items()}
-    return StrEnum('COLOR', capitalized_colors)
+         - list[tuple[str, str]]: Color name in upper case and color code.
+        """
+        return list(self.__dict__['colors'].items())
 
-COLOR = create_color_enum()
+    def update(self, colors: dict[str, str]) -> None:
+        """Changes colors of the palette.
 
-def refresh_color_enum():
-    """Function reloading colors of the app.
-    """
-    global COLOR
-    COLOR = create_color_enum()
+        Args:
+
+         - colors (dict[str, str]): Color name : new color code.
+        """
+        self.__dict__['colors'].update({name.upper(): value for name, value in colors.items()})
+
+COLOR = Palette(get_colors())
 
 class STRING(str, Enum):
     """Class holding strings constants about warnings.
@@ -46,7 +73,6 @@ class STRING(str, Enum):
     Args:
 
      - str : String type.
-     - Enum : Enum class from enum library.  
+     - Enum : Enum class from enum library.
     """
     ASSETS_WARNING = 'Make sure the folder under the name of chosen theme have all necessary assets with proper names!'
-    COLORS_WARNING = 'Color changes will be visible after restarting app!'
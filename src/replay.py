@@ -0,0 +1,108 @@
+"""File containing headless replay of finished or imported games. Snapshots of the position are kept every few plies,
+so jumping to any ply restores the nearest snapshot and plays only the remaining moves.
+"""
+
+from rules import Position, Move, Snapshot, Undo, IllegalMoveError
+from pgn import Game
+
+class GameReplay:
+    """Class handling scrubbing through the game without any widgets.
+    """
+    def __init__(self, start_fen: str, moves: list[Move], interval: int = 16) -> None:
+        """Constructor:
+
+         - plays the whole game once, storing snapshot every interval plies and notation of every move.
+
+        Args:
+
+         - start_fen (str): Starting position of the game.
+         - moves (list[Move]): Legal moves of the game.
+         - interval (int, optional): Number of plies between snapshots. Defaults to 16.
+        """
+        self.interval: int = interval
+        self.moves: list[Move] = moves
+        self.position: Position = Position(start_fen)
+        self.start_turn: str = self.position.turn
+        self.snapshots: list[Snapshot] = []
+        self.notations: list[str] = []
+        for ply, move in enumerate(moves):
+            if ply % interval == 0:
+                self.snapshots.append(self.position.snapshot())
+            self.notations.append(self.position.san(move))
+            self.position.push(move)
+        if len(moves) % interval == 0:
+            self.snapshots.append(self.position.snapshot())
+        self.history: list[Undo] = self.position.undo_stack[:]
+        self.ply: int = len(moves)
+
+    @classmethod
+    def from_game(cls, game: Game, interval: int = 16) -> 'GameReplay':
+        """Creates replay of the parsed game. Moves after the first illegal one are dropped.
+
+        Args:
+
+         - game (Game): Parsed PGN game.
+         - interval (int, optional): Number of plies between snapshots. Defaults to 16.
+
+        Returns:
+
+         - GameReplay: Replay positioned at the last ply.
+        """
+        position = Position(game.start_fen)
+        moves: list[Move] = []
+        for notation in game.moves:
+            try:
+                moves.append(position.push_san(notation))
+            except IllegalMoveError:
+                break
+        return cls(game.start_fen, moves, interval)
+
+    def __len__(self) -> int:
+        """Number of plies in the game.
+
+        Returns:
+
+         - int: Number of moves of both players.
+        """
+        return len(self.moves)
+
+    def turn_of(self, ply: int) -> str:
+        """Returns color of the player making the move at given ply.
+
+        Args:
+
+         - ply (int): Index of the move.
+
+        Returns:
+
+         - str: 'w' or 'b'.
+        """
+        if ply % 2 == 0:
+            return self.start_turn
+        return 'b' if self.start_turn == 'w' else 'w'
+
+    def seek(self, ply: int) -> Position:
+        """Moves the position to given ply. Steps from the current ply if it is closer than the nearest snapshot,
+        otherwise restores the snapshot and plays only the remaining moves.
+
+        Args:
+
+         - ply (int): Number of moves played in the desired position.
+
+        Returns:
+
+         - Position: Position after given ply.
+        """
+        ply = max(0, min(ply, len(self.moves)))
+        index = ply // self.interval
+        from_snapshot = ply - index * self.interval
+        if 0 <= self.ply - ply <= from_snapshot:
+            for _ in range(self.ply - ply):
+                self.position.pop()
+        elif not 0 <= ply - self.ply <= from_snapshot:
+            self.position.restore(self.snapshots[index], self.history[:index * self.interval])
+            self.ply = index * self.interval
+        for move in self.moves[self.ply:ply]:
+            self.position.push(move)
+        self.ply = ply
+        return self.position
@@ -0,0 +1,826 @@
+"""Headless rules core of the game. Position is kept as a flat list of 64 squares without any widgets, so the rules can be used
+for notation, game import/export and analysis outside of the app window. Squares are numbered row by row starting
+from a8 (0) to h1 (63), the same way as rows and columns of the Board in cell.py.
+"""
+
+import random
+import re
+
+FILES: str = 'abcdefgh'
+STARTING_FEN: str = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+PROMOTIONS: str = 'qrbn'
+
+Move = tuple[int, int, str]
+# undo entry: (move, captured figure, castling rights, en passant square, halfmove clock, hash) before the move
+Undo = tuple[Move, str, str, int, int, int]
+# snapshot: (64 letters with '.' for empty squares, side to move, castling rights, en passant square, halfmove clock, fullmove number, hash)
+Snapshot = tuple[str, str, str, int, int, int, int]
+
+SAN_REGEX = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQnbrq]))?$')
+
+def square_name(square: int) -> str:
+    """Converts square index into algebraic name.
+
+    Args:
+
+     - square (int): Square index in range 0-63.
+
+    Returns:
+
+     - str: Algebraic name of the square e.g. 'e4'.
+    """
+    return f'{FILES[square % 8]}{8 - square // 8}'
+
+def parse_square(name: str) -> int:
+    """Converts algebraic name of the square into its index.
+
+    Args:
+
+     - name (str): Algebraic name of the square e.g. 'e4'.
+
+    Returns:
+
+     - int: Square index in range 0-63.
+    """
+    return (8 - int(name[1])) * 8 + FILES.index(name[0])
+
+def to_square(coords: tuple[int, int]) -> int:
+    """Converts (row, column) coordinates used by the Board into square index.
+
+    Args:
+
+     - coords (tuple[int, int]): Row and column of the cell.
+
+    Returns:
+
+     - int: Square index in range 0-63.
+    """
+    return coords[0] * 8 + coords[1]
+
+def to_coords(square: int) -> tuple[int, int]:
+    """Converts square index into (row, column) coordinates used by the Board.
+
+    Args:
+
+     - square (int): Square index in range 0-63.
+
+    Returns:
+
+     - tuple[int, int]: Row and column of the cell.
+    """
+    return (square // 8, square % 8)
+
+def _jumps(offsets: list[tuple[int, int]]) -> list[list[int]]:
+    """Precomputes target squares of one step pieces for every square.
+
+    Args:
+
+     - offsets (list[tuple[int, int]]): Row and column offsets of the piece.
+
+    Returns:
+
+     - list[list[int]]: Reachable squares for every square of the board.
+    """
+    table: list[list[int]] = []
+    for square in range(64):
+        row, col = to_coords(square)
+        table.append([(row + dr) * 8 + col + dc for dr, dc in offsets if 0 <= row + dr <= 7 and 0 <= col + dc <= 7])
+    return table
+
+def _rays(directions: list[tuple[int, int]]) -> list[list[list[int]]]:
+    """Precomputes rays of sliding pieces for every square.
+
+    Args:
+
+     - directions (list[tuple[int, int]]): Row and column steps of the piece.
+
+    Returns:
+
+     - list[list[list[int]]]: For every square list of rays ordered from the closest square.
+    """
+    table: list[list[list[int]]] = []
+    for square in range(64):
+        row, col = to_coords(square)
+        rays: list[list[int]] = []
+        for dr, dc in directions:
+            ray: list[int] = []
+            r, c = row + dr, col + dc
+            while 0 <= r <= 7 and 0 <= c <= 7:
+                ray.append(r * 8 + c)
+                r, c = r + dr, c + dc
+            if ray:
+                rays.append(ray)
+        table.append(rays)
+    return table
+
+KNIGHT_TARGETS: list[list[int]] = _jumps([(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)])
+KING_TARGETS: list[list[int]] = _jumps([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)])
+ROOK_RAYS: list[list[list[int]]] = _rays([(-1, 0), (1, 0), (0, -1), (0, 1)])
+BISHOP_RAYS: list[list[list[int]]] = _rays([(-1, -1), (-1, 1), (1, -1), (1, 1)])
+QUEEN_RAYS: list[list[list[int]]] = [ROOK_RAYS[i] + BISHOP_RAYS[i] for i in range(64)]
+# squares from which a pawn of given color attacks the square
+PAWN_ATTACKERS: dict[str, list[list[int]]] = {'w': _jumps([(1, -1), (1, 1)]), 'b': _jumps([(-1, -1), (-1, 1)])}
+# castling right: (king from, king to, rook from, rook to, squares to be empty, squares not under attack)
+CASTLING: dict[str, tuple[int, int, int, int, tuple[int, ...], tuple[int, ...]]] = {
+    'K': (60, 62, 63, 61, (61, 62), (60, 61, 62)),
+    'Q': (60, 58, 56, 59, (57, 58, 59), (60, 59, 58)),
+    'k': (4, 6, 7, 5, (5, 6), (4, 5, 6)),
+    'q': (4, 2, 0, 3, (1, 2, 3), (4, 3, 2)),
+}
+# castling rights lost when a piece moves from or to the square
+CASTLING_LOSS: dict[int, str] = {60: 'KQ', 63: 'K', 56: 'Q', 4: 'kq', 7: 'k', 0: 'q'}
+
+# Zobrist keys used for hashing positions, seeded so hashes are the same in every process
+_keys = random.Random(20240720)
+PIECE_KEYS: dict[str, list[int]] = {figure: [_keys.getrandbits(64) for _ in range(64)] for figure in 'PNBRQKpnbrqk'}
+CASTLING_KEYS: dict[str, int] = {right: _keys.getrandbits(64) for right in 'KQkq'}
+EN_PASSANT_KEYS: list[int] = [_keys.getrandbits(64) for _ in range(8)]
+TURN_KEY: int = _keys.getrandbits(64)
+
+class IllegalMoveError(ValueError):
+    """Error raised when move or its notation can't be played in the position.
+
+    Args:
+
+     - ValueError : Inheritance from built in ValueError.
+    """
+
+class Position:
+    """Class holding the state of the game without any widgets: pieces, side to move, castling rights, en passant square and clocks.
+    Pieces are stored as FEN letters, upper case for white and lower case for black, empty squares as ''.
+    """
+    def __init__(self, fen: str = STARTING_FEN) -> None:
+        """Constructor:
+
+         - sets up the position from FEN string.
+
+        Args:
+
+         - fen (str, optional): Position to start from. Defaults to STARTING_FEN.
+        """
+        self.board: list[str] = [''] * 64
+        self.turn: str = 'w'
+        self.castling: str = ''
+        self.en_passant: int = -1
+        self.halfmove_clock: int = 0
+        self.fullmove_number: int = 1
+        self.start_fen: str = fen
+        self.undo_stack: list[Undo] = []
+        self.hash: int = 0
+        self.set_fen(fen)
+
+    def set_fen(self, fen: str) -> None:
+        """Replaces the whole position with the one described by FEN string.
+
+        Args:
+
+         - fen (str): Forsyth-Edwards Notation of the position.
+
+        Raises:
+
+         - ValueError: If FEN string is malformed.
+        """
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError(f'Invalid FEN: {fen}')
+        rows = fields[0].split('/')
+        if len(rows) != 8:
+            raise ValueError(f'Invalid FEN: {fen}')
+        board: list[str] = []
+        for row in rows:
+            for char in row:
+                if char.isdigit():
+                    board.extend([''] * int(char))
+                elif char in 'PNBRQKpnbrqk':
+                    board.append(char)
+                else:
+                    raise ValueError(f'Invalid FEN: {fen}')
+            if len(board) % 8: # every rank has exactly 8 squares
+                raise ValueError(f'Invalid FEN: {fen}')
+        if len(board) != 64 or fields[1] not in {'w', 'b'}:
+            raise ValueError(f'Invalid FEN: {fen}')
+        if board.count('K') != 1 or board.count('k') != 1 or {'P', 'p'} & set(board[:8] + board[56:]):
+            raise ValueError(f'Invalid FEN: {fen}')
+        en_passant = -1
+        if fields[3] != '-':
+            if len(fields[3]) != 2 or fields[3][0] not in FILES or fields[3][1] != ('6' if fields[1] == 'w' else '3'):
+                raise ValueError(f'Invalid FEN: {fen}')
+            en_passant = parse_square(fields[3])
+        self.board = board
+        self.turn = fields[1]
+        self.castling = ''.join(right for right in 'KQkq' if right in fields[2])
+        self.en_passant = en_passant if en_passant != -1 and self._en_passant_attacked(en_passant, self.turn == 'w') else -1
+        self.halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+        self.fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+        self.start_fen = self.fen()
+        self.undo_stack = []
+        self.hash = self.compute_hash()
+
+    def compute_hash(self) -> int:
+        """Computes Zobrist hash of the position from scratch. During the game hash is updated incrementally by push and pop.
+
+        Returns:
+
+         - int: 64 bit hash of the position.
+        """
+        value = 0
+        for square, figure in enumerate(self.board):
+            if figure:
+                value ^= PIECE_KEYS[figure][square]
+        for right in self.castling:
+            value ^= CASTLING_KEYS[right]
+        if self.en_passant != -1:
+            value ^= EN_PASSANT_KEYS[self.en_passant % 8]
+        if self.turn == 'b':
+            value ^= TURN_KEY
+        return value
+
+    @property
+    def move_stack(self) -> list[Move]:
+        """Moves played since the starting position.
+
+        Returns:
+
+         - list[Move]: Moves in order they were played.
+        """
+        return [entry[0] for entry in self.undo_stack]
+
+    def fen(self) -> str:
+        """Serializes the position into FEN string.
+
+        Returns:
+
+         - str: Forsyth-Edwards Notation of the position.
+        """
+        rows: list[str] = []
+        for row in range(8):
+            text, empty = '', 0
+            for figure in self.board[row * 8:row * 8 + 8]:
+                if not figure:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                text += figure
+            rows.append(text + (str(empty) if empty else ''))
+        en_passant = square_name(self.en_passant) if self.en_passant != -1 else '-'
+        return f'{'/'.join(rows)} {self.turn} {self.castling or '-'} {en_passant} {self.halfmove_clock} {self.fullmove_number}'
+
+    def copy(self) -> 'Position':
+        """Creates independent copy of the position.
+
+        Returns:
+
+         - Position: Copied position with the same move history.
+        """
+        position = Position.__new__(Position)
+        position.board = self.board[:]
+        position.turn = self.turn
+        position.castling = self.castling
+        position.en_passant = self.en_passant
+        position.halfmove_clock = self.halfmove_clock
+        position.fullmove_number = self.fullmove_number
+        position.start_fen = self.start_fen
+        position.undo_stack = self.undo_stack[:]
+        position.hash = self.hash
+        return position
+
+    def snapshot(self) -> Snapshot:
+        """Creates compact immutable snapshot of the position without move history.
+
+        Returns:
+
+         - Snapshot: Tuple describing the position.
+        """
+        return (''.join(figure or '.' for figure in self.board), self.turn, self.castling, self.en_passant,
+                self.halfmove_clock, self.fullmove_number, self.hash)
+
+    def restore(self, snapshot: Snapshot, undo_stack: list[Undo] | None = None) -> None:
+        """Restores the position from the snapshot.
+
+        Args:
+
+         - snapshot (Snapshot): Snapshot created by snapshot method.
+         - undo_stack (list[Undo] | None, optional): Move history leading to the snapshot. Defaults to None which clears the history.
+        """
+        board, self.turn, self.castling, self.en_passant, self.halfmove_clock, self.fullmove_number, self.hash = snapshot
+        self.board = [figure if figure != '.' else '' for figure in board]
+        self.undo_stack = undo_stack if undo_stack is not None else []
+
+    @staticmethod
+    def color_of(figure: str) -> str:
+        """Returns color of the figure letter.
+
+        Args:
+
+         - figure (str): FEN letter of the figure.
+
+        Returns:
+
+         - str: 'w' for white and 'b' for black figure.
+        """
+        return 'w' if figure.isupper() else 'b'
+
+    def king_square(self, color: str) -> int:
+        """Finds the king of given color.
+
+        Args:
+
+         - color (str): Color of the king.
+
+        Returns:
+
+         - int: Square of the king or -1 if there is no king on the board.
+        """
+        king = 'K' if color == 'w' else 'k'
+        return self.board.index(king) if king in self.board else -1
+
+    def is_attacked(self, square: int, by_color: str) -> bool:
+        """Checks if square is attacked by any figure of given color.
+
+        Args:
+
+         - square (int): Square to check.
+         - by_color (str): Color of the attacking side.
+
+        Returns:
+
+         - bool: True if square is under attack, False otherwise.
+        """
+        board = self.board
+        if by_color == 'w':
+            pawn, knight, bishop, rook, queen, king = 'P', 'N', 'B', 'R', 'Q', 'K'
+        else:
+            pawn, knight, bishop, rook, queen, king = 'p', 'n', 'b', 'r', 'q', 'k'
+        for origin in PAWN_ATTACKERS[by_color][square]:
+            if board[origin] == pawn:
+                return True
+        for origin in KNIGHT_TARGETS[square]:
+            if board[origin] == knight:
+                return True
+        for origin in KING_TARGETS[square]:
+            if board[origin] == king:
+                return True
+        for ray in ROOK_RAYS[square]:
+            for origin in ray:
+                figure = board[origin]
+                if figure:
+                    if figure == rook or figure == queen:
+                        return True
+                    break
+        for ray in BISHOP_RAYS[square]:
+            for origin in ray:
+                figure = board[origin]
+                if figure:
+                    if figure == bishop or figure == queen:
+                        return True
+                    break
+        return False
+
+    def in_check(self) -> bool:
+        """Checks if side to move is in check.
+
+        Returns:
+
+         - bool: True if king of the side to move is attacked, False otherwise.
+        """
+        king = self.king_square(self.turn)
+        return king != -1 and self.is_attacked(king, 'b' if self.turn == 'w' else 'w')
+
+    def pseudo_legal_moves(self) -> list[Move]:
+        """Generates all moves of the side to move without checking if own king is left in check.
+        Castling is fully validated here, including squares under attack.
+
+        Returns:
+
+         - list[Move]: List of (from square, to square, promotion) tuples.
+        """
+        board = self.board
+        white = self.turn == 'w'
+        enemy = 'b' if white else 'w'
+        moves: list[Move] = []
+        for square, figure in enumerate(board):
+            if not figure or figure.isupper() != white:
+                continue
+            kind = figure.upper()
+            if kind == 'P':
+                self._pawn_moves(square, white, moves)
+            elif kind == 'N' or kind == 'K':
+                for target in (KNIGHT_TARGETS if kind == 'N' else KING_TARGETS)[square]:
+                    occupant = board[target]
+                    if not occupant or occupant.isupper() != white:
+                        moves.append((square, target, ''))
+            else:
+                rays = ROOK_RAYS if kind == 'R' else BISHOP_RAYS if kind == 'B' else QUEEN_RAYS
+                for ray in rays[square]:
+                    for target in ray:
+                        occupant = board[target]
+                        if not occupant:
+                            moves.append((square, target, ''))
+                            continue
+                        if occupant.isupper() != white:
+                            moves.append((square, target, ''))
+                        break
+        for right in self.castling:
+            if right.isupper() != white:
+                continue
+            king_from, king_to, rook_from, _, empty, safe = CASTLING[right]
+            if board[king_from] != ('K' if white else 'k') or board[rook_from] != ('R' if white else 'r'):
+                continue
+            if any(board[square] for square in empty):
+                continue
+            if any(self.is_attacked(square, enemy) for square in safe):
+                continue
+            moves.append((king_from, king_to, ''))
+        return moves
+
+    def _en_passant_attacked(self, square: int, white: bool) -> bool:
+        """Checks if en passant square is attacked by a pawn, like in FEN and Polyglot it's kept only then,
+        so transpositions with and without the double push have the same hash.
+
+        Args:
+
+         - square (int): En passant square.
+         - white (bool): True for white pawns.
+
+        Returns:
+
+         - bool: True if a pawn of the side stands next to the pawn which double pushed.
+        """
+        pawn, behind = ('P', square + 8) if white else ('p', square - 8)
+        col = square % 8
+        return any(0 <= col + dc <= 7 and self.board[behind + dc] == pawn for dc in (-1, 1))
+
+    def _pawn_moves(self, square: int, white: bool, moves: list[Move]) -> None:
+        """Appends pawn moves from given square, including promotions and en passant.
+
+        Args:
+
+         - square (int): Square of the pawn.
+         - white (bool): True for white pawn.
+         - moves (list[Move]): List to which moves are appended.
+        """
+        board = self.board
+        step, start_row, last_row = (-8, 6, 0) if white else (8, 1, 7)
+        row, col = square // 8, square % 8
+        targets: list[int] = []
+        forward = square + step
+        if not board[forward]:
+            targets.append(forward)
+            if row == start_row and not board[forward + step]:
+                moves.append((square, forward + step, ''))
+        for dc in (-1, 1):
+            if 0 <= col + dc <= 7:
+                target = forward + dc
+                occupant = board[target]
+                if (occupant and occupant.isupper() != white) or target == self.en_passant:
+                    targets.append(target)
+        for target in targets:
+            if target // 8 == last_row:
+                moves.extend((square, target, promotion) for promotion in PROMOTIONS)
+            else:
+                moves.append((square, target, ''))
+
+    def is_legal(self, move: Move) -> bool:
+        """Checks if pseudo legal move doesn't leave own king in check by temporarily placing the pieces.
+
+        Args:
+
+         - move (Move): Pseudo legal move to check.
+
+        Returns:
+
+         - bool: True if move is legal, False otherwise.
+        """
+        board = self.board
+        start, end, _ = move
+        figure = board[start]
+        captured = board[end]
+        en_passant_square = -1
+        if figure in 'Pp' and end == self.en_passant and not captured:
+            en_passant_square = end + (8 if figure == 'P' else -8)
+        board[end], board[start] = figure, ''
+        if en_passant_square != -1:
+            en_passant_figure, board[en_passant_square] = board[en_passant_square], ''
+        king = end if figure in 'Kk' else self.king_square(self.turn)
+        legal = king == -1 or not self.is_attacked(king, 'b' if self.turn == 'w' else 'w')
+        board[start], board[end] = figure, captured
+        if en_passant_square != -1:
+            board[en_passant_square] = en_passant_figure
+        return legal
+
+    def legal_moves(self) -> list[Move]:
+        """Generates all legal moves of the side to move.
+
+        Returns:
+
+         - list[Move]: List of (from square, to square, promotion) tuples.
+        """
+        return [move for move in self.pseudo_legal_moves() if self.is_legal(move)]
+
+    def find_move(self, start: tuple[int, int], end: tuple[int, int], promotion: str = '') -> Move:
+        """Translates the move made on the Board into move of the position.
+
+        Args:
+
+         - start (tuple[int, int]): Row and column of the moved figure.
+         - end (tuple[int, int]): Row and column of the target cell.
+         - promotion (str, optional): Letter of the figure pawn was promoted to. Defaults to ''.
+
+        Returns:
+
+         - Move: Move tuple, pawn reaching last row without chosen figure is promoted to queen.
+        """
+        move = (to_square(start), to_square(end), promotion.lower())
+        if move[2] == '' and self.board[move[0]] in 'Pp' and move[1] // 8 in {0, 7}:
+            move = (move[0], move[1], 'q')
+        return move
+
+    def push(self, move: Move) -> None:
+        """Plays the move in the position and stores compact undo entry on the stack. Move isn't validated,
+        use legal_moves or parse_san to obtain legal ones.
+
+        Args:
+
+         - move (Move): Move to play.
+        """
+        board = self.board
+        start, end, promotion = move
+        figure = board[start]
+        captured = board[end]
+        white = figure.isupper()
+        value = self.hash
+        self.undo_stack.append((move, captured, self.castling, self.en_passant, self.halfmove_clock, value))
+        self.halfmove_clock = 0 if captured or figure in 'Pp' else self.halfmove_clock + 1
+        value ^= PIECE_KEYS[figure][start]
+        if captured:
+            value ^= PIECE_KEYS[captured][end]
+        elif figure in 'Pp' and end == self.en_passant:
+            square = end + (8 if white else -8)
+            value ^= PIECE_KEYS[board[square]][square]
+            board[square] = ''
+        if figure in 'Kk' and abs(end - start) == 2:
+            for right in ('KQ' if white else 'kq'):
+                king_from, king_to, rook_from, rook_to, _, _ = CASTLING[right]
+                if king_from == start and king_to == end:
+                    rook = board[rook_from]
+                    value ^= PIECE_KEYS[rook][rook_from] ^ PIECE_KEYS[rook][rook_to]
+                    board[rook_to], board[rook_from] = rook, ''
+        placed = (promotion.upper() if white else promotion) if promotion else figure
+        board[end], board[start] = placed, ''
+        value ^= PIECE_KEYS[placed][end]
+        if self.en_passant != -1:
+            value ^= EN_PASSANT_KEYS[self.en_passant % 8]
+        self.en_passant = -1
+        if figure in 'Pp' and abs(end - start) == 16 and self._en_passant_attacked((start + end) // 2, not white):
+            self.en_passant = (start + end) // 2
+            value ^= EN_PASSANT_KEYS[self.en_passant % 8]
+        if self.castling and (start in CASTLING_LOSS or end in CASTLING_LOSS):
+            lost = CASTLING_LOSS.get(start, '') + CASTLING_LOSS.get(end, '')
+            for right in self.castling:
+                if right in lost:
+                    value ^= CASTLING_KEYS[right]
+            self.castling = ''.join(right for right in self.castling if right not in lost)
+        if self.turn == 'b':
+            self.fullmove_number += 1
+        self.turn = 'b' if white else 'w'
+        self.hash = value ^ TURN_KEY
+
+    def pop(self) -> Move:
+        """Takes back the last move using the entry from the undo stack. Restores captured figure, castling rook,
+        promoted pawn, flags, clocks and hash without copying the board.
+
+        Raises:
+
+         - IndexError: If there is no move to take back.
+
+        Returns:
+
+         - Move: Move which was taken back.
+        """
+        move, captured, castling, en_passant, halfmove_clock, value = self.undo_stack.pop()
+        board = self.board
+        start, end, promotion = move
+        figure = board[end]
+        white = figure.isupper()
+        if promotion:
+            figure = 'P' if white else 'p'
+        board[start], board[end] = figure, captured
+        if figure in 'Pp' and end == en_passant and not captured:
+            board[end + (8 if white else -8)] = 'p' if white else 'P'
+        if figure in 'Kk' and abs(end - start) == 2:
+            for right in ('KQ' if white else 'kq'):
+                king_from, king_to, rook_from, rook_to, _, _ = CASTLING[right]
+                if king_from == start and king_to == end:
+                    board[rook_from], board[rook_to] = board[rook_to], ''
+        self.castling = castling
+        self.en_passant = en_passant
+        self.halfmove_clock = halfmove_clock
+        if not white:
+            self.fullmove_number -= 1
+        self.turn = 'w' if white else 'b'
+        self.hash = value
+        return move
+
+    def is_repetition(self, count: int = 3) -> bool:
+        """Checks if current position occurred given number of times. Only positions since the last capture or pawn move are compared.
+
+        Args:
+
+         - count (int, optional): Number of occurrences. Defaults to 3.
+
+        Returns:
+
+         - bool: True if position was repeated, False otherwise.
+        """
+        seen = 1
+        stack = self.undo_stack
+        for i in range(2, min(self.halfmove_clock, len(stack)) + 1, 2):
+            if stack[-i][5] == self.hash:
+                seen += 1
+                if seen >= count:
+                    return True
+        return False
+
+    def is_checkmate(self) -> bool:
+        """Checks if side to move is checkmated.
+
+        Returns:
+
+         - bool: True on checkmate, False otherwise.
+        """
+        return self.in_check() and not self.has_legal_move()
+
+    def is_stalemate(self) -> bool:
+        """Checks if side to move has no legal moves while not being in check.
+
+        Returns:
+
+         - bool: True on stalemate, False otherwise.
+        """
+        return not self.in_check() and not self.has_legal_move()
+
+    def has_legal_move(self) -> bool:
+        """Checks if side to move has at least one legal move. Stops at the first one found.
+
+        Returns:
+
+         - bool: True if any legal move exists, False otherwise.
+        """
+        return any(self.is_legal(move) for move in self.pseudo_legal_moves())
+
+    def result(self) -> str:
+        """Returns the result of the game in PGN format.
+
+        Returns:
+
+         - str: '1-0', '0-1', '1/2-1/2' or '*' if game isn't finished.
+        """
+        if self.has_legal_move():
+            return '1/2-1/2' if self.halfmove_clock >= 100 or self.is_repetition() else '*'
+        if self.in_check():
+            return '0-1' if self.turn == 'w' else '1-0'
+        return '1/2-1/2'
+
+    def uci(self, move: Move) -> str:
+        """Converts move into long algebraic notation used by UCI protocol.
+
+        Args:
+
+         - move (Move): Move to convert.
+
+        Returns:
+
+         - str: Move notation e.g. 'e2e4' or 'e7e8q'.
+        """
+        return f'{square_name(move[0])}{square_name(move[1])}{move[2]}'
+
+    def parse_uci(self, text: str) -> Move:
+        """Converts long algebraic notation into legal move.
+
+        Args:
+
+         - text (str): Move notation e.g. 'e2e4'.
+
+        Raises:
+
+         - IllegalMoveError: If the move is not legal in the position.
+
+        Returns:
+
+         - Move: Legal move.
+        """
+        try:
+            move = (parse_square(text[0:2]), parse_square(text[2:4]), text[4:5].lower())
+        except (ValueError, IndexError):
+            raise IllegalMoveError(f'Invalid move: {text}')
+        if move not in self.legal_moves():
+            raise IllegalMoveError(f'Illegal move: {text}')
+        return move
+
+    def san(self, move: Move) -> str:
+        """Converts move into Standard Algebraic Notation with disambiguation, check and checkmate markers.
+
+        Args:
+
+         - move (Move): Legal move to convert.
+
+        Returns:
+
+         - str: Move notation e.g. 'Nbd7', 'exd5', 'e8=Q+' or 'O-O'.
+        """
+        notation = self._san_body(move)
+        self.push(move)
+        if self.in_check():
+            notation += '+' if self.has_legal_move() else '#'
+        self.pop()
+        return notation
+
+    def _san_body(self, move: Move) -> str:
+        """Creates SAN of the move without check and checkmate markers.
+
+        Args:
+
+         - move (Move): Legal move to convert.
+
+        Returns:
+
+         - str: Move notation without suffix.
+        """
+        start, end, promotion = move
+        figure = self.board[start]
+        kind = figure.upper()
+        if kind == 'K' and abs(end - start) == 2:
+            return 'O-O' if end > start else 'O-O-O'
+        capture = bool(self.board[end]) or (kind == 'P' and end == self.en_passant)
+        if kind == 'P':
+            notation = f'{FILES[start % 8]}x' if capture else ''
+            notation += square_name(end)
+            return notation + (f'={promotion.upper()}' if promotion else '')
+        rivals = [other for other, target, _ in self.pseudo_legal_moves()
+                  if target == end and other != start and self.board[other] == figure and self.is_legal((other, target, ''))]
+        disambiguation = ''
+        if rivals:
+            if all(other % 8 != start % 8 for other in rivals):
+                disambiguation = FILES[start % 8]
+            elif all(other // 8 != start // 8 for other in rivals):
+                disambiguation = str(8 - start // 8)
+            else:
+                disambiguation = square_name(start)
+        return f'{kind}{disambiguation}{'x' if capture else ''}{square_name(end)}'
+
+    def parse_san(self, text: str) -> Move:
+        """Converts Standard Algebraic Notation into legal move. Accepts '0-0' castling and missing '=' before promotion.
+
+        Args:
+
+         - text (str): Move notation e.g. 'Nf3', 'exd5' or 'O-O'.
+
+        Raises:
+
+         - IllegalMoveError: If notation is invalid, ambiguous or the move is not legal.
+
+        Returns:
+
+         - Move: Legal move.
+        """
+        notation = text.rstrip('+#!?')
+        if notation in {'O-O', '0-0', 'O-O-O', '0-0-0'}:
+            start = 60 if self.turn == 'w' else 4
+            end = start + (2 if len(notation) == 3 else -2)
+            move = (start, end, '')
+            if self.board[start] == ('K' if self.turn == 'w' else 'k') and move in self.pseudo_legal_moves() and self.is_legal(move):
+                return move
+            raise IllegalMoveError(f'Illegal move: {text}')
+        match = SAN_REGEX.match(notation)
+        if not match:
+            raise IllegalMoveError(f'Invalid move: {text}')
+        kind, from_file, from_rank, target, promotion = match.groups()
+        figure = kind or 'P'
+        figure = figure if self.turn == 'w' else figure.lower()
+        end = parse_square(target)
+        promotion = (promotion or '').lower()
+        candidates = [move for move in self.pseudo_legal_moves()
+                      if move[1] == end and self.board[move[0]] == figure and move[2] == promotion
+                      and (not from_file or FILES[move[0] % 8] == from_file)
+                      and (not from_rank or str(8 - move[0] // 8) == from_rank)
+                      and self.is_legal(move)]
+        if len(candidates) != 1:
+            raise IllegalMoveError(f'{'Ambiguous' if candidates else 'Illegal'} move: {text}')
+        return candidates[0]
+
+    def push_san(self, text: str) -> Move:
+        """Parses SAN and plays the move.
+
+        Args:
+
+         - text (str): Move notation.
+
+        Returns:
+
+         - Move: Played move.
+        """
+        move = self.parse_san(text)
+        self.push(move)
+        return move
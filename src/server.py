@@ -0,0 +1,357 @@
+"""Game server keeping many games in memory on the headless rules core. Clients connect over TCP or Unix socket
+and speak a line protocol, every move is validated and broadcast to clients watching the game.
+
+Commands and replies (one per line, replies in the order of commands):
+
+    new [fen]             -> ok <game> <fen>
+    move <game> <move>    -> ok <game> <ply> <uci> <result> <fen>    move in UCI or SAN
+    legal <game>          -> ok <game> <uci> <uci> ...
+    fen <game>            -> ok <game> <fen>
+    watch <game>          -> ok <game> <fen>                         then: update <game> <ply> <uci> <result> <fen>
+    unwatch <game>        -> ok <game>
+    close <game>          -> ok <game>
+    stats                 -> ok games=<n> moves=<n> clients=<n> memory_kb=<n>
+    quit
+
+Errors are replied as: error <message>
+
+Usage:
+
+    python src/server.py [--host 127.0.0.1] [--port 5050] [--unix /tmp/chess.sock]
+"""
+
+from typing import Callable
+import argparse
+import asyncio
+import sys
+import os
+
+from rules import Position, IllegalMoveError, STARTING_FEN
+
+DEFAULT_PORT: int = 5050
+MAX_LINE: int = 4096
+WRITE_BUFFER_LIMIT: int = 1024 * 1024
+
+def memory_kb() -> int:
+    """Reads resident memory of the process.
+
+    Returns:
+
+     - int: Resident set size in kB, 0 if unknown.
+    """
+    try:
+        with open('/proc/self/statm', encoding='ascii') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # peak, in bytes on macOS
+        return usage // 1024 if sys.platform == 'darwin' else usage
+    except ImportError:
+        return 0
+
+class ServerGame:
+    """Game hosted by the server.
+    """
+    __slots__ = ('position', 'watchers', 'result')
+
+    def __init__(self, fen: str) -> None:
+        """Constructor:
+
+        Args:
+
+         - fen (str): Starting position.
+
+        Raises:
+
+         - ValueError: If FEN string is malformed.
+        """
+        self.position: Position = Position(fen)
+        self.watchers: set[asyncio.StreamWriter] = set()
+        self.result: str = self.position.result()
+
+class GameServer:
+    """Class holding all games and connected clients. Commands are handled in the event loop thread only,
+    so games don't need any locks.
+    """
+    def __init__(self) -> None:
+        """Constructor.
+        """
+        self.games: dict[int, ServerGame] = {}
+        self.next_game: int = 1
+        self.moves: int = 0
+        self.clients: int = 0
+        self.watching: dict[asyncio.StreamWriter, set[int]] = {}
+        self.commands: dict[str, Callable[[asyncio.StreamWriter, list[str]], str]] = {
+            'new': self.new, 'move': self.move, 'legal': self.legal, 'fen': self.fen, 'watch': self.watch,
+            'unwatch': self.unwatch, 'close': self.close, 'stats': self.stats,
+        }
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves one connection until it sends quit or disconnects.
+
+        Args:
+
+         - reader (asyncio.StreamReader): Lines from the client.
+         - writer (asyncio.StreamWriter): Replies and updates to the client.
+        """
+        self.clients += 1
+        self.watching[writer] = set()
+        try:
+            while line := await reader.readline():
+                words = line.decode('utf-8', 'replace').split()
+                if not words:
+                    continue
+                if words[0] == 'quit':
+                    break
+                writer.write(f'{self.execute(writer, words)}\n'.encode())
+                if writer.transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+                    await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.clients -= 1
+            for number in self.watching.pop(writer):
+                if game := self.games.get(number):
+                    game.watchers.discard(writer)
+            writer.close()
+
+    def execute(self, writer: asyncio.StreamWriter, words: list[str]) -> str:
+        """Executes one command.
+
+        Args:
+
+         - writer (asyncio.StreamWriter): Connection which sent the command.
+         - words (list[str]): Command and its arguments.
+
+        Returns:
+
+         - str: Reply line without the new line character.
+        """
+        command = self.commands.get(words[0])
+        if not command:
+            return f'error unknown command {words[0]}'
+        try:
+            return command(writer, words[1:])
+        except IllegalMoveError as error:
+            return f'error {error}'
+        except (ValueError, IndexError) as error:
+            return f'error invalid arguments: {error}'
+
+    def game(self, arguments: list[str]) -> tuple[int, ServerGame]:
+        """Finds the game given by the first argument.
+
+        Args:
+
+         - arguments (list[str]): Arguments of the command.
+
+        Raises:
+
+         - ValueError: If the game doesn't exist.
+
+        Returns:
+
+         - tuple[int, ServerGame]: Number of the game and the game.
+        """
+        number = int(arguments[0])
+        if number not in self.games:
+            raise ValueError(f'no game {number}')
+        return number, self.games[number]
+
+    def new(self, writer: asyncio.StreamWriter, arguments: list[str]) -> str:
+        """Creates a game.
+
+        Args:
+
+         - writer (asyncio.StreamWriter): Connection which sent the command.
+         - arguments (list[str]): Optional FEN of the starting position.
+
+        Returns:
+
+         - str: Number of the game and its FEN.
+        """
+        number = self.next_game
+        game = ServerGame(' '.join(arguments) or STARTING_FEN)
+        self.games[number] = game
+        self.next_game += 1
+        return f'ok {number} {game.position.fen()}'
+
+    def move(self, writer: asyncio.StreamWriter, arguments: list[str]) -> str:
+        """Validates and plays the move, watchers get the update.
+
+        Args:
+
+         - writer (asyncio.StreamWriter): Connection which sent the command.
+         - arguments (list[str]): Number of the game and the move in UCI or SAN.
+
+        Raises:
+
+         - IllegalMoveError: If the move is illegal or the game is over.
+
+        Returns:
+
+         - str: Number of the game, ply, move in UCI, result and FEN.
+        """
+        number, game = self.game(arguments)
+        if game.result != '*':
+            raise IllegalMoveError(f'Game {number} is over {game.result}')
+        position = game.position
+        try:
+            move = position.parse_uci(arguments[1])
+        except IllegalMoveError:
+            move = position.parse_san(arguments[1])
+        notation = position.uci(move)
+        position.push(move)
+        game.result = position.result()
+        self.moves += 1
+        state = f'{number} {len(position.undo_stack)} {notation} {game.result} {position.fen()}'
+        self.broadcast(game, f'update {state}\n'.encode())
+        return f'ok {state}'
+
+    def legal(self, writer: asyncio.StreamWriter, arguments: list[str]) -> str:
+        """Lists legal moves of the game.
+
+        Args:
+
+         - writer (asyncio.StreamWriter): Connection which sent the command.
+         - arguments (list[str]): Number of the game.
+
+        Returns:
+
+         - str: Number of the game and moves in UCI, none if the game is over.
+        """
+        number, game = self.game(arguments)
+        moves = game.position.legal_moves() if game.result == '*' else []
+        return ' '.join(['ok', str(number)] + [game.position.uci(move) for move in moves])
+
+    def fen(self, writer: asyncio.StreamWriter, arguments: list[str]) -> str:
+        """Describes the position of the game.
+
+        Args:
+
+         - writer (asyncio.StreamWriter): Connection which sent the command.
+         - arguments (list[str]): Number of the game.
+
+        Returns:
+
+         - str: Number of the game and its FEN.
+        """
+        number, game = self.game(arguments)
+        return f'ok {number} {game.position.fen()}'
+
+    def watch(self, writer: asyncio.StreamWriter, arguments: list[str]) -> str:
+        """Subscribes the connection to updates of the game.
+
+        Args:
+
+         - writer (asyncio.StreamWriter): Connection which sent the command.
+         - arguments (list[str]): Number of the game.
+
+        Returns:
+
+         - str: Number of the game and its FEN.
+        """
+        number, game = self.game(arguments)
+        game.watchers.add(writer)
+        self.watching[writer].add(number)
+        return f'ok {number} {game.position.fen()}'
+
+    def unwatch(self, writer: asyncio.StreamWriter, arguments: list[str]) -> str:
+        """Unsubscribes the connection from updates of the game.
+
+        Args:
+
+         - writer (asyncio.StreamWriter): Connection which sent the command.
+         - arguments (list[str]): Number of the game.
+
+        Returns:
+
+         - str: Number of the game.
+        """
+        number, game = self.game(arguments)
+        game.watchers.discard(writer)
+        self.watching[writer].discard(number)
+        return f'ok {number}'
+
+    def close(self, writer: asyncio.StreamWriter, arguments: list[str]) -> str:
+        """Removes the game from memory.
+
+        Args:
+
+         - writer (asyncio.StreamWriter): Connection which sent the command.
+         - arguments (list[str]): Number of the game.
+
+        Returns:
+
+         - str: Number of the game.
+        """
+        number, game = self.game(arguments)
+        for watcher in game.watchers:
+            self.watching[watcher].discard(number)
+        del self.games[number]
+        return f'ok {number}'
+
+    def stats(self, writer: asyncio.StreamWriter, arguments: list[str]) -> str:
+        """Describes load of the server.
+
+        Args:
+
+         - writer (asyncio.StreamWriter): Connection which sent the command.
+         - arguments (list[str]): Ignored.
+
+        Returns:
+
+         - str: Number of games, played moves, connected clients and resident memory.
+        """
+        return f'ok games={len(self.games)} moves={self.moves} clients={self.clients} memory_kb={memory_kb()}'
+
+    def broadcast(self, game: ServerGame, line: bytes) -> None:
+        """Sends the update to watchers of the game. Watchers which don't read their updates are disconnected,
+        so one slow client can't make the server buffer without limit.
+
+        Args:
+
+         - game (ServerGame): Updated game.
+         - line (bytes): Update line.
+        """
+        for watcher in list(game.watchers):
+            if watcher.is_closing() or watcher.transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+                game.watchers.discard(watcher)
+                watcher.close()
+            else:
+                watcher.write(line)
+
+async def serve(host: str, port: int, unix: str | None = None) -> None:
+    """Runs the server until it's interrupted.
+
+    Args:
+
+     - host (str): Address to listen on.
+     - port (int): TCP port.
+     - unix (str | None, optional): Path of Unix socket used instead of TCP. Defaults to None.
+    """
+    game_server = GameServer()
+    if unix:
+        server = await asyncio.start_unix_server(game_server.handle_client, unix, limit=MAX_LINE)
+    else:
+        server = await asyncio.start_server(game_server.handle_client, host, port, limit=MAX_LINE)
+    print(f'Listening on {unix or f'{host}:{port}'}', file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+def main() -> None:
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description='Game server speaking a line protocol.')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='TCP port')
+    parser.add_argument('--unix', default=None, help='path of Unix socket used instead of TCP')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
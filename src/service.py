@@ -0,0 +1,318 @@
+"""Asyncio API of the rules core and the engine for embedding in services. Searches run in a pool of worker processes,
+each with its own transposition table, requests wait in a queue until a worker is free. Cancelling the awaiting task
+or exceeding its timeout removes the request from the queue or stops the running search.
+Doesn't import any widgets.
+
+Usage:
+
+    async with EngineService(workers=4) as service:
+        moves = await service.legal_moves(fen)
+        result = await service.analyse(fen, SearchLimits(movetime=200), timeout=1)
+"""
+
+from dataclasses import dataclass
+from typing import Any
+import multiprocessing
+import threading
+import asyncio
+import queue
+import os
+
+from rules import Position, Move
+from engine import Engine, SearchLimits, SearchResult, ENTRY_BYTES
+
+SERVICE_HASH: int = 16
+STOP_GRACE: float = 1.0
+WORKER_POLL: float = 0.25
+
+def serve(commands: Any, results: Any, table_size: int) -> None:
+    """Worker process: searches requests one by one. Commands are ('search', request, fen, limits), ('stop', request)
+    and None which ends the worker. Results are (request, 'done', SearchResult), (request, 'stopped', None)
+    and (request, 'error', message).
+
+    Args:
+
+     - commands (multiprocessing.Queue): Commands of this worker.
+     - results (multiprocessing.Queue): Results shared by all workers.
+     - table_size (int): Maximum number of transposition table entries.
+    """
+    engine = Engine(table_size)
+    jobs: queue.Queue = queue.Queue()
+    lock = threading.Lock()
+    stopped: set[int] = set()
+    current: list[int] = [0]
+    def listen():
+        while True:
+            command = commands.get()
+            if command is None or command[0] != 'stop':
+                jobs.put(command)
+                if command is None:
+                    return
+                continue
+            with lock:
+                stopped.add(command[1])
+                if current[0] == command[1]:
+                    engine.stop()
+    threading.Thread(target=listen, daemon=True).start()
+    while (command := jobs.get()) is not None:
+        _, request, fen, limits = command
+        with lock:
+            if request in stopped:
+                stopped.discard(request)
+                results.put((request, 'stopped', None))
+                continue
+            current[0] = request
+        def info(result: SearchResult) -> None:
+            with lock:
+                if request in stopped: # stop set before the search started was cleared by it
+                    engine.stop()
+        try:
+            result = engine.search(Position(fen), limits, info)
+        except Exception as exception:
+            results.put((request, 'error', str(exception)))
+        else:
+            with lock:
+                results.put((request, 'stopped' if request in stopped else 'done', result))
+        with lock:
+            current[0] = 0
+            stopped.discard(request)
+
+@dataclass
+class Request:
+    """Search waiting for a worker.
+    """
+    number: int
+    fen: str
+    limits: SearchLimits
+    future: asyncio.Future
+
+class Worker:
+    """Worker process with its own command queue, so its search can be stopped.
+    """
+    def __init__(self, context: Any, results: Any, table_size: int) -> None:
+        """Constructor:
+            - starts the process
+
+        Args:
+
+         - context (multiprocessing.context.BaseContext): Context creating the process.
+         - results (multiprocessing.Queue): Results shared by all workers.
+         - table_size (int): Maximum number of transposition table entries.
+        """
+        self.commands: Any = context.Queue()
+        self.process: Any = context.Process(target=serve, args=(self.commands, results, table_size), daemon=True)
+        self.process.start()
+
+    def close(self, timeout: float = STOP_GRACE) -> None:
+        """Ends the process, kills it if it doesn't end in time.
+
+        Args:
+
+         - timeout (float, optional): Seconds to wait for the process. Defaults to STOP_GRACE.
+        """
+        self.commands.put(None)
+        self.process.join(timeout=timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+class EngineService:
+    """Pool of engine workers used from one event loop. Can be used as async context manager.
+    """
+    def __init__(self, workers: int | None = None, hash_mb: int = SERVICE_HASH) -> None:
+        """Constructor:
+
+        Args:
+
+         - workers (int | None, optional): Number of worker processes. Defaults to None which means number of CPUs.
+         - hash_mb (int, optional): Size of the transposition table of every worker in MB. Defaults to SERVICE_HASH.
+        """
+        self.size: int = workers or os.cpu_count() or 1
+        self.table_size: int = hash_mb * 1024 * 1024 // ENTRY_BYTES
+        self.context: Any = multiprocessing.get_context('spawn')
+        self.results: Any = None
+        self.workers: list[Worker] = []
+        self.drivers: list[asyncio.Task] = []
+        self.queue: asyncio.Queue | None = None
+        self.replies: dict[int, asyncio.Future] = {}
+        self.collector: threading.Thread | None = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.requests: int = 0
+        self.starting: asyncio.Lock = asyncio.Lock()
+
+    async def __aenter__(self) -> 'EngineService':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Starts the worker processes, unless they are running.
+        """
+        async with self.starting: # concurrent first requests wait for one pool instead of starting their own
+            if self.workers:
+                return
+            self.loop = asyncio.get_running_loop()
+            self.queue = asyncio.Queue()
+            self.results = self.context.Queue()
+            self.workers = await self.loop.run_in_executor(None, lambda: [Worker(self.context, self.results, self.table_size)
+                                                                          for _ in range(self.size)])
+            self.collector = threading.Thread(target=self.collect, args=(self.loop, self.results), daemon=True)
+            self.collector.start()
+            self.drivers = [asyncio.create_task(self.drive(index)) for index in range(self.size)]
+
+    async def close(self) -> None:
+        """Cancels waiting requests and ends the worker processes.
+        """
+        if not self.workers:
+            return
+        for driver in self.drivers:
+            driver.cancel()
+        await asyncio.gather(*self.drivers, return_exceptions=True)
+        while self.queue and not self.queue.empty():
+            self.queue.get_nowait().future.cancel()
+        workers, self.workers, self.drivers = self.workers, [], []
+        await asyncio.get_running_loop().run_in_executor(None, lambda: [worker.close() for worker in workers])
+        self.results.put(None)
+        self.collector.join()
+
+    def collect(self, loop: asyncio.AbstractEventLoop, results: Any) -> None:
+        """Thread passing results of the workers into the event loop.
+
+        Args:
+
+         - loop (asyncio.AbstractEventLoop): Loop of the service.
+         - results (multiprocessing.Queue): Results shared by all workers.
+        """
+        while (result := results.get()) is not None:
+            loop.call_soon_threadsafe(self.resolve, result)
+
+    def resolve(self, result: tuple[int, str, Any]) -> None:
+        """Completes the reply awaited by the driver of the worker.
+
+        Args:
+
+         - result (tuple[int, str, Any]): Request number, outcome and its value.
+        """
+        reply = self.replies.pop(result[0], None)
+        if reply and not reply.done():
+            reply.set_result(result[1:])
+
+    async def drive(self, index: int) -> None:
+        """Passes queued requests to one worker and stops the search when the request is cancelled.
+
+        Args:
+
+         - index (int): Index of the worker.
+        """
+        while True:
+            request: Request = await self.queue.get()
+            if request.future.done(): # cancelled or timed out while queued
+                continue
+            reply = self.loop.create_future()
+            self.replies[request.number] = reply
+            worker = self.workers[index]
+            worker.commands.put(('search', request.number, request.fen, request.limits))
+            try:
+                while not (reply.done() or request.future.done()) and worker.process.is_alive():
+                    await asyncio.wait((reply, request.future), timeout=WORKER_POLL, return_when=asyncio.FIRST_COMPLETED)
+                if not reply.done() and not worker.process.is_alive(): # result put just before the end may be on the way
+                    await asyncio.wait((reply,), timeout=WORKER_POLL)
+            except asyncio.CancelledError: # service is closing
+                request.future.cancel()
+                raise
+            if not reply.done() and not worker.process.is_alive():
+                self.replies.pop(request.number, None)
+                if not request.future.done():
+                    request.future.set_exception(RuntimeError(f'Engine worker ended with exit code {worker.process.exitcode}'))
+                await self.restart_worker(index)
+                continue
+            if not reply.done():
+                worker.commands.put(('stop', request.number))
+                try:
+                    await asyncio.wait_for(asyncio.shield(reply), STOP_GRACE)
+                except TimeoutError:
+                    self.replies.pop(request.number, None)
+                    await self.restart_worker(index)
+                continue
+            outcome, value = reply.result()
+            if request.future.done():
+                continue
+            if outcome == 'error':
+                request.future.set_exception(ValueError(value))
+            elif outcome == 'stopped':
+                request.future.cancel()
+            else:
+                request.future.set_result(value)
+
+    async def restart_worker(self, index: int) -> None:
+        """Replaces the worker which doesn't respond or ended.
+
+        Args:
+
+         - index (int): Index of the worker.
+        """
+        await self.loop.run_in_executor(None, self.workers[index].close, 0)
+        self.workers[index] = await self.loop.run_in_executor(None, Worker, self.context, self.results, self.table_size)
+
+    async def analyse(self, fen: str, limits: SearchLimits, timeout: float | None = None) -> SearchResult:
+        """Searches the position in the first free worker.
+
+        Args:
+
+         - fen (str): Position to search.
+         - limits (SearchLimits): Conditions stopping the search, at least one of them or timeout is required.
+         - timeout (float | None, optional): Maximum seconds including time spent in the queue. Defaults to None.
+
+        Raises:
+
+         - ValueError: If FEN string is malformed or the search has no limit.
+         - TimeoutError: If the timeout expired, the search is stopped.
+         - RuntimeError: If the worker process ended during the search, it's replaced by a new one.
+
+        Returns:
+
+         - SearchResult: Best move, score and principal variation.
+        """
+        Position(fen)
+        if limits.depth is None and limits.movetime is None and limits.nodes is None and timeout is None:
+            raise ValueError('Search without limits needs a timeout')
+        await self.start()
+        self.requests += 1
+        request = Request(self.requests, fen, limits, self.loop.create_future())
+        self.queue.put_nowait(request)
+        async with asyncio.timeout(timeout):
+            return await request.future # cancelling the awaiting task cancels the request too
+
+    async def best_move(self, fen: str, limits: SearchLimits, timeout: float | None = None) -> Move | None:
+        """Searches the position and returns only the best move.
+
+        Args:
+
+         - fen (str): Position to search.
+         - limits (SearchLimits): Conditions stopping the search.
+         - timeout (float | None, optional): Maximum seconds including time spent in the queue. Defaults to None.
+
+        Returns:
+
+         - Move | None: Best move, None if there is no legal move.
+        """
+        return (await self.analyse(fen, limits, timeout)).best_move
+
+    async def legal_moves(self, fen: str) -> list[Move]:
+        """Lists legal moves. Generated in the calling process, it's faster than passing the position to a worker.
+
+        Args:
+
+         - fen (str): Position to check.
+
+        Raises:
+
+         - ValueError: If FEN string is malformed.
+
+        Returns:
+
+         - list[Move]: Legal moves of the position.
+        """
+        return Position(fen).legal_moves()
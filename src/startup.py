@@ -0,0 +1,111 @@
+"""File measuring the startup of the app. Import times are taken from separate interpreter started with `-X importtime`,
+startup phases are marked by the main window while it is being built.
+
+Usage:
+
+    python src/main.py --profile-startup [--profile-output startup.json]
+"""
+
+from typing import Any
+import time
+import sys
+import os
+
+class StartupProfile:
+    """Class collecting timestamps of startup phases and printing the report.
+    """
+    def __init__(self, started: float) -> None:
+        """Constructor:
+
+        Args:
+
+         - started (float): Value of time.perf_counter taken before the first import of the main file.
+        """
+        self.started: float = started
+        self.marks: list[tuple[str, float]] = []
+
+    def mark(self, label: str) -> None:
+        """Records the end of the startup phase.
+
+        Args:
+
+         - label (str): Name of the phase.
+        """
+        self.marks.append((label, time.perf_counter()))
+
+    def phases(self) -> list[dict[str, Any]]:
+        """Computes duration of every phase.
+
+        Returns:
+
+         - list[dict[str, Any]]: Name, duration and time since start of every phase in milliseconds.
+        """
+        phases: list[dict[str, Any]] = []
+        previous = self.started
+        for label, moment in self.marks:
+            phases.append({'phase': label, 'ms': (moment - previous) * 1000, 'total_ms': (moment - self.started) * 1000})
+            previous = moment
+        return phases
+
+    def report(self, imports: list[dict[str, Any]]) -> str:
+        """Formats the report.
+
+        Args:
+
+         - imports (list[dict[str, Any]]): Import times returned by import_times.
+
+        Returns:
+
+         - str: Human readable report.
+        """
+        lines = ['Imports (cumulative ms, self ms):']
+        for entry in imports:
+            lines.append(f'  {'  ' * entry['depth']}{entry['module']:<{40 - 2 * entry['depth']}} {entry['cumulative_ms']:8.1f} {entry['self_ms']:8.1f}')
+        lines.append('Startup phases (ms, since start ms):')
+        for phase in self.phases():
+            lines.append(f'  {phase['phase']:<40} {phase['ms']:8.1f} {phase['total_ms']:8.1f}')
+        return '\n'.join(lines)
+
+    def save(self, path: str, imports: list[dict[str, Any]]) -> None:
+        """Saves the report as JSON so startups of different releases can be compared.
+
+        Args:
+
+         - path (str): Output file.
+         - imports (list[dict[str, Any]]): Import times returned by import_times.
+        """
+        import json
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump({'imports': imports, 'phases': self.phases()}, output, indent=2)
+
+def import_times(module: str = 'main', max_depth: int = 2, top: int = 25) -> list[dict[str, Any]]:
+    """Imports the module in fresh interpreter with `-X importtime` and collects the slowest imports.
+
+    Args:
+
+     - module (str, optional): Module to import. Defaults to 'main'.
+     - max_depth (int, optional): Maximum nesting of reported imports, 1 means imports made directly by the module. Defaults to 2.
+     - top (int, optional): Number of reported imports. Defaults to 25.
+
+    Returns:
+
+     - list[dict[str, Any]]: Module name, nesting depth, self and cumulative time in milliseconds in import order.
+    """
+    import subprocess
+    source = os.path.dirname(os.path.abspath(__file__))
+    command = [sys.executable, '-X', 'importtime', '-c', f'import sys; sys.path.insert(0, {source!r}); import {module}']
+    output = subprocess.run(command, capture_output=True, text=True).stderr
+    entries: list[dict[str, Any]] = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= max_depth:
+            entries.append({'module': name.strip(), 'depth': depth, 'self_ms': int(self_us) / 1000, 'cumulative_ms': int(cumulative_us) / 1000})
+    # children are printed before their parent, so imports of the module follow the previous top level import
+    end = next((i for i, entry in enumerate(entries) if entry['module'] == module and entry['depth'] == 0), len(entries) - 1)
+    start = max((i + 1 for i, entry in enumerate(entries[:end]) if entry['depth'] == 0), default=0)
+    entries = entries[start:end + 1]
+    slowest = sorted(entries[:-1], key=lambda entry: entry['cumulative_ms'], reverse=True)[:top]
+    return [entry for entry in entries if entry in slowest] + entries[-1:]
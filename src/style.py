@@ -0,0 +1,93 @@
+"""File with style registry reskinning the app while it's running. Widgets subscribe their options to named colors
+of the palette and color changes are applied in one batched pass, touching only widgets subscribed to changed colors.
+"""
+
+from typing import Any, Callable, TypeVar
+import weakref
+
+from properties import COLOR
+from tools import change_color
+
+Widget = TypeVar('Widget')
+
+class StyleRegistry:
+    """Class holding subscriptions of widgets to colors of the palette.
+    """
+    def __init__(self) -> None:
+        """Constructor:
+        """
+        self.widgets: weakref.WeakKeyDictionary[Any, dict[str, str]] = weakref.WeakKeyDictionary()
+        self.listeners: list[Callable[[set[str]], None]] = []
+        self.pending: set[str] = set()
+        self.root: Any = None
+
+    def attach(self, root: Any) -> None:
+        """Sets the main window used to schedule batched updates.
+
+        Args:
+
+         - root (Any): Main window of the app.
+        """
+        self.root = root
+
+    def subscribe(self, widget: Widget, **roles: str) -> Widget:
+        """Subscribes options of the widget to colors, e.g. subscribe(label, fg_color='BACKGROUND', text_color='TEXT').
+        Widget has to be created with current colors already, subscription only keeps it up to date.
+
+        Args:
+
+         - widget (Widget): Customtkinter widget.
+         - roles (str): Option name : color name in upper case.
+
+        Returns:
+
+         - Widget: The same widget, so the call can be chained with pack.
+        """
+        self.widgets.setdefault(widget, {}).update({option: role.upper() for option, role in roles.items()})
+        return widget
+
+    def listen(self, callback: Callable[[set[str]], None]) -> None:
+        """Registers function recoloring widgets which need more than mapping option to a color, e.g. highlighted cells.
+
+        Args:
+
+         - callback (Callable[[set[str]], None]): Called with names of changed colors during the batched pass.
+        """
+        self.listeners.append(callback)
+
+    def set_color(self, name: str, value: str) -> None:
+        """Changes the color, saves it to config file and schedules reskinning of subscribed widgets.
+
+        Args:
+
+         - name (str): Color name.
+         - value (str): New color code.
+        """
+        if getattr(COLOR, name.upper()) == value:
+            return
+        change_color(name.lower(), value)
+        COLOR.update({name: value})
+        if not self.pending and self.root:
+            self.root.after_idle(self.apply)
+        self.pending.add(name.upper())
+        if not self.root:
+            self.apply()
+
+    def apply(self) -> None:
+        """Applies all pending color changes with single configure call per affected widget.
+        """
+        changed, self.pending = self.pending, set()
+        if not changed:
+            return
+        for widget, roles in list(self.widgets.items()):
+            options = {option: getattr(COLOR, role) for option, role in roles.items() if role in changed}
+            if not options:
+                continue
+            if widget.winfo_exists():
+                widget.configure(**options)
+            else:
+                del self.widgets[widget]
+        for callback in self.listeners:
+            callback(changed)
+
+STYLE: StyleRegistry = StyleRegistry()
@@ -0,0 +1,229 @@
+"""File with index of piece themes and cache of their sprites. Asset folders are scanned once, every theme is validated
+to contain all 12 piece images and the result is stored in a manifest, which is reused as long as the folders don't change.
+Sprites are decoded and scaled once per theme and size, optionally in a worker thread, and shared by all pieces,
+so switching the theme only swaps already prepared images.
+"""
+
+from typing import Any
+import customtkinter as ctk
+import threading
+import json
+import os
+
+from tools import resource_path
+
+PIECE_NAMES: list[str] = ['pawn', 'knight', 'bishop', 'rook', 'queen', 'king']
+REQUIRED_FILES: list[str] = [f'{name}_{color}.png' for name in PIECE_NAMES for color in 'wb']
+NOT_THEMES: set[str] = {'menu'}
+
+class ThemeIndex:
+    """Class holding manifest of theme folders: whether the theme is complete and which images it misses.
+    """
+    def __init__(self, assets_path: str, manifest_path: str) -> None:
+        """Constructor:
+
+        Args:
+
+         - assets_path (str): Folder containing theme folders.
+         - manifest_path (str): JSON file storing the manifest.
+        """
+        self.assets_path: str = assets_path
+        self.manifest_path: str = manifest_path
+        self.manifest: dict[str, Any] | None = None
+
+    @staticmethod
+    def modified(path: str) -> int:
+        """Returns modification time of the folder, it changes when files are added, removed or renamed.
+
+        Args:
+
+         - path (str): Path to the folder.
+
+        Returns:
+
+         - int: Modification time in nanoseconds, 0 if the folder doesn't exist.
+        """
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return 0
+
+    def folders(self) -> list[str]:
+        """Lists folders inside assets folder without calling stat on them.
+
+        Returns:
+
+         - list[str]: Sorted folder names.
+        """
+        try:
+            with os.scandir(self.assets_path) as entries:
+                return sorted(entry.name for entry in entries if entry.is_dir())
+        except OSError:
+            return []
+
+    def is_valid(self, manifest: dict[str, Any]) -> bool:
+        """Checks if the manifest still describes asset folders.
+
+        Args:
+
+         - manifest (dict[str, Any]): Loaded manifest.
+
+        Returns:
+
+         - bool: True if no folder was added or removed and no theme folder changed.
+        """
+        if manifest.get('folders') != self.folders():
+            return False
+        return all(theme['mtime'] == self.modified(os.path.join(self.assets_path, name)) for name, theme in manifest['themes'].items())
+
+    def scan(self) -> dict[str, Any]:
+        """Scans asset folders, validates every theme and saves the manifest.
+
+        Returns:
+
+         - dict[str, Any]: Manifest with themes keyed by folder name.
+        """
+        themes: dict[str, Any] = {}
+        folders = self.folders()
+        for entry in folders:
+            path = os.path.join(self.assets_path, entry)
+            if entry in NOT_THEMES:
+                continue
+            files = set(os.listdir(path))
+            if not files:
+                continue
+            missing = [file for file in REQUIRED_FILES if file not in files]
+            themes[entry] = {'mtime': self.modified(path), 'complete': not missing, 'missing': missing}
+        manifest = {'folders': folders, 'themes': themes}
+        temporary_path = f'{self.manifest_path}.tmp'
+        try:
+            with open(temporary_path, 'w', encoding='utf-8') as manifest_file:
+                json.dump(manifest, manifest_file, indent=1)
+            os.replace(temporary_path, self.manifest_path)
+        except OSError as e:
+            print(f'Couldn`t save theme manifest due to error: {e}')
+        return manifest
+
+    def load(self) -> dict[str, Any]:
+        """Returns the manifest, reading it from disk or scanning the folders only when it's outdated.
+
+        Returns:
+
+         - dict[str, Any]: Manifest with themes keyed by folder name.
+        """
+        if self.manifest is not None and self.is_valid(self.manifest):
+            return self.manifest
+        try:
+            with open(self.manifest_path, encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+            if not self.is_valid(manifest):
+                manifest = self.scan()
+        except (OSError, ValueError, KeyError, TypeError):
+            manifest = self.scan()
+        self.manifest = manifest
+        return manifest
+
+    def themes(self) -> list[str]:
+        """Names of themes containing all piece images.
+
+        Returns:
+
+         - list[str]: Complete themes.
+        """
+        return [name for name, theme in self.load()['themes'].items() if theme['complete']]
+
+    def incomplete(self) -> dict[str, list[str]]:
+        """Themes missing some of the piece images.
+
+        Returns:
+
+         - dict[str, list[str]]: Missing file names keyed by theme name.
+        """
+        return {name: theme['missing'] for name, theme in self.load()['themes'].items() if not theme['complete']}
+
+class SpriteCache:
+    """Class holding decoded and scaled piece images shared by all pieces.
+    """
+    def __init__(self, assets_path: str) -> None:
+        """Constructor:
+
+        Args:
+
+         - assets_path (str): Folder containing theme folders.
+        """
+        self.assets_path: str = assets_path
+        self.sprites: dict[tuple[str, int], dict[str, ctk.CTkImage]] = {}
+        self.workers: dict[tuple[str, int], threading.Thread] = {}
+        self.lock: threading.Lock = threading.Lock()
+
+    def load_theme(self, theme: str, size: int) -> dict[str, ctk.CTkImage]:
+        """Decodes and scales all piece images of the theme. Missing images are reported and skipped.
+
+        Args:
+
+         - theme (str): Name of the theme folder.
+         - size (int): Width and height of the sprite.
+
+        Returns:
+
+         - dict[str, ctk.CTkImage]: Images keyed by file name without extension e.g. 'pawn_w'.
+        """
+        from PIL import Image
+        sprites: dict[str, ctk.CTkImage] = {}
+        for file in REQUIRED_FILES:
+            try:
+                image = Image.open(os.path.join(self.assets_path, theme, file)).convert('RGBA').resize((size, size))
+            except (FileExistsError, FileNotFoundError) as e:
+                print(f'Couldn`t load image for due to error: {e}')
+                continue
+            sprites[file[:-4]] = ctk.CTkImage(light_image=image, dark_image=image, size=(size, size))
+        return sprites
+
+    def preload(self, theme: str, size: int) -> None:
+        """Starts worker thread preparing sprites of the theme, unless they are ready or already being prepared.
+
+        Args:
+
+         - theme (str): Name of the theme folder.
+         - size (int): Width and height of the sprite.
+        """
+        key = (theme, size)
+        with self.lock:
+            if key in self.sprites or key in self.workers:
+                return
+            def thread_task():
+                sprites = self.load_theme(theme, size)
+                with self.lock:
+                    self.sprites[key] = sprites
+                    del self.workers[key]
+            self.workers[key] = threading.Thread(target=thread_task, daemon=True)
+            self.workers[key].start()
+
+    def get(self, theme: str, name: str, size: int) -> ctk.CTkImage | None:
+        """Returns sprite of the piece, waiting for the worker or loading the theme if it isn't prepared yet.
+
+        Args:
+
+         - theme (str): Name of the theme folder.
+         - name (str): Piece name with color e.g. 'pawn_w'.
+         - size (int): Width and height of the sprite.
+
+        Returns:
+
+         - ctk.CTkImage | None: Shared image, None if the image is missing.
+        """
+        key = (theme, size)
+        with self.lock:
+            worker = self.workers.get(key)
+        if worker:
+            worker.join()
+        with self.lock:
+            sprites = self.sprites.get(key)
+        if sprites is None:
+            sprites = self.load_theme(theme, size)
+            with self.lock:
+                self.sprites[key] = sprites
+        return sprites.get(name)
+
+THEME_INDEX: ThemeIndex = ThemeIndex(resource_path('assets'), resource_path(os.path.join('assets', 'themes.json')))
+SPRITES: SpriteCache = SpriteCache(resource_path('assets'))
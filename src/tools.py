@@ -4,9 +4,19 @@
 import customtkinter as ctk
 from PIL import Image
 import configparser
+import threading
+import atexit
 import sys
 import os
 
+# seconds without any change after which pending config changes are written
+CONFIG_WRITE_DELAY: float = 0.5
+
+_config_cache: dict[str, tuple[int, configparser.ConfigParser]] = {}
+_config_lock: threading.RLock = threading.RLock()
+_config_timer: threading.Timer | None = None
+_config_dirty: bool = False
+
 def resource_path(relative_path: str) -> str:
     """Function obtaining the absolute path to desired relative path.
     Ensures That pyinstaller executable will work properly.
@@ -25,6 +35,86 @@ def resource_path(relative_path: str) -> str:
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+def config_path() -> str:
+    """Returns path to the config file.
+
+    Returns:
+
+     - str: Absolute path to config.ini.
+    """
+    return resource_path(os.path.join('assets', 'config.ini'))
+
+def read_config() -> configparser.ConfigParser:
+    """Parses config file once and reuses parsed content until the file is modified. Board creation reads the config
+    hundreds of times, so parsing it on every call slowed down the startup. Changes not written yet are kept in memory,
+    so they are visible to readers right away.
+
+    Returns:
+
+     - configparser.ConfigParser: Parsed config shared by all readers, it must not be modified outside of this module.
+    """
+    path = config_path()
+    with _config_lock:
+        cached = _config_cache.get(path)
+        if cached and _config_dirty:
+            return cached[1]
+        try:
+            modified = os.stat(path).st_mtime_ns
+        except OSError:
+            modified = 0
+        if cached and cached[0] == modified:
+            return cached[1]
+        config = configparser.ConfigParser()
+        config.read(path)
+        _config_cache[path] = (modified, config)
+        return config
+
+def write_config(config: configparser.ConfigParser) -> None:
+    """Writes config file atomically: content goes to temporary file which then replaces the config,
+    so the config is never left half written. Written content is kept as the cached one.
+
+    Args:
+
+     - config (configparser.ConfigParser): Config to save.
+    """
+    path = config_path()
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'w') as configfile:
+        config.write(configfile)
+    os.replace(temporary_path, path)
+    _config_cache[path] = (os.stat(path).st_mtime_ns, config)
+
+def schedule_config_write() -> None:
+    """Marks the config as changed and postpones writing it until no change happens for CONFIG_WRITE_DELAY seconds,
+    so bursts of changes end with single write outside of the Tk thread.
+    """
+    global _config_timer, _config_dirty
+    with _config_lock:
+        _config_dirty = True
+        if _config_timer:
+            _config_timer.cancel()
+        _config_timer = threading.Timer(CONFIG_WRITE_DELAY, flush_config)
+        _config_timer.daemon = True
+        _config_timer.start()
+
+def flush_config() -> None:
+    """Writes pending config changes immediately. Called by the timer and when the app exits.
+    """
+    global _config_timer, _config_dirty
+    with _config_lock:
+        if _config_timer:
+            _config_timer.cancel()
+            _config_timer = None
+        if not _config_dirty:
+            return
+        try:
+            write_config(read_config())
+            _config_dirty = False
+        except OSError as e: # stays dirty, so the next change or the exit tries again
+            print(f'Couldn`t save config due to error: {e}')
+
+atexit.register(flush_config)
+
 def get_from_config(variable: str) -> str | int:
     """Functions reading specific value from the config file.
 
@@ -36,28 +126,25 @@ def get_from_config(variable: str) -> str | int:
 
      - str | int: Color, size or font name
     """
-    config = configparser.ConfigParser()
-    config.read(resource_path(os.path.join('assets', 'config.ini')))
+    config = read_config()
     db_variable = config['database'][variable]
     if variable == 'size':
         return int(db_variable)
     return db_variable
 
 def change_config(change_variable: str, value: str | int) -> None:
-    """Updates specific variable in config file.
+    """Updates specific variable in config file. Change is visible immediately and written to the file after a short delay.
 
     Args:
 
      - change_variable (str): Variable name to change
      - value (str | int): Value to which the variable will be updated.
     """
-    config = configparser.ConfigParser()
-    config.read(resource_path(os.path.join('assets', 'config.ini')))
     if isinstance(value, int):
         value = str(value)
-    config['database'][change_variable] = value    
-    with open(resource_path(os.path.join('assets', 'config.ini')), 'w') as configfile:
-        config.write(configfile)
+    with _config_lock:
+        read_config()['database'][change_variable] = value
+        schedule_config_write()
 
 def load_menu_image(option: str, resize: float = 1.5) -> ctk.CTkImage | None:
     """Function loading images for menu.
@@ -86,21 +173,18 @@ def get_colors() -> dict:
     Returns:
      - dict: Dictionary (later enum) of color name : color code.
     """
-    config = configparser.ConfigParser()
-    config.read(resource_path(os.path.join('assets', 'config.ini')))
+    config = read_config()
     colors = dict(config['Colors'])
     return colors
 
 def change_color(color_name: str, color_value: str) -> None:
-    """Function changing color value in config file.
+    """Function changing color value in config file. Change is visible immediately and written to the file after a short delay.
 
     Args:
 
      - color_name (str): Color name to change.
      - color_value (str): New color value.
     """
-    config = configparser.ConfigParser()
-    config.read(resource_path(os.path.join('assets', 'config.ini')))
-    config['Colors'][color_name] = color_value    
-    with open(resource_path(os.path.join('assets', 'config.ini')), 'w') as configfile:
-        config.write(configfile)
+    with _config_lock:
+        read_config()['Colors'][color_name] = color_value
+        schedule_config_write()
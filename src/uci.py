@@ -0,0 +1,220 @@
+"""Universal Chess Interface front end of the engine. Second entry point of the app, runs without any window and imports
+only the headless rules core and the search, so it can be driven by chess GUIs, match runners and testing tools.
+
+Usage:
+
+    python src/uci.py
+"""
+
+from typing import TextIO
+import threading
+import sys
+
+from rules import Position, IllegalMoveError
+from engine import Engine, SearchLimits, SearchResult, format_score, ENTRY_BYTES
+
+ENGINE_NAME: str = 'Chess'
+ENGINE_AUTHOR: str = 'c0pson'
+DEFAULT_HASH: int = 16
+MAX_MULTIPV: int = 64
+
+class UciProtocol:
+    """Class reading UCI commands and running the search in a background thread, so stop and isready are answered during it.
+    """
+    def __init__(self, output: TextIO = sys.stdout) -> None:
+        """Constructor:
+
+        Args:
+
+         - output (TextIO, optional): Stream receiving engine responses. Defaults to sys.stdout.
+        """
+        self.output: TextIO = output
+        self.output_lock: threading.Lock = threading.Lock()
+        self.engine: Engine = Engine(DEFAULT_HASH * 1024 * 1024 // ENTRY_BYTES)
+        self.position: Position = Position()
+        self.search_thread: threading.Thread | None = None
+        self.multipv: int = 1
+
+    def send(self, line: str) -> None:
+        """Writes single response line and flushes it immediately.
+
+        Args:
+
+         - line (str): Response without new line character.
+        """
+        with self.output_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def handle(self, line: str) -> bool:
+        """Dispatches single command.
+
+        Args:
+
+         - line (str): Command line received from the GUI.
+
+        Returns:
+
+         - bool: False when the engine should quit, True otherwise.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+        if command == 'uci':
+            self.send(f'id name {ENGINE_NAME}')
+            self.send(f'id author {ENGINE_AUTHOR}')
+            self.send(f'option name Hash type spin default {DEFAULT_HASH} min 1 max 1024')
+            self.send(f'option name MultiPV type spin default 1 min 1 max {MAX_MULTIPV}')
+            self.send('uciok')
+        elif command == 'isready':
+            self.send('readyok')
+        elif command == 'ucinewgame':
+            self.wait_for_search()
+            self.engine.clear()
+            self.position = Position()
+        elif command == 'setoption':
+            self.set_option(arguments)
+        elif command == 'position':
+            self.wait_for_search()
+            self.set_position(arguments)
+        elif command == 'go':
+            self.wait_for_search()
+            self.go(arguments)
+        elif command == 'stop':
+            self.stop()
+        elif command == 'quit':
+            self.stop()
+            return False
+        else:
+            self.send(f'info string Unknown command: {line.strip()}')
+        return True
+
+    def set_option(self, arguments: list[str]) -> None:
+        """Handles 'setoption name <id> value <x>' command.
+
+        Args:
+
+         - arguments (list[str]): Tokens after the command.
+        """
+        if 'name' not in arguments or 'value' not in arguments:
+            return
+        name = ' '.join(arguments[arguments.index('name') + 1:arguments.index('value')])
+        value = ' '.join(arguments[arguments.index('value') + 1:])
+        if name.lower() == 'hash' and value.isdigit():
+            self.wait_for_search()
+            self.engine.table_size = max(1, int(value)) * 1024 * 1024 // ENTRY_BYTES
+            self.engine.table.clear()
+        elif name.lower() == 'multipv' and value.isdigit():
+            self.wait_for_search()
+            self.multipv = min(max(1, int(value)), MAX_MULTIPV)
+
+    def set_position(self, arguments: list[str]) -> None:
+        """Handles 'position [startpos | fen <fen>] [moves <move>...]' command. Invalid position or move is reported
+        with info string and the position stays at the last valid state.
+
+        Args:
+
+         - arguments (list[str]): Tokens after the command.
+        """
+        moves_index = arguments.index('moves') if 'moves' in arguments else len(arguments)
+        try:
+            if arguments and arguments[0] == 'fen':
+                position = Position(' '.join(arguments[1:moves_index]))
+            else:
+                position = Position()
+        except ValueError:
+            self.send('info string Invalid FEN')
+            return
+        for text in arguments[moves_index + 1:]:
+            try:
+                position.push(position.parse_uci(text))
+            except IllegalMoveError:
+                self.send(f'info string Illegal move: {text}')
+                break
+        self.position = position
+
+    def go(self, arguments: list[str]) -> None:
+        """Handles 'go' command with depth, movetime, nodes, infinite and clock parameters and starts the search.
+
+        Args:
+
+         - arguments (list[str]): Tokens after the command.
+        """
+        values: dict[str, int] = {}
+        for name, value in zip(arguments, arguments[1:]):
+            if name in ('depth', 'movetime', 'nodes', 'wtime', 'btime', 'winc', 'binc', 'movestogo') and value.lstrip('-').isdigit():
+                values[name] = int(value)
+        limits = SearchLimits(values.get('depth'), values.get('movetime'), values.get('nodes'), self.multipv)
+        clock = values.get('wtime' if self.position.turn == 'w' else 'btime')
+        if limits.movetime is None and clock is not None and 'infinite' not in arguments:
+            increment = values.get('winc' if self.position.turn == 'w' else 'binc', 0)
+            budget = clock / values.get('movestogo', 30) + increment * 3 / 4
+            limits.movetime = max(10, min(budget, clock - 50))
+        position = self.position.copy()
+        self.search_thread = threading.Thread(target=self.search, args=(position, limits), daemon=True)
+        self.search_thread.start()
+
+    def search(self, position: Position, limits: SearchLimits) -> None:
+        """Runs the search and reports the best move. Executed in the search thread.
+
+        Args:
+
+         - position (Position): Copy of the position to search.
+         - limits (SearchLimits): Conditions stopping the search.
+        """
+        result = self.engine.search(position, limits, lambda info: self.send_info(position, info))
+        if result.best_move is None:
+            self.send('bestmove 0000')
+        elif result.ponder_move is not None:
+            self.send(f'bestmove {position.uci(result.best_move)} ponder {position.uci(result.ponder_move)}')
+        else:
+            self.send(f'bestmove {position.uci(result.best_move)}')
+
+    def send_info(self, position: Position, result: SearchResult) -> None:
+        """Reports progress of the search after every completed depth, one line per variation in multi-PV mode.
+
+        Args:
+
+         - position (Position): Searched position.
+         - result (SearchResult): Result of the completed depth.
+        """
+        milliseconds = int(result.seconds * 1000)
+        nps = int(result.nodes / result.seconds) if result.seconds else 0
+        for index, (score, line) in enumerate(result.lines, start=1):
+            pv = ' '.join(position.uci(move) for move in line)
+            multipv = f' multipv {index}' if self.multipv > 1 else ''
+            self.send(f'info depth {result.depth}{multipv} score {format_score(score)} nodes {result.nodes} nps {nps} time {milliseconds} pv {pv}')
+
+    def stop(self) -> None:
+        """Stops running search, the search thread sends the best move found so far.
+        """
+        self.engine.stop()
+        self.wait_for_search()
+
+    def wait_for_search(self) -> None:
+        """Waits until the search thread finishes.
+        """
+        if self.search_thread is not None:
+            self.search_thread.join()
+            self.search_thread = None
+
+    def loop(self, stream: TextIO = sys.stdin) -> None:
+        """Reads commands until 'quit' or end of the input.
+
+        Args:
+
+         - stream (TextIO, optional): Stream of commands. Defaults to sys.stdin.
+        """
+        for line in stream:
+            if not self.handle(line):
+                return
+        self.wait_for_search()
+
+def main() -> None:
+    """Command line entry point of the UCI engine.
+    """
+    UciProtocol().loop()
+
+if __name__ == '__main__':
+    main()
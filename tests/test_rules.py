@@ -0,0 +1,105 @@
+"""Regression checks of the headless rules core: perft counts of standard positions, SAN and FEN round trips
+and PGN round trip of random games.
+
+Usage:
+
+    python -m unittest discover -s tests
+"""
+
+import unittest
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from rules import Position, STARTING_FEN
+from pgn import Game, read_games, write_game
+
+PERFT: list[tuple[str, int, int]] = [
+    (STARTING_FEN, 3, 8902),
+    ('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1', 3, 97862),
+    ('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', 4, 43238),
+    ('r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1', 3, 9467),
+    ('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8', 3, 62379),
+]
+
+def perft(position: Position, depth: int) -> int:
+    """Counts leaf nodes of the tree of legal moves.
+
+    Args:
+
+     - position (Position): Root of the tree.
+     - depth (int): Depth of the tree.
+
+    Returns:
+
+     - int: Number of leaf nodes.
+    """
+    moves = position.legal_moves()
+    if depth == 1:
+        return len(moves)
+    count = 0
+    for move in moves:
+        position.push(move)
+        count += perft(position, depth - 1)
+        position.pop()
+    return count
+
+def random_games(count: int, max_plies: int = 120, seed: int = 1) -> list[Position]:
+    """Plays random games from the starting position.
+
+    Args:
+
+     - count (int): Number of games.
+     - max_plies (int, optional): Maximum length of a game. Defaults to 120.
+     - seed (int, optional): Seed of random moves. Defaults to 1.
+
+    Returns:
+
+     - list[Position]: Final positions with move history.
+    """
+    rng = random.Random(seed)
+    games: list[Position] = []
+    for _ in range(count):
+        position = Position()
+        while len(position.undo_stack) < max_plies and position.result() == '*':
+            position.push(rng.choice(position.legal_moves()))
+        games.append(position)
+    return games
+
+class PerftTest(unittest.TestCase):
+    """Move generation matches the published perft counts.
+    """
+    def test_perft(self) -> None:
+        for fen, depth, expected in PERFT:
+            with self.subTest(fen=fen):
+                position = Position(fen)
+                self.assertEqual(perft(position, depth), expected)
+                self.assertEqual(position.fen(), fen)
+                self.assertEqual(position.hash, position.compute_hash())
+
+class NotationTest(unittest.TestCase):
+    """SAN and FEN written by the position are read back unchanged.
+    """
+    def test_san_and_fen_round_trip(self) -> None:
+        for game in random_games(20):
+            position = Position()
+            for move in game.move_stack:
+                self.assertEqual(position.parse_san(position.san(move)), move)
+                position.push(move)
+                copy = Position(position.fen())
+                self.assertEqual(copy.fen(), position.fen())
+                self.assertEqual(copy.hash, position.hash)
+
+    def test_pgn_round_trip(self) -> None:
+        games = [Game.from_position(position, {'Event': f'Random {number}'}) for number, position in enumerate(random_games(10))]
+        text = '\n'.join(write_game(game) for game in games)
+        read = list(read_games(text.splitlines(keepends=True)))
+        self.assertEqual([game.headers for game in read], [game.headers for game in games])
+        self.assertEqual([game.moves for game in read], [game.moves for game in games])
+        for game, position in zip(read, random_games(10)):
+            self.assertEqual(game.replay().fen(), position.fen())
+
+if __name__ == '__main__':
+    unittest.main()